@@ -12,6 +12,7 @@ Permission Model:
 - The actual survey editing is protected by survey-level permissions
 """
 
+import gzip
 import json
 from unittest.mock import MagicMock, patch
 
@@ -119,8 +120,9 @@ def api_client():
 
 
 @pytest.fixture(autouse=True)
-def clear_cache_between_tests():
-    """Clear cache before each test."""
+def clear_cache_between_tests(settings, tmp_path):
+    """Clear cache before each test, and keep dataset snapshots per test."""
+    settings.EXTERNAL_DATASET_SNAPSHOT_DIR = str(tmp_path / "dataset_snapshots")
     cache.clear()
     yield
     cache.clear()
@@ -142,7 +144,9 @@ def test_list_datasets_requires_authentication(client):
 def test_get_dataset_requires_authentication(client):
     """Anonymous users CAN get dataset details (needed for public surveys)."""
     # Mock the external API call with realistic response
-    with patch("checktick_app.surveys.external_datasets.requests.get") as mock_get:
+    with patch(
+        "checktick_app.surveys.external_datasets.requests.Session.get"
+    ) as mock_get:
         mock_response = MagicMock()
         mock_response.status_code = 200
         mock_response.json.return_value = get_mock_hospital_response()
@@ -167,7 +171,9 @@ def test_get_dataset_authenticated_allowed(client, authenticated_user):
     hdrs = auth_hdr(client, "testuser", TEST_PASSWORD)
 
     # Mock the external API call with realistic response
-    with patch("checktick_app.surveys.external_datasets.requests.get") as mock_get:
+    with patch(
+        "checktick_app.surveys.external_datasets.requests.Session.get"
+    ) as mock_get:
         mock_response = MagicMock()
         mock_response.status_code = 200
         mock_response.json.return_value = get_mock_hospital_response()
@@ -212,7 +218,9 @@ def test_get_dataset_returns_options(client, authenticated_user):
     """Get dataset endpoint returns options from external API."""
     hdrs = auth_hdr(client, "testuser", TEST_PASSWORD)
 
-    with patch("checktick_app.surveys.external_datasets.requests.get") as mock_get:
+    with patch(
+        "checktick_app.surveys.external_datasets.requests.Session.get"
+    ) as mock_get:
         mock_response = MagicMock()
         mock_response.status_code = 200
         mock_response.json.return_value = get_mock_hospital_response()
@@ -234,7 +242,9 @@ def test_get_dataset_handles_list_response_format(client, authenticated_user):
     """Get dataset handles response that is a direct list."""
     hdrs = auth_hdr(client, "testuser", TEST_PASSWORD)
 
-    with patch("checktick_app.surveys.external_datasets.requests.get") as mock_get:
+    with patch(
+        "checktick_app.surveys.external_datasets.requests.Session.get"
+    ) as mock_get:
         mock_response = MagicMock()
         mock_response.status_code = 200
         mock_response.json.return_value = get_mock_trust_response()
@@ -270,7 +280,9 @@ def test_get_dataset_external_api_failure_returns_502(client, authenticated_user
     """External API failure returns 502."""
     hdrs = auth_hdr(client, "testuser", TEST_PASSWORD)
 
-    with patch("checktick_app.surveys.external_datasets.requests.get") as mock_get:
+    with patch(
+        "checktick_app.surveys.external_datasets.requests.Session.get"
+    ) as mock_get:
         mock_get.side_effect = requests.RequestException("Connection timeout")
 
         resp = client.get("/api/datasets/hospitals_england_wales/", **hdrs)
@@ -285,7 +297,9 @@ def test_get_dataset_invalid_response_format_returns_502(client, authenticated_u
     """Invalid response format from external API returns 502."""
     hdrs = auth_hdr(client, "testuser", TEST_PASSWORD)
 
-    with patch("checktick_app.surveys.external_datasets.requests.get") as mock_get:
+    with patch(
+        "checktick_app.surveys.external_datasets.requests.Session.get"
+    ) as mock_get:
         mock_response = MagicMock()
         mock_response.status_code = 200
         mock_response.json.return_value = {"unexpected": "format"}  # Invalid structure
@@ -303,7 +317,9 @@ def test_get_dataset_non_string_options_returns_502(client, authenticated_user):
     """Non-string options in response returns 502."""
     hdrs = auth_hdr(client, "testuser", TEST_PASSWORD)
 
-    with patch("checktick_app.surveys.external_datasets.requests.get") as mock_get:
+    with patch(
+        "checktick_app.surveys.external_datasets.requests.Session.get"
+    ) as mock_get:
         mock_response = MagicMock()
         mock_response.status_code = 200
         # Options contain non-string values
@@ -327,7 +343,9 @@ def test_get_dataset_caches_result(client, authenticated_user):
     """Successful dataset fetch is cached."""
     hdrs = auth_hdr(client, "testuser", TEST_PASSWORD)
 
-    with patch("checktick_app.surveys.external_datasets.requests.get") as mock_get:
+    with patch(
+        "checktick_app.surveys.external_datasets.requests.Session.get"
+    ) as mock_get:
         mock_response = MagicMock()
         mock_response.status_code = 200
         mock_response.json.return_value = get_mock_hospital_response()
@@ -352,7 +370,9 @@ def test_get_dataset_cache_key_isolation(client, authenticated_user):
     """Different dataset keys have isolated caches."""
     hdrs = auth_hdr(client, "testuser", TEST_PASSWORD)
 
-    with patch("checktick_app.surveys.external_datasets.requests.get") as mock_get:
+    with patch(
+        "checktick_app.surveys.external_datasets.requests.Session.get"
+    ) as mock_get:
         mock_response = MagicMock()
         mock_response.status_code = 200
         mock_response.json.return_value = {"options": ["A", "B"]}
@@ -377,7 +397,9 @@ def test_get_dataset_cache_survives_authentication_changes(client, django_user_m
         username="user2", password="pass2"
     )
 
-    with patch("checktick_app.surveys.external_datasets.requests.get") as mock_get:
+    with patch(
+        "checktick_app.surveys.external_datasets.requests.Session.get"
+    ) as mock_get:
         mock_response = MagicMock()
         mock_response.status_code = 200
         mock_response.json.return_value = get_mock_hospital_response()
@@ -418,7 +440,9 @@ def test_get_dataset_with_force_authenticate(api_client, authenticated_user):
     """Test get dataset using APIClient with force_authenticate."""
     api_client.force_authenticate(authenticated_user)
 
-    with patch("checktick_app.surveys.external_datasets.requests.get") as mock_get:
+    with patch(
+        "checktick_app.surveys.external_datasets.requests.Session.get"
+    ) as mock_get:
         mock_response = MagicMock()
         mock_response.status_code = 200
         mock_response.json.return_value = get_mock_trust_response()
@@ -427,8 +451,8 @@ def test_get_dataset_with_force_authenticate(api_client, authenticated_user):
         resp = api_client.get("/api/datasets/nhs_trusts/")
 
         assert resp.status_code == 200
-        assert "options" in resp.data
-        assert len(resp.data["options"]) == 2
+        assert "options" in resp.json()
+        assert len(resp.json()["options"]) == 2
 
 
 # ============================================================================
@@ -444,7 +468,9 @@ def test_external_api_receives_auth_header_when_configured(
     settings.EXTERNAL_DATASET_API_KEY = "test-api-key-123"
     hdrs = auth_hdr(client, "testuser", TEST_PASSWORD)
 
-    with patch("checktick_app.surveys.external_datasets.requests.get") as mock_get:
+    with patch(
+        "checktick_app.surveys.external_datasets.requests.Session.get"
+    ) as mock_get:
         mock_response = MagicMock()
         mock_response.status_code = 200
         mock_response.json.return_value = {"options": ["A"]}
@@ -467,7 +493,9 @@ def test_external_api_url_is_configurable(client, authenticated_user, settings):
     settings.EXTERNAL_DATASET_API_URL = custom_url
     hdrs = auth_hdr(client, "testuser", TEST_PASSWORD)
 
-    with patch("checktick_app.surveys.external_datasets.requests.get") as mock_get:
+    with patch(
+        "checktick_app.surveys.external_datasets.requests.Session.get"
+    ) as mock_get:
         mock_response = MagicMock()
         mock_response.status_code = 200
         mock_response.json.return_value = ["Option"]
@@ -510,7 +538,9 @@ def test_get_dataset_response_structure(client, authenticated_user):
     """Get dataset returns correctly structured response."""
     hdrs = auth_hdr(client, "testuser", TEST_PASSWORD)
 
-    with patch("checktick_app.surveys.external_datasets.requests.get") as mock_get:
+    with patch(
+        "checktick_app.surveys.external_datasets.requests.Session.get"
+    ) as mock_get:
         mock_response = MagicMock()
         mock_response.status_code = 200
         mock_response.json.return_value = get_mock_hospital_response()
@@ -543,7 +573,9 @@ def test_org_admin_can_access_datasets(client, django_user_model):
 
     hdrs = auth_hdr(client, "admin", "pass")
 
-    with patch("checktick_app.surveys.external_datasets.requests.get") as mock_get:
+    with patch(
+        "checktick_app.surveys.external_datasets.requests.Session.get"
+    ) as mock_get:
         mock_response = MagicMock()
         mock_response.status_code = 200
         mock_response.json.return_value = get_mock_hospital_response()
@@ -570,7 +602,9 @@ def test_org_creator_can_access_datasets(client, django_user_model):
 
     hdrs = auth_hdr(client, "creator", "pass")
 
-    with patch("checktick_app.surveys.external_datasets.requests.get") as mock_get:
+    with patch(
+        "checktick_app.surveys.external_datasets.requests.Session.get"
+    ) as mock_get:
         mock_response = MagicMock()
         mock_response.status_code = 200
         mock_response.json.return_value = get_mock_hospital_response()
@@ -597,7 +631,9 @@ def test_org_viewer_can_access_datasets(client, django_user_model):
 
     hdrs = auth_hdr(client, "viewer", "pass")
 
-    with patch("checktick_app.surveys.external_datasets.requests.get") as mock_get:
+    with patch(
+        "checktick_app.surveys.external_datasets.requests.Session.get"
+    ) as mock_get:
         mock_response = MagicMock()
         mock_response.status_code = 200
         mock_response.json.return_value = get_mock_hospital_response()
@@ -626,7 +662,9 @@ def test_user_without_org_membership_can_access_datasets(client, django_user_mod
 
     hdrs = auth_hdr(client, "user", "pass")
 
-    with patch("checktick_app.surveys.external_datasets.requests.get") as mock_get:
+    with patch(
+        "checktick_app.surveys.external_datasets.requests.Session.get"
+    ) as mock_get:
         mock_response = MagicMock()
         mock_response.status_code = 200
         mock_response.json.return_value = get_mock_hospital_response()
@@ -639,3 +677,172 @@ def test_user_without_org_membership_can_access_datasets(client, django_user_mod
         # Get specific dataset
         resp = client.get("/api/datasets/hospitals_england_wales/", **hdrs)
         assert resp.status_code == 200
+
+
+# ============================================================================
+# Search Tests
+# ============================================================================
+
+
+def _search(client, query="", headers=None, **params):
+    with patch(
+        "checktick_app.surveys.external_datasets.requests.Session.get"
+    ) as mock_get:
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = get_mock_hospital_response()
+        mock_get.return_value = mock_response
+
+        return client.get(
+            "/api/datasets/hospitals_england_wales/search/",
+            {"q": query, **params},
+            **(headers or {}),
+        )
+
+
+@pytest.mark.django_db
+def test_search_dataset_allows_anonymous(client):
+    """Search is public, like get_dataset, for public survey submissions."""
+    resp = _search(client, "alder")
+
+    assert resp.status_code == 200
+    assert resp.json() == {
+        "dataset_key": "hospitals_england_wales",
+        "q": "alder",
+        "total": 1,
+        "results": ["ALDER HEY CHILDREN'S HOSPITAL (RBS25)"],
+    }
+
+
+@pytest.mark.django_db
+def test_search_dataset_matches_ods_code_first(client):
+    resp = _search(client, "rcf22")
+
+    assert resp.json()["results"][0] == "AIREDALE GENERAL HOSPITAL (RCF22)"
+
+
+@pytest.mark.django_db
+def test_search_dataset_paginates(client):
+    first = _search(client, "hospital", limit=2).json()
+    rest = _search(client, "hospital", limit=2, offset=2).json()
+
+    assert first["total"] == rest["total"] == 3
+    assert len(first["results"]) == 2
+    assert len(rest["results"]) == 1
+    assert rest["results"][0] not in first["results"]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("params", [{"limit": "x"}, {"offset": "-1"}])
+def test_search_dataset_rejects_invalid_paging(client, params):
+    assert _search(client, "a", **params).status_code == 400
+
+
+@pytest.mark.django_db
+def test_search_dataset_caps_limit(client, monkeypatch):
+    from checktick_app.api import views
+
+    monkeypatch.setattr(views, "DATASET_SEARCH_MAX_LIMIT", 1)
+
+    assert len(_search(client, "hospital", limit=50).json()["results"]) == 1
+
+
+@pytest.mark.django_db
+def test_search_dataset_invalid_key_returns_400(client):
+    resp = client.get("/api/datasets/invalid_key/search/", {"q": "a"})
+
+    assert resp.status_code == 400
+
+
+@pytest.mark.django_db
+def test_search_dataset_etag_and_not_modified(client):
+    resp = _search(client, "alder")
+    etag = resp["ETag"]
+
+    assert etag.startswith('"') and etag.endswith('"')
+    assert "max-age=" in resp["Cache-Control"]
+    assert "public" in resp["Cache-Control"]
+
+    again = _search(client, "alder", headers={"HTTP_IF_NONE_MATCH": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again["ETag"] == etag
+
+    other = _search(client, "aire", headers={"HTTP_IF_NONE_MATCH": etag})
+    assert other.status_code == 200
+    assert other["ETag"] != etag
+
+
+# ============================================================================
+# Conditional GET Tests
+# ============================================================================
+
+
+def _get_hospitals(client, **headers):
+    with patch(
+        "checktick_app.surveys.external_datasets.requests.Session.get"
+    ) as mock_get:
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = get_mock_hospital_response() * 20
+        mock_get.return_value = mock_response
+
+        return client.get("/api/datasets/hospitals_england_wales/", **headers)
+
+
+@pytest.mark.django_db
+def test_get_dataset_etag_and_not_modified(client):
+    resp = _get_hospitals(client)
+    etag = resp["ETag"]
+
+    assert resp["Cache-Control"] == "public, max-age=86400"
+    assert "Accept-Encoding" in resp["Vary"]
+
+    again = _get_hospitals(client, HTTP_IF_NONE_MATCH=etag)
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again["ETag"] == etag
+
+
+@pytest.mark.django_db
+def test_get_dataset_serves_gzip_when_accepted(client):
+    plain = _get_hospitals(client)
+    compressed = _get_hospitals(client, HTTP_ACCEPT_ENCODING="gzip, deflate")
+
+    assert compressed["Content-Encoding"] == "gzip"
+    assert len(compressed.content) < len(plain.content)
+    assert json.loads(gzip.decompress(compressed.content)) == plain.json()
+    # Each encoding has its own strong ETag
+    assert compressed["ETag"] != plain["ETag"]
+    assert (
+        _get_hospitals(
+            client,
+            HTTP_ACCEPT_ENCODING="gzip",
+            HTTP_IF_NONE_MATCH=compressed["ETag"],
+        ).status_code
+        == 304
+    )
+
+
+@pytest.mark.django_db
+def test_get_dataset_payload_encoded_once(client):
+    _get_hospitals(client)
+
+    with patch("checktick_app.surveys.external_datasets.json.dumps") as dumps:
+        resp = _get_hospitals(client)
+
+    assert resp.status_code == 200
+    assert dumps.call_count == 0
+
+
+@pytest.mark.django_db
+def test_get_dataset_payload_follows_refresh(client):
+    from checktick_app.surveys.external_datasets import store_dataset
+
+    first = _get_hospitals(client)
+    store_dataset("hospitals_england_wales", ["ONLY HOSPITAL (X1)"])
+
+    resp = _get_hospitals(client, HTTP_IF_NONE_MATCH=first["ETag"])
+
+    assert resp.status_code == 200
+    assert resp.json()["options"] == ["ONLY HOSPITAL (X1)"]
@@ -41,6 +41,11 @@ urlpatterns = [
     path("health", views.healthcheck, name="healthcheck"),
     path("datasets/", views.list_datasets, name="list_datasets"),
     path("datasets/<str:dataset_key>/", views.get_dataset, name="get_dataset"),
+    path(
+        "datasets/<str:dataset_key>/search/",
+        views.search_dataset,
+        name="search_dataset",
+    ),
     path("token", TokenObtainView.as_view(), name="token_obtain_pair"),
     path("token/refresh", TokenRefView.as_view(), name="token_refresh"),
     # OpenAPI schema (JSON)
@@ -1,12 +1,21 @@
+import hashlib
+import itertools
+import json
 import os
+import re
 import secrets
 from typing import Any
 
 from csp.decorators import csp_exempt
 from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.http import HttpResponse, HttpResponseNotModified, StreamingHttpResponse
 from django.shortcuts import render
 from django.utils import timezone
+from django.utils.cache import patch_vary_headers
 from django.utils.dateparse import parse_datetime
+from django.utils.http import parse_etags
 from rest_framework import permissions, serializers, viewsets
 from rest_framework.decorators import (
     action,
@@ -16,11 +25,14 @@ from rest_framework.decorators import (
 )
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.response import Response
+from rest_framework.reverse import reverse
 
 from checktick_app.surveys.external_datasets import (
+    DATASET_CACHE_TIMEOUT,
     DatasetFetchError,
-    fetch_dataset,
     get_available_datasets,
+    get_dataset_index,
+    get_dataset_payload,
 )
 from checktick_app.surveys.models import (
     AuditLog,
@@ -29,13 +41,30 @@ from checktick_app.surveys.models import (
     QuestionGroup,
     Survey,
     SurveyAccessToken,
+    SurveyDailyStats,
     SurveyMembership,
     SurveyQuestion,
 )
-from checktick_app.surveys.permissions import can_edit_survey, can_view_survey
+from checktick_app.surveys.permissions import (
+    can_edit_survey,
+    can_view_survey,
+    visible_surveys,
+)
 
 User = get_user_model()
 
+# Dataset typeahead search (search_dataset)
+DATASET_SEARCH_DEFAULT_LIMIT = 20
+DATASET_SEARCH_MAX_LIMIT = 100
+DATASET_SEARCH_MAX_QUERY_LENGTH = 100
+DATASET_SEARCH_CACHE_SECONDS = 60 * 5
+
+# Token POSTs minting more than this return a count and a link to
+# tokens/export instead of every new token
+TOKENS_RESPONSE_MAX_ITEMS = 1000
+
+_ACCEPTS_GZIP = re.compile(r"\bgzip\b")
+
 
 class SurveySerializer(serializers.ModelSerializer):
     class Meta:
@@ -101,22 +130,26 @@ class OrgOwnerOrAdminPermission(permissions.BasePermission):
         return can_edit_survey(request.user, obj)
 
 
+class SurveyEditorPermission(permissions.BasePermission):
+    """Object-level permission requiring can_edit_survey for every method.
+
+    For read-only endpoints that expose secrets (e.g. live access tokens).
+    """
+
+    def has_object_permission(self, request, view, obj):
+        return can_edit_survey(request.user, obj)
+
+
 class SurveyViewSet(viewsets.ModelViewSet):
     serializer_class = SurveySerializer
     permission_classes = [permissions.IsAuthenticated, OrgOwnerOrAdminPermission]
 
     def get_queryset(self):
-        user = self.request.user
-        # Owner's surveys
-        owned = Survey.objects.filter(owner=user)
-        # Org-admin surveys: any survey whose organization has the user as ADMIN
-        org_admin = Survey.objects.filter(
-            organization__memberships__user=user,
-            organization__memberships__role=OrganizationMembership.Role.ADMIN,
+        # Owner's surveys, surveys in organizations where the user is ADMIN,
+        # and surveys with an explicit membership, evaluated set-wise
+        return visible_surveys(self.request.user, include_org_owner=False).order_by(
+            "-id"
         )
-        # Survey membership: surveys where user has explicit membership
-        survey_member = Survey.objects.filter(memberships__user=user)
-        return (owned | org_admin | survey_member).distinct()
 
     def get_object(self):
         """Fetch object without scoping to queryset, then run object permissions.
@@ -377,22 +410,14 @@ class SurveyViewSet(viewsets.ModelViewSet):
         SAFE method follows can_view_survey rules via OrgOwnerOrAdminPermission.
         """
         survey = self.get_object()
-        now = timezone.now()
-        start_today = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        total = survey.responses.count()
-        today = survey.responses.filter(submitted_at__gte=start_today).count()
-        last7 = survey.responses.filter(
-            submitted_at__gte=now - timezone.timedelta(days=7)
-        ).count()
-        last14 = survey.responses.filter(
-            submitted_at__gte=now - timezone.timedelta(days=14)
-        ).count()
+        # Read from the daily rollup rather than counting responses
+        stats = SurveyDailyStats.totals(survey)
         return Response(
             {
-                "total": total,
-                "today": today,
-                "last7": last7,
-                "last14": last14,
+                "total": stats["total"],
+                "today": stats["today"],
+                "last7": stats["last7"],
+                "last14": stats["last14"],
             }
         )
 
@@ -402,7 +427,13 @@ class SurveyViewSet(viewsets.ModelViewSet):
         permission_classes=[permissions.IsAuthenticated, OrgOwnerOrAdminPermission],
     )
     def tokens(self, request, pk=None):
-        """List or create invite tokens for a survey."""
+        """
+        List or create invite tokens for a survey.
+
+        A POST minting more than TOKENS_RESPONSE_MAX_ITEMS tokens returns only
+        the count and the tokens/export URL, so the response is never built
+        from the whole batch in memory.
+        """
         survey = self.get_object()
         if request.method.lower() == "get":
             tokens = survey.access_tokens.order_by("-created_at")[:500]
@@ -424,7 +455,7 @@ class SurveyViewSet(viewsets.ModelViewSet):
             count = int(count_raw)
         except Exception:
             count = 0
-        count = max(0, min(count, 1000))
+        count = max(0, min(count, SurveyAccessToken.MAX_BULK))
         note = (request.data.get("note") or "").strip()
         expires_raw = request.data.get("expires_at")
         expires_at = None
@@ -434,25 +465,71 @@ class SurveyViewSet(viewsets.ModelViewSet):
                 if isinstance(expires_raw, str)
                 else expires_raw
             )
-        created = []
-        for _ in range(count):
-            t = SurveyAccessToken(
-                survey=survey,
-                token=secrets.token_urlsafe(24),
-                created_by=request.user,
-                expires_at=expires_at,
-                note=note,
-            )
-            t.save()
-            created.append(
-                {
-                    "token": t.token,
-                    "created_at": t.created_at,
-                    "expires_at": t.expires_at,
-                    "note": t.note,
-                }
-            )
-        return Response({"created": len(created), "items": created})
+        list_items = count <= TOKENS_RESPONSE_MAX_ITEMS
+        created = 0
+        items = []
+        with transaction.atomic():
+            for batch in SurveyAccessToken.mint_batches(
+                survey, request.user, itertools.repeat(note, count), expires_at
+            ):
+                created += len(batch)
+                if list_items:
+                    items.extend(
+                        {
+                            "token": t.token,
+                            "created_at": t.created_at,
+                            "expires_at": t.expires_at,
+                            "note": t.note,
+                        }
+                        for t in batch
+                    )
+        if list_items:
+            return Response({"created": created, "items": items})
+        return Response(
+            {
+                "created": created,
+                "items": [],
+                "export": reverse(
+                    "survey-tokens-export", kwargs={"pk": survey.pk}, request=request
+                ),
+                "detail": (
+                    f"More than {TOKENS_RESPONSE_MAX_ITEMS} tokens were created; "
+                    "download them from the export URL."
+                ),
+            }
+        )
+
+    @action(
+        detail=True,
+        methods=["get"],
+        url_path="tokens/export",
+        permission_classes=[permissions.IsAuthenticated, SurveyEditorPermission],
+    )
+    def tokens_export(self, request, pk=None):
+        """
+        Stream every invite token for a survey as a JSON document.
+
+        The export contains live access tokens, so it needs edit permission
+        (like the SSR CSV export), not just view permission.
+        """
+        survey = self.get_object()
+        rows = (
+            survey.access_tokens.order_by("id")
+            .values("token", "created_at", "expires_at", "used_at", "used_by", "note")
+            .iterator(chunk_size=2000)
+        )
+
+        def generate():
+            yield '{"items": ['
+            buf = []
+            for i, row in enumerate(rows):
+                buf.append(("," if i else "") + json.dumps(row, cls=DjangoJSONEncoder))
+                if len(buf) == 1000:
+                    yield "".join(buf)
+                    buf = []
+            yield "".join(buf) + "]}"
+
+        return StreamingHttpResponse(generate(), content_type="application/json")
 
 
 class OrganizationMembershipSerializer(serializers.ModelSerializer):
@@ -788,17 +865,121 @@ def get_dataset(request, dataset_key):
 
     Returns cached data when available to minimize external API calls.
     Allows anonymous access to support public survey submissions.
+
+    The JSON is encoded (and gzip-compressed) once per cached copy and sent
+    as is, with an ETag so that browsers revalidate rather than download it
+    again.
+    """
+    try:
+        payload = get_dataset_payload(dataset_key)
+    except DatasetFetchError as e:
+        return _dataset_error_response(e)
+    return _conditional_json_response(
+        request,
+        payload["body"],
+        payload["etag"],
+        DATASET_CACHE_TIMEOUT,
+        gzip_body=payload["gzip"],
+    )
+
+
+def _dataset_error_response(error: DatasetFetchError) -> Response:
+    # Unknown keys are client errors; upstream API failures are 502 Bad Gateway
+    error_msg = str(error)
+    if "Unknown dataset key" in error_msg:
+        return Response({"error": error_msg}, status=400)
+    return Response({"error": error_msg}, status=502)
+
+
+def _conditional_json_response(
+    request,
+    body: bytes,
+    digest: str,
+    max_age: int,
+    gzip_body: bytes | None = None,
+) -> HttpResponse:
+    """
+    Serve JSON bytes with a strong ETag and public Cache-Control.
+
+    Answers 304 Not Modified when If-None-Match already has this body. When
+    gzip_body is given it is sent to clients accepting gzip, under its own
+    ETag (a strong ETag identifies the exact bytes sent).
+    """
+    use_gzip = gzip_body is not None and _ACCEPTS_GZIP.search(
+        request.META.get("HTTP_ACCEPT_ENCODING", "")
+    )
+    etag = f'"{digest}-gzip"' if use_gzip else f'"{digest}"'
+    if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+    if if_none_match and etag in parse_etags(if_none_match):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(
+            gzip_body if use_gzip else body, content_type="application/json"
+        )
+        if use_gzip:
+            response["Content-Encoding"] = "gzip"
+    response["ETag"] = etag
+    response["Cache-Control"] = f"public, max-age={max_age}"
+    if gzip_body is not None:
+        patch_vary_headers(response, ("Accept-Encoding",))
+    return response
+
+
+def _etagged_json_response(request, payload: dict, max_age: int) -> HttpResponse:
+    """Compact JSON response for payload, see _conditional_json_response."""
+    body = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode()
+    return _conditional_json_response(
+        request, body, hashlib.sha256(body).hexdigest()[:32], max_age
+    )
+
+
+def _int_query_param(request, name: str, default: int, maximum: int | None = None):
+    """Non-negative integer query parameter, capped at maximum; None if invalid."""
+    raw = request.query_params.get(name)
+    if raw in (None, ""):
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        return None
+    if value < 0:
+        return None
+    return min(value, maximum) if maximum is not None else value
+
+
+@api_view(["GET"])
+@permission_classes([permissions.AllowAny])
+def search_dataset(request, dataset_key):
+    """
+    Typeahead search over a dataset's options.
+
+    Query parameters: q (words matched against the start of option words and
+    codes), limit (default 20, max 100) and offset. Returns compact JSON
+    ({"dataset_key", "q", "total", "results"}) with an ETag, so survey pages
+    fetch a few matches rather than the whole list. Allows anonymous access to
+    support public survey submissions.
     """
+    query = request.query_params.get("q", "")[:DATASET_SEARCH_MAX_QUERY_LENGTH]
+    limit = _int_query_param(
+        request, "limit", DATASET_SEARCH_DEFAULT_LIMIT, DATASET_SEARCH_MAX_LIMIT
+    )
+    offset = _int_query_param(request, "offset", 0)
+    if limit is None or offset is None:
+        return Response(
+            {"error": "limit and offset must be non-negative integers"}, status=400
+        )
+
     try:
-        options = fetch_dataset(dataset_key)
-        return Response({"dataset_key": dataset_key, "options": options})
+        index = get_dataset_index(dataset_key)
     except DatasetFetchError as e:
-        # Check if it's a validation error (invalid key) vs external API error
-        error_msg = str(e)
-        if "Unknown dataset key" in error_msg:
-            return Response({"error": error_msg}, status=400)
-        # External API failures return 502 Bad Gateway
-        return Response({"error": error_msg}, status=502)
+        return _dataset_error_response(e)
+
+    total, results = index.search(query, limit=limit, offset=offset)
+    return _etagged_json_response(
+        request,
+        {"dataset_key": dataset_key, "q": query, "total": total, "results": results},
+        DATASET_SEARCH_CACHE_SECONDS,
+    )
 
 
 @csp_exempt
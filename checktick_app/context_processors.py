@@ -1,8 +1,12 @@
+from functools import lru_cache
 import os
 import subprocess
+import time
 
 from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.signals import setting_changed
 
 from checktick_app.surveys.models import OrganizationMembership, SurveyMembership
 
@@ -18,6 +22,18 @@ except Exception:  # pragma: no cover - tolerate missing model during migrations
 
 _GIT_CACHE = None
 
+# Per-user capability flags (navigation links shown in base.html). Entries are
+# keyed by a per-user version which membership changes bump, so stale flags
+# become unreachable instead of needing to be found and deleted. The join
+# time is part of the key so a reused primary key never matches an older
+# account's entry. Versions and flags live in the cache, so a bump only
+# reaches every worker process when CACHES is a shared backend (Redis,
+# Memcached, database); with the default local-memory cache other workers
+# may show stale links until CAPABILITIES_CACHE_TIMEOUT passes.
+CAPABILITIES_CACHE_KEY = "ui-capabilities:{user_id}:{joined}:{version}"
+CAPABILITIES_VERSION_KEY = "ui-capabilities-version:{user_id}"
+CAPABILITIES_CACHE_TIMEOUT = 60 * 60
+
 
 def _get_git_info():
     global _GIT_CACHE
@@ -87,25 +103,57 @@ def _get_git_info():
     return info
 
 
-def branding(request):
-    """Inject platform branding defaults into all templates.
+def _capabilities_version(user_id: int):
+    # A missing version (never set, or evicted) starts a fresh namespace
+    # rather than resurrecting entries cached under an earlier version
+    return cache.get_or_set(
+        CAPABILITIES_VERSION_KEY.format(user_id=user_id), time.time_ns, None
+    )
 
-    These can be overridden per-survey by passing variables with the same names in a view.
+
+def invalidate_user_capabilities(sender, instance, **kwargs):
+    """Signal receiver: a membership changed, so recompute the user's flags."""
+    user_id = getattr(instance, "user_id", None)
+    if user_id is None:
+        return
+    key = CAPABILITIES_VERSION_KEY.format(user_id=user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+def user_capabilities(user) -> dict:
+    """Capability flags for the navigation, cached per user.
+
+    Returns:
+        Dict with can_manage_any_users (org admin anywhere, or creator of
+        any survey)
     """
-    # Compute a lightweight flag to show/hide the User management link
-    user = getattr(request, "user", AnonymousUser())
-    can_manage_any_users = False
-    if user and user.is_authenticated:
-        can_manage_any_users = (
-            OrganizationMembership.objects.filter(
-                user=user, role=OrganizationMembership.Role.ADMIN
-            ).exists()
-            or SurveyMembership.objects.filter(
-                user=user, role=SurveyMembership.Role.CREATOR
-            ).exists()
-        )
+    key = CAPABILITIES_CACHE_KEY.format(
+        user_id=user.pk,
+        joined=user.date_joined.timestamp() if user.date_joined else "",
+        version=_capabilities_version(user.pk),
+    )
+    capabilities = cache.get(key)
+    if capabilities is None:
+        capabilities = {
+            "can_manage_any_users": (
+                OrganizationMembership.objects.filter(
+                    user=user, role=OrganizationMembership.Role.ADMIN
+                ).exists()
+                or SurveyMembership.objects.filter(
+                    user=user, role=SurveyMembership.Role.CREATOR
+                ).exists()
+            )
+        }
+        cache.set(key, capabilities, CAPABILITIES_CACHE_TIMEOUT)
+    return capabilities
 
-    # Defaults from settings
+
+@lru_cache(maxsize=1)
+def _settings_brand() -> dict:
+    """Brand defaults derived from settings (computed once per process)."""
     brand = {
         "title": getattr(settings, "BRAND_TITLE", "CheckTick"),
         # Only set when explicitly configured
@@ -151,6 +199,54 @@ def branding(request):
         brand["icon_size_class"] = size_class or "w-6 h-6"
     except Exception:
         brand["icon_size_class"] = "w-6 h-6"
+    return brand
+
+
+@lru_cache(maxsize=1)
+def _build_info() -> dict:
+    """Build/version metadata (computed once per process)."""
+    git = _get_git_info()
+    # Resolve version: env -> settings -> installed package metadata -> 'dev'
+    version_val = os.environ.get("APP_VERSION") or getattr(
+        settings, "APP_VERSION", None
+    )
+    if not version_val and _importlib_metadata is not None:
+        try:
+            version_val = _importlib_metadata.version("checktick")
+        except Exception:
+            version_val = None
+    return {
+        "version": version_val or "dev",
+        "timestamp": os.environ.get("BUILD_TIMESTAMP")
+        or getattr(settings, "BUILD_TIMESTAMP", None),
+        "commit": git.get("commit"),
+        "branch": git.get("branch"),
+        "commit_date": git.get("commit_date"),
+    }
+
+
+def _clear_settings_caches(**kwargs):
+    # override_settings in tests changes settings within a process
+    _settings_brand.cache_clear()
+    _build_info.cache_clear()
+
+
+setting_changed.connect(_clear_settings_caches)
+
+
+def branding(request):
+    """Inject platform branding defaults into all templates.
+
+    These can be overridden per-survey by passing variables with the same names in a view.
+    """
+    # Compute a lightweight flag to show/hide the User management link
+    user = getattr(request, "user", AnonymousUser())
+    can_manage_any_users = False
+    if user and user.is_authenticated:
+        can_manage_any_users = user_capabilities(user)["can_manage_any_users"]
+
+    # Defaults from settings
+    brand = dict(_settings_brand())
     # Overlay with DB-stored SiteBranding if present
     if SiteBranding is not None:
         try:
@@ -187,25 +283,7 @@ def branding(request):
             # During migrations or early setup, ignore DB failures
             pass
 
-    # Build/version metadata
-    git = _get_git_info()
-    # Resolve version: env -> settings -> installed package metadata -> 'dev'
-    version_val = os.environ.get("APP_VERSION") or getattr(
-        settings, "APP_VERSION", None
-    )
-    if not version_val and _importlib_metadata is not None:
-        try:
-            version_val = _importlib_metadata.version("checktick")
-        except Exception:
-            version_val = None
-    build = {
-        "version": version_val or "dev",
-        "timestamp": os.environ.get("BUILD_TIMESTAMP")
-        or getattr(settings, "BUILD_TIMESTAMP", None),
-        "commit": git.get("commit"),
-        "branch": git.get("branch"),
-        "commit_date": git.get("commit_date"),
-    }
+    build = dict(_build_info())
 
     return {
         "brand": brand,
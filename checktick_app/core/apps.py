@@ -5,3 +5,21 @@ class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "checktick_app.core"
     verbose_name = "Core"
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_save
+
+        from .middleware import invalidate_user_language
+        from .models import UserLanguagePreference
+
+        # The language middleware serves preferences from the cache
+        post_save.connect(
+            invalidate_user_language,
+            sender=UserLanguagePreference,
+            dispatch_uid="core_language_preference_saved",
+        )
+        post_delete.connect(
+            invalidate_user_language,
+            sender=UserLanguagePreference,
+            dispatch_uid="core_language_preference_deleted",
+        )
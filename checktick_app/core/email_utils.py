@@ -7,6 +7,8 @@ theming (for survey-specific emails).
 from __future__ import annotations
 
 import logging
+import re
+import secrets
 from typing import Any, Dict, Optional
 
 from django.conf import settings
@@ -105,15 +107,15 @@ def markdown_to_html(markdown_text: str) -> str:
     )
 
 
-def send_branded_email(
+def build_branded_email(
     to_email: str,
     subject: str,
     markdown_content: str,
     branding: Optional[Dict[str, Any]] = None,
     context: Optional[Dict[str, Any]] = None,
     from_email: Optional[str] = None,
-) -> bool:
-    """Send a branded email with markdown content.
+) -> EmailMultiAlternatives:
+    """Build (but do not send) a branded email with markdown content.
 
     Args:
         to_email: Recipient email address
@@ -124,7 +126,7 @@ def send_branded_email(
         from_email: Sender email (defaults to DEFAULT_FROM_EMAIL)
 
     Returns:
-        True if email sent successfully, False otherwise
+        The message with plain-text body and HTML alternative attached
     """
     if not branding:
         branding = get_platform_branding()
@@ -177,15 +179,48 @@ def send_branded_email(
     # Generate plain text version
     plain_message = strip_tags(html_content)
 
+    email = EmailMultiAlternatives(
+        subject=subject,
+        body=plain_message,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=[to_email],
+    )
+    email.attach_alternative(html_message, "text/html")
+    return email
+
+
+def send_branded_email(
+    to_email: str,
+    subject: str,
+    markdown_content: str,
+    branding: Optional[Dict[str, Any]] = None,
+    context: Optional[Dict[str, Any]] = None,
+    from_email: Optional[str] = None,
+) -> bool:
+    """Send a branded email with markdown content.
+
+    Args:
+        to_email: Recipient email address
+        subject: Email subject line
+        markdown_content: Email body in markdown format
+        branding: Brand configuration (platform or survey-level)
+        context: Additional template context variables
+        from_email: Sender email (defaults to DEFAULT_FROM_EMAIL)
+
+    Returns:
+        True if email sent successfully, False otherwise
+    """
+    email = build_branded_email(
+        to_email=to_email,
+        subject=subject,
+        markdown_content=markdown_content,
+        branding=branding,
+        context=context,
+        from_email=from_email,
+    )
+
     # Send email
     try:
-        email = EmailMultiAlternatives(
-            subject=subject,
-            body=plain_message,
-            from_email=from_email or settings.DEFAULT_FROM_EMAIL,
-            to=[to_email],
-        )
-        email.attach_alternative(html_message, "text/html")
         email.send()
         logger.info(f"Email sent successfully to {to_email}: {subject}")
         return True
@@ -369,13 +404,13 @@ def send_survey_deleted_email(user, survey_name: str, survey_slug: str) -> bool:
     )
 
 
-def send_survey_invite_email(
+def build_survey_invite_email(
     to_email: str,
     survey,
     token: str,
     contact_email: Optional[str] = None,
-) -> bool:
-    """Send survey invitation email with unique token link.
+) -> EmailMultiAlternatives:
+    """Build (but do not send) a survey invitation email.
 
     Args:
         to_email: Recipient email address
@@ -384,14 +419,10 @@ def send_survey_invite_email(
         contact_email: Optional contact email for questions
 
     Returns:
-        True if email sent successfully, False otherwise
+        The branded invitation message
     """
     from django.conf import settings
 
-    logger.info(
-        f"Attempting to send survey invite email to {to_email} for survey: {survey.name} ({survey.slug})"
-    )
-
     branding = get_survey_branding(survey)
 
     # Build the survey link with token
@@ -424,7 +455,7 @@ def send_survey_invite_email(
         },
     )
 
-    return send_branded_email(
+    return build_branded_email(
         to_email=to_email,
         subject=subject,
         markdown_content=markdown_content,
@@ -437,3 +468,93 @@ def send_survey_invite_email(
             "contact_email": contact_email,
         },
     )
+
+
+class CompiledSurveyInvite:
+    """A survey's invitation email, rendered once for many recipients.
+
+    Only the token differs between invitations to the same survey (from the
+    same contact), so the markdown, branding and HTML are rendered once with
+    a random placeholder token; build() substitutes each recipient's token
+    into the finished subject, plain-text and HTML bodies.
+
+    The placeholder is alphanumeric and the token only appears in the link
+    URL and a code block, where markdown leaves it untouched, so the output
+    is identical to build_survey_invite_email(). Tokens outside the
+    URL-safe alphabet are rendered in full instead.
+    """
+
+    SAFE_TOKEN = re.compile(r"^[A-Za-z0-9_-]+$")
+
+    def __init__(self, survey, contact_email: Optional[str] = None):
+        self.survey = survey
+        self.contact_email = contact_email
+        self.placeholder = f"ctinvite{secrets.token_hex(16)}"
+        template = build_survey_invite_email(
+            "", survey, self.placeholder, contact_email
+        )
+        self.subject = template.subject
+        self.from_email = template.from_email
+        self.body = template.body
+        self.html = template.alternatives[0][0]
+
+    def build(self, to_email: str, token: str) -> EmailMultiAlternatives:
+        """Build the invitation for one recipient."""
+        if not self.SAFE_TOKEN.match(token):
+            return build_survey_invite_email(
+                to_email, self.survey, token, self.contact_email
+            )
+        email = EmailMultiAlternatives(
+            subject=self.subject.replace(self.placeholder, token),
+            body=self.body.replace(self.placeholder, token),
+            from_email=self.from_email,
+            to=[to_email],
+        )
+        email.attach_alternative(
+            self.html.replace(self.placeholder, token), "text/html"
+        )
+        return email
+
+
+def send_survey_invite_email(
+    to_email: str,
+    survey,
+    token: str,
+    contact_email: Optional[str] = None,
+) -> bool:
+    """Send survey invitation email with unique token link.
+
+    Bulk invitations are queued as InviteMessage rows and delivered by the
+    process_invite_outbox worker instead; this is used for single resends.
+
+    Args:
+        to_email: Recipient email address
+        survey: Survey object
+        token: Unique access token string
+        contact_email: Optional contact email for questions
+
+    Returns:
+        True if email sent successfully, False otherwise
+    """
+    logger.info(
+        f"Attempting to send survey invite email to {to_email} for survey: {survey.name} ({survey.slug})"
+    )
+
+    email = build_survey_invite_email(to_email, survey, token, contact_email)
+    try:
+        email.send()
+        logger.info(f"Email sent successfully to {to_email}: {email.subject}")
+        return True
+    except Exception as e:
+        logger.error(
+            f"Failed to send email to {to_email}: {email.subject}",
+            exc_info=True,
+            extra={
+                "recipient": to_email,
+                "subject": email.subject,
+                "error_type": type(e).__name__,
+                "from_email": email.from_email,
+                "email_backend": settings.EMAIL_BACKEND,
+            },
+        )
+        return False
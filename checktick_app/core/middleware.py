@@ -1,10 +1,68 @@
 """Custom middleware for CheckTick application."""
 
+import logging
+import time
+
+from django.core.cache import cache
 from django.utils import translation
 
+logger = logging.getLogger(__name__)
+
 # Django's session key for storing language preference
 LANGUAGE_SESSION_KEY = "_language"
 
+# Cached UserLanguagePreference.language per user ("" when none is saved).
+# Entries are keyed by a per-user version which saving or deleting the
+# preference bumps, so a change made from any device makes the old entry
+# unreachable. The join time is part of the key so a reused primary key never
+# matches an older account's entry. Versions live in the cache, so a bump
+# only reaches every worker process when CACHES is a shared backend (Redis,
+# Memcached, database).
+LANGUAGE_CACHE_KEY = "user-language:{user_id}:{joined}:{version}"
+LANGUAGE_VERSION_KEY = "user-language-version:{user_id}"
+LANGUAGE_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def _language_version(user_id: int):
+    # A missing version (never set, or evicted) starts a fresh namespace
+    # rather than resurrecting entries cached under an earlier version
+    return cache.get_or_set(
+        LANGUAGE_VERSION_KEY.format(user_id=user_id), time.time_ns, None
+    )
+
+
+def get_user_language(user) -> str:
+    """The user's saved interface language, or "" if they have none.
+
+    Read from the cache; the database is only queried on a miss.
+    """
+    key = LANGUAGE_CACHE_KEY.format(
+        user_id=user.pk,
+        joined=user.date_joined.timestamp() if user.date_joined else "",
+        version=_language_version(user.pk),
+    )
+    language = cache.get(key)
+    if language is None:
+        # Import here to avoid circular imports
+        from checktick_app.core.models import UserLanguagePreference
+
+        language = (
+            UserLanguagePreference.objects.filter(user=user)
+            .values_list("language", flat=True)
+            .first()
+        ) or ""
+        cache.set(key, language, LANGUAGE_CACHE_TIMEOUT)
+    return language
+
+
+def invalidate_user_language(sender, instance, **kwargs):
+    """Signal receiver: a preference was saved or deleted, so re-read it."""
+    key = LANGUAGE_VERSION_KEY.format(user_id=instance.user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
 
 class UserLanguageMiddleware:
     """Middleware to set language based on user's saved preference.
@@ -16,6 +74,10 @@ class UserLanguageMiddleware:
 
     This takes precedence over browser language detection but can
     still be overridden by explicit session language setting.
+
+    The preference is read through the cache (see get_user_language), and
+    the session is only written when its stored language differs, so a
+    typical authenticated request costs neither a query nor a session save.
     """
 
     def __init__(self, get_response):
@@ -25,33 +87,27 @@ class UserLanguageMiddleware:
         # Only apply if user is authenticated and has a preference
         if request.user.is_authenticated:
             try:
-                # Import here to avoid circular imports
-                from checktick_app.core.models import UserLanguagePreference
-
-                preference = UserLanguagePreference.objects.filter(
-                    user=request.user
-                ).first()
-                if preference and preference.language:
+                language = get_user_language(request.user)
+                if language:
                     # Activate the user's preferred language
-                    language = preference.language
-                    print(
-                        f"DEBUG Middleware: User {request.user.username} has language preference: {language}"
-                    )
-                    # Normalize language code (en-gb -> en-gb)
                     translation.activate(language)
                     request.LANGUAGE_CODE = language
                     # Also set in session so it persists across requests
-                    if hasattr(request, "session"):
-                        session_lang_before = request.session.get(LANGUAGE_SESSION_KEY)
-                        request.session[LANGUAGE_SESSION_KEY] = language
-                        request.session.modified = True
-                        print(
-                            f"DEBUG Middleware: Session language was: {session_lang_before}, now: {language}"
-                        )
+                    session = getattr(request, "session", None)
+                    if session is not None:
+                        session_language = session.get(LANGUAGE_SESSION_KEY)
+                        if session_language != language:
+                            session[LANGUAGE_SESSION_KEY] = language
+                            logger.debug(
+                                "User %s language preference %s (session had %s)",
+                                request.user.pk,
+                                language,
+                                session_language,
+                            )
             except Exception:
                 # If anything goes wrong (e.g., table doesn't exist yet during migration),
                 # just continue without setting language preference
-                pass
+                logger.debug("Could not apply user language preference", exc_info=True)
 
         response = self.get_response(request)
         return response
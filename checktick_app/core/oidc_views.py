@@ -320,9 +320,12 @@ def oidc_logout_view(request: HttpRequest) -> HttpResponse:
 
     Ensures encryption session data is properly cleared.
     """
+    from checktick_app.surveys.key_cache import clear_session_keys
+
     # Clear any encryption session data
     if "survey_encryption_keys" in request.session:
         del request.session["survey_encryption_keys"]
+    clear_session_keys(request=request)
 
     # Standard logout redirect
     return redirect(settings.LOGOUT_REDIRECT_URL)
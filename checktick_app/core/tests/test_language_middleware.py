@@ -0,0 +1,119 @@
+from django.contrib.auth.models import User
+from django.contrib.sessions.backends.db import SessionStore
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.utils import translation
+import pytest
+
+from checktick_app.core.middleware import LANGUAGE_SESSION_KEY, UserLanguageMiddleware
+from checktick_app.core.models import UserLanguagePreference
+
+
+@pytest.fixture(autouse=True)
+def _reset_translation():
+    yield
+    translation.deactivate()
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(username="polyglot", password="x")
+
+
+def _request(user, session):
+    """Run one request through the middleware; return what the view saw."""
+    request = RequestFactory().get("/")
+    request.user = user
+    request.session = session
+    seen = {}
+
+    def view(req):
+        seen["language"] = translation.get_language()
+        seen["code"] = getattr(req, "LANGUAGE_CODE", None)
+        return HttpResponse()
+
+    UserLanguageMiddleware(view)(request)
+    return seen
+
+
+def _language_queries(ctx):
+    return [q for q in ctx.captured_queries if "languagepreference" in q["sql"]]
+
+
+@pytest.mark.django_db
+class TestUserLanguageMiddleware:
+    def test_warm_request_skips_query_and_session_write(self, user):
+        UserLanguagePreference.objects.create(user=user, language="fr")
+        session = SessionStore()
+        session.create()
+
+        assert _request(user, session)["code"] == "fr"
+        assert session[LANGUAGE_SESSION_KEY] == "fr"
+        session.save()
+
+        session = SessionStore(session_key=session.session_key)
+        with CaptureQueriesContext(connection) as ctx:
+            seen = _request(user, session)
+
+        assert seen == {"language": "fr", "code": "fr"}
+        assert _language_queries(ctx) == []
+        assert not session.modified
+
+    def test_preference_change_is_picked_up(self, user):
+        preference = UserLanguagePreference.objects.create(user=user, language="fr")
+        session = SessionStore()
+        _request(user, session)
+
+        preference.language = "de"
+        preference.save()
+
+        assert _request(user, session)["code"] == "de"
+        assert session[LANGUAGE_SESSION_KEY] == "de"
+
+    def test_no_preference_is_cached(self, user):
+        session = SessionStore()
+        _request(user, session)
+
+        with CaptureQueriesContext(connection) as ctx:
+            seen = _request(user, session)
+
+        assert seen["code"] is None
+        assert _language_queries(ctx) == []
+        assert LANGUAGE_SESSION_KEY not in session
+
+    def test_deleted_preference_stops_applying(self, user):
+        preference = UserLanguagePreference.objects.create(user=user, language="fr")
+        _request(user, SessionStore())
+
+        preference.delete()
+
+        assert _request(user, SessionStore())["code"] is None
+
+    def test_change_from_another_device_reaches_existing_session(self, user):
+        UserLanguagePreference.objects.create(user=user, language="fr")
+        session = SessionStore()
+        _request(user, session)
+
+        other_device = UserLanguagePreference.objects.get(user=user)
+        other_device.language = "de"
+        other_device.save()
+
+        assert _request(user, session)["code"] == "de"
+        assert session[LANGUAGE_SESSION_KEY] == "de"
+
+    def test_deleting_user_with_preference(self, user):
+        UserLanguagePreference.objects.create(user=user, language="fr")
+        _request(user, SessionStore())
+
+        user.delete()
+
+        assert not UserLanguagePreference.objects.exists()
+
+    def test_does_not_print(self, user, capsys):
+        UserLanguagePreference.objects.create(user=user, language="fr")
+
+        _request(user, SessionStore())
+
+        assert capsys.readouterr().out == ""
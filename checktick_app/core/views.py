@@ -72,15 +72,14 @@ def profile(request):
             translation.activate(saved_pref.language)
             request.LANGUAGE_CODE = saved_pref.language
             request.session[LANGUAGE_SESSION_KEY] = saved_pref.language
-            request.session.modified = True
-            print(f"DEBUG: Saved language: {saved_pref.language}")
-            print(
-                f"DEBUG: Session key set to: {request.session.get(LANGUAGE_SESSION_KEY)}"
+            logger.debug(
+                "User %s saved language preference %s",
+                request.user.pk,
+                saved_pref.language,
             )
-            print(f"DEBUG: request.LANGUAGE_CODE: {request.LANGUAGE_CODE}")
             messages.success(request, _("Language preference updated successfully."))
         else:
-            print(f"DEBUG: Form errors: {form.errors}")
+            logger.debug("Language preference form errors: %s", form.errors)
             messages.error(
                 request, _("There was an error updating your language preference.")
             )
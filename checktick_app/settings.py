@@ -46,6 +46,9 @@ if env_file.exists():
 
 DEBUG = env("DEBUG")
 SECRET_KEY = env("SECRET_KEY") or os.urandom(32)
+# Without a configured SECRET_KEY every process generates its own, so values
+# sealed by one process (queued export file keys) cannot be opened by another
+SECRET_KEY_CONFIGURED = bool(env("SECRET_KEY"))
 ALLOWED_HOSTS = env("ALLOWED_HOSTS")
 
 DATABASES = {
@@ -83,6 +86,7 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "checktick_app.surveys.permissions.PermissionContextMiddleware",
     "checktick_app.core.middleware.UserLanguageMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
@@ -170,6 +174,17 @@ STATICFILES_DIRS = [BASE_DIR / "checktick_app" / "static"]
 WHITENOISE_USE_FINDERS = True
 WHITENOISE_MAX_AGE = 31536000 if not DEBUG else 0
 
+# Generated data exports are written once and streamed back on download.
+# Kept outside MEDIA_ROOT so they are never served as public media; point the
+# "exports" alias at object storage (S3/Azure) in production if preferred.
+EXPORTS_STORAGE = {
+    "BACKEND": "django.core.files.storage.FileSystemStorage",
+    "OPTIONS": {
+        "location": os.environ.get("CHECKTICK_EXPORT_ROOT", str(BASE_DIR / "exports")),
+        "base_url": None,
+    },
+}
+
 # Use manifest storage with cache busting in production only
 # In development/testing, use regular storage to avoid collectstatic requirement
 if DEBUG:
@@ -180,6 +195,7 @@ if DEBUG:
         "staticfiles": {
             "BACKEND": "whitenoise.storage.CompressedStaticFilesStorage",
         },
+        "exports": EXPORTS_STORAGE,
     }
 else:
     STORAGES = {
@@ -189,6 +205,7 @@ else:
         "staticfiles": {
             "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
         },
+        "exports": EXPORTS_STORAGE,
     }
 
 # Media uploads (used for admin-uploaded icons if configured)
@@ -324,6 +341,11 @@ EXTERNAL_DATASET_API_URL = os.environ.get(
     "EXTERNAL_DATASET_API_URL", "https://api.rcpch.ac.uk"
 )
 EXTERNAL_DATASET_API_KEY = os.environ.get("EXTERNAL_DATASET_API_KEY", "")
+# Last good copy of each dataset, served on cold starts and upstream outages
+# (set to an empty string to disable snapshots)
+EXTERNAL_DATASET_SNAPSHOT_DIR = os.environ.get(
+    "EXTERNAL_DATASET_SNAPSHOT_DIR", str(BASE_DIR / "dataset_snapshots")
+)
 
 # Data Governance Configuration
 # These settings control data retention and export policies for GDPR/healthcare compliance
@@ -1,118 +1,95 @@
 /**
  * Professional Fields Auto-Complete
  *
- * Automatically loads dataset options for professional detail fields
- * that have associated RCPCH API endpoints (trusts, health boards, etc.)
+ * Turns professional detail fields that have associated RCPCH API endpoints
+ * (trusts, health boards, etc.) into typeahead inputs. Matching options are
+ * fetched from the dataset search endpoint as the user types, so the page
+ * never downloads the full dataset.
  */
 
 document.addEventListener("DOMContentLoaded", function () {
-  const datasetFields = document.querySelectorAll("[data-dataset-field]");
+  const SEARCH_LIMIT = 20;
+  const DEBOUNCE_MS = 200;
 
-  console.log(
-    `[Professional Fields] Found ${datasetFields.length} fields with dataset mapping`
+  const datasetFields = document.querySelectorAll(
+    "select[data-dataset-field]:not([disabled])"
   );
 
-  datasetFields.forEach(async function (select) {
+  datasetFields.forEach(function (select, i) {
     const datasetKey = select.dataset.datasetKey;
     const fieldKey = select.dataset.datasetField;
 
-    console.log(
-      `[Professional Fields] Processing field: ${fieldKey}, dataset: ${datasetKey}`
-    );
-
     if (!datasetKey) {
       console.warn(`No dataset key for field: ${fieldKey}`);
       return;
     }
 
-    try {
-      // Fetch dataset options from API
-      console.log(
-        `[Professional Fields] Fetching /api/datasets/${datasetKey}/`
-      );
-      const response = await fetch(`/api/datasets/${datasetKey}/`, {
-        credentials: "same-origin",
-      });
-
-      if (!response.ok) {
-        throw new Error(`HTTP ${response.status}: ${response.statusText}`);
-      }
-
-      const data = await response.json();
-
-      // Clear loading option
-      select.innerHTML = "";
-
-      // Add default "select" option
-      const defaultOption = document.createElement("option");
-      defaultOption.value = "";
-      defaultOption.textContent = `-- Select ${
-        select.closest("[data-professional-field]")?.dataset
-          .professionalField || "option"
-      } --`;
-      select.appendChild(defaultOption);
-
-      // Add fetched options
-      if (data.options && Array.isArray(data.options)) {
-        data.options.forEach(function (optionText) {
-          const option = document.createElement("option");
-          option.value = optionText;
-          option.textContent = optionText;
-          select.appendChild(option);
-        });
-
-        console.log(
-          `Loaded ${data.options.length} options for ${fieldKey} from ${datasetKey}`
+    const label =
+      select.closest("[data-professional-field]")?.querySelector(".label-text")
+        ?.textContent || "option";
+
+    // Text input + datalist keep the field's name, so the submitted value is
+    // unchanged; values not in the dataset can still be typed manually
+    const datalist = document.createElement("datalist");
+    datalist.id = `dataset-options-${fieldKey}-${i}`;
+
+    const input = document.createElement("input");
+    input.type = "text";
+    input.name = select.name;
+    input.placeholder = `Start typing to search ${label}`;
+    input.className = "input input-bordered input-sm w-full";
+    input.autocomplete = "off";
+    input.setAttribute("list", datalist.id);
+    input.dataset.datasetField = fieldKey;
+    input.dataset.datasetKey = datasetKey;
+
+    select.replaceWith(input);
+    input.after(datalist);
+
+    let timer = null;
+    let controller = null;
+
+    async function search(query) {
+      if (controller) controller.abort();
+      controller = new AbortController();
+      const params = new URLSearchParams({ q: query, limit: SEARCH_LIMIT });
+      try {
+        const response = await fetch(
+          `/api/datasets/${datasetKey}/search/?${params}`,
+          { credentials: "same-origin", signal: controller.signal }
+        );
+        if (!response.ok) {
+          throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+        }
+        const data = await response.json();
+        datalist.replaceChildren(
+          ...(data.results || []).map(function (optionText) {
+            const option = document.createElement("option");
+            option.value = optionText;
+            return option;
+          })
         );
-      } else {
-        console.warn(`No options returned for ${datasetKey}`);
+      } catch (error) {
+        if (error.name === "AbortError") return;
+        console.error(
+          `Failed to search dataset ${datasetKey} for field ${fieldKey}:`,
+          error
+        );
+        // Leave the input usable for manual entry
+        datalist.replaceChildren();
       }
-    } catch (error) {
-      console.error(
-        `Failed to load dataset ${datasetKey} for field ${fieldKey}:`,
-        error
-      );
-
-      // Show error state
-      select.innerHTML = "";
-      const errorOption = document.createElement("option");
-      errorOption.value = "";
-      errorOption.textContent = `Error loading options - please refresh`;
-      errorOption.disabled = true;
-      errorOption.selected = true;
-      select.appendChild(errorOption);
-
-      // Add manual entry option as fallback
-      const manualOption = document.createElement("option");
-      manualOption.value = "__manual__";
-      manualOption.textContent = "Enter manually...";
-      select.appendChild(manualOption);
     }
-  });
 
-  // Handle manual entry option
-  document.addEventListener("change", function (e) {
-    const select = e.target;
-    if (
-      select.matches("[data-dataset-field]") &&
-      select.value === "__manual__"
-    ) {
-      const field = select.dataset.datasetField;
-      const label =
-        select
-          .closest("[data-professional-field]")
-          ?.querySelector(".label-text")?.textContent || "Value";
-
-      // Replace select with text input
-      const input = document.createElement("input");
-      input.type = "text";
-      input.name = `prof_${field}`;
-      input.placeholder = `Enter ${label}`;
-      input.className = "input input-bordered input-sm w-full";
-
-      const wrapper = select.closest("label") || select.parentElement;
-      wrapper.replaceChild(input, select);
-      input.focus();
-    }
+    input.addEventListener("input", function () {
+      clearTimeout(timer);
+      const query = input.value.trim();
+      if (!query) {
+        datalist.replaceChildren();
+        return;
+      }
+      timer = setTimeout(function () {
+        search(query);
+      }, DEBOUNCE_MS);
+    });
   });
 });
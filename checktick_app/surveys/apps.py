@@ -5,3 +5,103 @@ class SurveysConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "checktick_app.surveys"
     verbose_name = "Surveys"
+
+    def ready(self):
+        from django.contrib.auth.signals import user_logged_out
+        from django.db.models.signals import (
+            m2m_changed,
+            post_delete,
+            post_save,
+            pre_delete,
+            pre_save,
+        )
+
+        from checktick_app.context_processors import invalidate_user_capabilities
+
+        from . import runtime_schema
+        from .key_cache import clear_session_keys
+        from .models import (
+            DataCustodian,
+            Organization,
+            OrganizationMembership,
+            QuestionGroup,
+            Survey,
+            SurveyAccessToken,
+            SurveyDailyStats,
+            SurveyMembership,
+            SurveyQuestion,
+            SurveyQuestionCondition,
+        )
+        from .permissions import clear_permission_contexts
+
+        user_logged_out.connect(
+            clear_session_keys, dispatch_uid="surveys_clear_session_keys"
+        )
+
+        # Builder edits invalidate the cached participant runtime schema
+        pre_save.connect(
+            runtime_schema.survey_saving,
+            sender=Survey,
+            dispatch_uid="surveys_schema_survey_saving",
+        )
+        for signal in (post_save, post_delete):
+            signal.connect(
+                runtime_schema.question_changed,
+                sender=SurveyQuestion,
+                dispatch_uid=f"surveys_schema_question_{signal is post_save}",
+            )
+            signal.connect(
+                runtime_schema.condition_changed,
+                sender=SurveyQuestionCondition,
+                dispatch_uid=f"surveys_schema_condition_{signal is post_save}",
+            )
+        post_save.connect(
+            runtime_schema.group_changed,
+            sender=QuestionGroup,
+            dispatch_uid="surveys_schema_group_saved",
+        )
+        # Before deletion, while the group's surveys can still be found
+        pre_delete.connect(
+            runtime_schema.group_changed,
+            sender=QuestionGroup,
+            dispatch_uid="surveys_schema_group_deleted",
+        )
+        m2m_changed.connect(
+            runtime_schema.survey_groups_changed,
+            sender=Survey.question_groups.through,
+            dispatch_uid="surveys_schema_survey_groups",
+        )
+
+        # Deleted invite tokens leave the daily invite counts
+        post_delete.connect(
+            SurveyDailyStats.forget_invite_token,
+            sender=SurveyAccessToken,
+            dispatch_uid="surveys_stats_invite_token_deleted",
+        )
+
+        # Membership changes during a request invalidate loaded permissions
+        for model in (
+            Organization,
+            OrganizationMembership,
+            SurveyMembership,
+            DataCustodian,
+        ):
+            for signal in (post_save, post_delete):
+                signal.connect(
+                    clear_permission_contexts,
+                    sender=model,
+                    dispatch_uid=(
+                        f"surveys_permissions_{model.__name__}_{signal is post_save}"
+                    ),
+                )
+
+        # Navigation capability flags are cached per user (branding context)
+        for model in (OrganizationMembership, SurveyMembership):
+            for signal in (post_save, post_delete):
+                signal.connect(
+                    invalidate_user_capabilities,
+                    sender=model,
+                    dispatch_uid=(
+                        f"surveys_capabilities_{model.__name__}_{signal is post_save}"
+                    ),
+                )
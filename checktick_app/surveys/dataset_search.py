@@ -0,0 +1,101 @@
+"""
+Typeahead search over prefilled dataset options.
+
+Datasets such as hospitals_england_wales hold thousands of options; sending
+the whole list to every survey-taker for each dropdown is wasteful. A
+DatasetIndex is built once per cached copy of a dataset and answers prefix
+queries without scanning the options:
+
+- Options are normalised (accents stripped, case-folded, punctuation
+  removed) and split into tokens
+- Tokens are kept in one sorted list, so all tokens starting with a query
+  word are a contiguous range found by binary search
+- A query matches an option when every query word prefixes one of the
+  option's tokens; an exact ODS/region code match ranks first, then options
+  whose name starts with the query, then the dataset's own order
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+import re
+import unicodedata
+
+_NON_WORD = re.compile(r"[^0-9a-z]+")
+# Options end with their code in brackets: "ADDENBROOKE'S HOSPITAL (RGT01)"
+_TRAILING_CODE = re.compile(r"\(([^()]+)\)\s*$")
+
+
+def normalize(text: str) -> str:
+    """Fold text for matching: no accents, lower case, words split by spaces."""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return _NON_WORD.sub(" ", text.casefold()).strip()
+
+
+class DatasetIndex:
+    """Prefix/token index over one version of a dataset's options."""
+
+    def __init__(self, options: list[str], version: float | None = None):
+        self.options = list(options)
+        self.version = version
+        self._normalized = [normalize(option) for option in self.options]
+        self._codes: dict[str, list[int]] = {}
+        terms = set()
+        for i, (option, folded) in enumerate(zip(self.options, self._normalized)):
+            terms.update((token, i) for token in folded.split())
+            code = _TRAILING_CODE.search(option)
+            if code:
+                self._codes.setdefault(normalize(code.group(1)), []).append(i)
+        ordered = sorted(terms)
+        self._terms = [token for token, _ in ordered]
+        self._term_options = [i for _, i in ordered]
+
+    def __len__(self) -> int:
+        return len(self.options)
+
+    def _prefixed(self, word: str) -> set[int]:
+        """Options with a token starting with word."""
+        start = bisect_left(self._terms, word)
+        # Every token with this prefix sorts before word + the largest char
+        end = bisect_left(self._terms, word + "\U0010ffff", lo=start)
+        return set(self._term_options[start:end])
+
+    def search(
+        self, query: str, limit: int = 20, offset: int = 0
+    ) -> tuple[int, list[str]]:
+        """
+        Find options matching a typeahead query.
+
+        Args:
+            query: Free text; each word must prefix a word of the option
+                (or its code)
+            limit: Maximum results to return
+            offset: Results to skip (for "load more")
+
+        Returns:
+            Tuple of (total matches, options for this page)
+        """
+        folded = normalize(query)
+        if not folded:
+            return len(self.options), self.options[offset : offset + limit]
+
+        words = folded.split()
+        matches = None
+        # Rarest (longest) word first keeps the intersections small
+        for word in sorted(words, key=len, reverse=True):
+            found = self._prefixed(word)
+            matches = found if matches is None else matches & found
+            if not matches:
+                return 0, []
+
+        exact_code = set(self._codes.get(folded, ()))
+        ranked = sorted(
+            matches,
+            key=lambda i: (
+                i not in exact_code,
+                not self._normalized[i].startswith(folded),
+                i,
+            ),
+        )
+        return len(ranked), [self.options[i] for i in ranked[offset : offset + limit]]
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Segmented authenticated encryption for password-protected data exports.
+
+This file only depends on the `cryptography` package so it can be handed to
+export recipients as a standalone decryptor:
+
+    pip install cryptography
+    python3 export_crypto.py decrypt export.csv.enc export.csv
+
+It also includes a throughput benchmark:
+
+    python3 export_crypto.py benchmark --size-mb 1024
+
+File format (all integers big-endian):
+
+    header   = magic "CTEXPv1\\0" (8) | chunk_size (4) | scrypt log2(n) (1)
+               | scrypt r (1) | scrypt p (1) | salt (16) | nonce_prefix (7)
+    chunk[i] = AES-256-GCM(key, nonce_prefix | i (4) | final (1), plaintext_i,
+                           aad=header)
+
+Every chunk except the last holds exactly chunk_size bytes of plaintext; the
+last chunk holds 0..chunk_size bytes and is the only one sealed with
+final = 1. Each chunk is authenticated against the header, its position and
+whether it is last, so reordering, truncation and appending are detected.
+Encryption and decryption both stream, holding one chunk in memory.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import struct
+import sys
+import tempfile
+import time
+from typing import BinaryIO, Iterable, Iterator
+
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
+
+MAGIC = b"CTEXPv1\x00"
+DEFAULT_CHUNK_SIZE = 64 * 1024
+TAG_SIZE = 16
+SALT_SIZE = 16
+NONCE_PREFIX_SIZE = 7
+SCRYPT_LOG_N = 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+MAX_CHUNKS = 2**32
+
+# Limits on the scrypt parameters read from an export header, so a crafted
+# file cannot make the decryptor allocate (128 * r * n bytes) or compute
+# without bound
+SCRYPT_MAX_MEMORY = 256 * 1024 * 1024
+SCRYPT_MAX_P = 4
+
+_HEADER = struct.Struct(f">{len(MAGIC)}sIBBB{SALT_SIZE}s{NONCE_PREFIX_SIZE}s")
+HEADER_SIZE = _HEADER.size
+# derive_stream_key output: scrypt log2(n), r, p and salt, then the key
+_STREAM_KEY = struct.Struct(f">BBB{SALT_SIZE}s")
+
+
+class ExportDecryptionError(Exception):
+    """Raised when an encrypted export is malformed, tampered with or the
+    password is wrong."""
+
+
+def _derive_key(password: str | bytes, salt: bytes, log_n: int, r: int, p: int):
+    if isinstance(password, str):
+        password = password.encode("utf-8")
+    return Scrypt(salt=salt, length=32, n=2**log_n, r=r, p=p).derive(password)
+
+
+def _nonce(prefix: bytes, counter: int, final: bool) -> bytes:
+    if counter >= MAX_CHUNKS:
+        raise ValueError("Export too large for a single encrypted stream")
+    return prefix + struct.pack(">I?", counter, final)
+
+
+def _rechunk(data: Iterable[bytes], size: int) -> Iterator[bytes]:
+    """Re-slice arbitrary byte chunks into fixed-size blocks (last may be short)."""
+    buf = bytearray()
+    for piece in data:
+        buf += piece
+        while len(buf) >= size:
+            yield bytes(buf[:size])
+            del buf[:size]
+    yield bytes(buf)
+
+
+def derive_stream_key(password: str | bytes) -> bytes:
+    """
+    Derive the key for one encrypted export from its password.
+
+    The result (scrypt parameters, a fresh salt and the derived key) can
+    only produce and open files with that salt: it does not reveal the
+    password, and is useless for any other export.
+
+    Returns:
+        Opaque key material for encrypt_stream_with_key
+    """
+    salt = os.urandom(SALT_SIZE)
+    key = _derive_key(password, salt, SCRYPT_LOG_N, SCRYPT_R, SCRYPT_P)
+    return _STREAM_KEY.pack(SCRYPT_LOG_N, SCRYPT_R, SCRYPT_P, salt) + key
+
+
+def encrypt_stream(
+    data: Iterable[bytes],
+    password: str | bytes,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """
+    Encrypt a stream of plaintext bytes with a password.
+
+    Args:
+        data: Iterable of plaintext byte chunks (any sizes)
+        password: Password the recipient will use to decrypt
+        chunk_size: Plaintext bytes per sealed segment
+
+    Yields:
+        The header, then one ciphertext segment per chunk
+    """
+    return encrypt_stream_with_key(data, derive_stream_key(password), chunk_size)
+
+
+def encrypt_stream_with_key(
+    data: Iterable[bytes],
+    stream_key: bytes,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """
+    Encrypt a stream of plaintext bytes with key material from
+    derive_stream_key, so the password itself is not needed.
+
+    Every call picks a fresh nonce prefix, so reusing key material never
+    reuses a nonce.
+
+    Yields:
+        The header, then one ciphertext segment per chunk
+    """
+    log_n, r, p, salt = _STREAM_KEY.unpack(stream_key[: _STREAM_KEY.size])
+    prefix = os.urandom(NONCE_PREFIX_SIZE)
+    header = _HEADER.pack(MAGIC, chunk_size, log_n, r, p, salt, prefix)
+    aesgcm = AESGCM(stream_key[_STREAM_KEY.size :])
+    yield header
+
+    # Hold one block back so the last one can be sealed with final = 1
+    counter = 0
+    pending = None
+    for block in _rechunk(data, chunk_size):
+        if pending is not None:
+            yield aesgcm.encrypt(_nonce(prefix, counter, False), pending, header)
+            counter += 1
+        pending = block
+    yield aesgcm.encrypt(_nonce(prefix, counter, True), pending, header)
+
+
+def _read_exact(fh: BinaryIO, size: int) -> bytes:
+    data = bytearray()
+    while len(data) < size:
+        piece = fh.read(size - len(data))
+        if not piece:
+            break
+        data += piece
+    return bytes(data)
+
+
+def decrypt_stream(fh: BinaryIO, password: str | bytes) -> Iterator[bytes]:
+    """
+    Decrypt an encrypted export from a binary file object.
+
+    Args:
+        fh: Readable binary file positioned at the start of the export
+        password: Password used when the export was created
+
+    Yields:
+        Plaintext chunks, each only after it has been authenticated
+
+    Raises:
+        ExportDecryptionError: On wrong password, tampering or truncation
+    """
+    from cryptography.exceptions import InvalidTag
+
+    header = _read_exact(fh, HEADER_SIZE)
+    if len(header) < HEADER_SIZE or not header.startswith(MAGIC):
+        raise ExportDecryptionError("Not a CheckTick encrypted export")
+    _, chunk_size, log_n, r, p, salt, prefix = _HEADER.unpack(header)
+    if (
+        not 0 < chunk_size <= 64 * 1024 * 1024
+        or not 10 <= log_n <= 22
+        or not 1 <= r
+        or not 1 <= p <= SCRYPT_MAX_P
+        or 128 * r * 2**log_n > SCRYPT_MAX_MEMORY
+    ):
+        raise ExportDecryptionError("Unsupported export parameters")
+    aesgcm = AESGCM(_derive_key(password, salt, log_n, r, p))
+
+    segment_size = chunk_size + TAG_SIZE
+    counter = 0
+    segment = _read_exact(fh, segment_size)
+    while True:
+        # Peek one byte ahead to learn whether this segment is the last
+        lookahead = fh.read(1) if len(segment) == segment_size else b""
+        final = not lookahead
+        try:
+            yield aesgcm.decrypt(_nonce(prefix, counter, final), segment, header)
+        except InvalidTag:
+            if counter == 0:
+                raise ExportDecryptionError(
+                    "Wrong password or corrupted export"
+                ) from None
+            raise ExportDecryptionError(
+                f"Export is corrupted or truncated at segment {counter}"
+            ) from None
+        if final:
+            return
+        counter += 1
+        segment = lookahead + _read_exact(fh, segment_size - 1)
+
+
+def _benchmark(size_mb: int, chunk_size: int) -> None:
+    block = os.urandom(1024 * 1024)
+    password = "benchmark-password"
+
+    def plaintext():
+        for _ in range(size_mb):
+            yield block
+
+    with tempfile.TemporaryFile() as tmp:
+        start = time.perf_counter()
+        for piece in encrypt_stream(plaintext(), password, chunk_size=chunk_size):
+            tmp.write(piece)
+        encrypt_seconds = time.perf_counter() - start
+
+        tmp.seek(0)
+        total = 0
+        start = time.perf_counter()
+        for piece in decrypt_stream(tmp, password):
+            total += len(piece)
+        decrypt_seconds = time.perf_counter() - start
+
+    assert total == size_mb * 1024 * 1024
+    print(f"Input: {size_mb} MB, chunk size: {chunk_size // 1024} KiB")
+    print(f"Encrypt: {size_mb / encrypt_seconds:8.1f} MB/s ({encrypt_seconds:.2f}s)")
+    print(f"Decrypt: {size_mb / decrypt_seconds:8.1f} MB/s ({decrypt_seconds:.2f}s)")
+    print("(times include one scrypt key derivation each)")
+
+
+def main(argv: list[str] | None = None) -> int:
+    import getpass
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    dec = sub.add_parser("decrypt", help="Decrypt an encrypted export")
+    dec.add_argument("input", help="Encrypted export (.csv.enc)")
+    dec.add_argument("output", help="Where to write the decrypted CSV ('-' = stdout)")
+
+    bench = sub.add_parser("benchmark", help="Measure throughput in MB/s")
+    bench.add_argument("--size-mb", type=int, default=1024)
+    bench.add_argument("--chunk-kb", type=int, default=DEFAULT_CHUNK_SIZE // 1024)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "benchmark":
+        _benchmark(args.size_mb, args.chunk_kb * 1024)
+        return 0
+
+    password = os.environ.get("CHECKTICK_EXPORT_PASSWORD") or getpass.getpass(
+        "Export password: "
+    )
+    out = sys.stdout.buffer if args.output == "-" else open(args.output + ".part", "wb")
+    try:
+        with open(args.input, "rb") as fh:
+            for piece in decrypt_stream(fh, password):
+                out.write(piece)
+    except ExportDecryptionError as e:
+        if out is not sys.stdout.buffer:
+            out.close()
+            os.remove(args.output + ".part")
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    if out is not sys.stdout.buffer:
+        out.close()
+        # Only expose the output once every segment has been authenticated
+        os.replace(args.output + ".part", args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
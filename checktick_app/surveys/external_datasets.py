@@ -16,18 +16,57 @@ To add a new dataset:
 See docs/adding-external-datasets.md for detailed examples.
 """
 
+from concurrent.futures import Future, ThreadPoolExecutor
+import gzip
+import hashlib
+import json
 import logging
+import os
+from pathlib import Path
+import tempfile
+import threading
+import time
 from typing import Any
 
 from django.conf import settings
 from django.core.cache import cache
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .dataset_search import DatasetIndex
 
 logger = logging.getLogger(__name__)
 
-# Cache timeout: 24 hours for relatively stable datasets like hospital lists
+# Freshness: a cached dataset older than this is served stale while one
+# background refresh fetches a new copy (stale-while-revalidate)
 DATASET_CACHE_TIMEOUT = 60 * 60 * 24
 
+# How long a stale copy stays in the cache; after that the on-disk snapshot
+# is the fallback
+DATASET_STALE_TIMEOUT = 60 * 60 * 24 * 7
+
+# Single-flight refresh lock: only the holder fetches upstream. It expires on
+# its own if a refresh dies without releasing it. The lock lives in the cache,
+# so it only spans processes when CACHES is a shared backend (Redis,
+# Memcached, database); with the default local-memory cache each worker
+# process may run one refresh of its own.
+DATASET_LOCK_TIMEOUT = 60
+
+# Upstream HTTP timeout (seconds)
+DATASET_FETCH_TIMEOUT = 10
+
+CACHE_KEY = "external_dataset:{dataset_key}"
+LOCK_KEY = "external_dataset:{dataset_key}:refreshing"
+# fetched_at of the cached copy, so search indexes can be checked for
+# staleness without loading the whole option list from the cache
+VERSION_KEY = "external_dataset:{dataset_key}:version"
+# The get_dataset API response, encoded once per cached copy
+PAYLOAD_KEY = "external_dataset:{dataset_key}:payload"
+
+# Payloads at least this large are also kept gzip-compressed
+DATASET_GZIP_MIN_BYTES = 1024
+
 # Available dataset keys and display names
 AVAILABLE_DATASETS = {
     "hospitals_england_wales": "Hospitals (England & Wales)",
@@ -239,30 +278,126 @@ def _transform_response_to_options(dataset_key: str, data: Any) -> list[str]:
     return options
 
 
-def fetch_dataset(dataset_key: str) -> list[str]:
+_http_session: requests.Session | None = None
+_http_session_lock = threading.Lock()
+
+# Background refreshes for stale datasets (one at a time per dataset, via the
+# cache lock; a small pool is plenty)
+_refresh_executor = ThreadPoolExecutor(
+    max_workers=2, thread_name_prefix="dataset-refresh"
+)
+
+# Search indexes built in this process, keyed by dataset (see
+# get_dataset_index)
+_indexes: dict[str, DatasetIndex] = {}
+
+
+def get_http_session() -> requests.Session:
     """
-    Fetch dataset options from external API with caching.
+    Shared HTTP session for upstream dataset APIs.
 
-    Args:
-        dataset_key: The key identifying which dataset to fetch
+    Reusing one session keeps TLS connections to the API alive across fetches
+    (and threads); transient 5xx responses are retried with backoff.
+    """
+    global _http_session
+    if _http_session is None:
+        with _http_session_lock:
+            if _http_session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=4,
+                    pool_maxsize=8,
+                    max_retries=Retry(
+                        total=2,
+                        backoff_factor=0.5,
+                        status_forcelist=(502, 503, 504),
+                        allowed_methods=("GET",),
+                    ),
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _http_session = session
+    return _http_session
 
-    Returns:
-        List of option strings
 
-    Raises:
-        DatasetFetchError: If dataset key is invalid or fetch fails
+def _get_snapshot_dir() -> Path | None:
+    """Directory for on-disk dataset snapshots (None disables them)."""
+    snapshot_dir = getattr(settings, "EXTERNAL_DATASET_SNAPSHOT_DIR", None)
+    return Path(snapshot_dir) if snapshot_dir else None
+
+
+def _snapshot_path(dataset_key: str) -> Path | None:
+    snapshot_dir = _get_snapshot_dir()
+    return snapshot_dir / f"{dataset_key}.json" if snapshot_dir else None
+
+
+def _read_snapshot(dataset_key: str) -> dict | None:
+    """Last persisted copy of a dataset, or None if there is none."""
+    path = _snapshot_path(dataset_key)
+    if path is None:
+        return None
+    try:
+        with open(path, encoding="utf-8") as f:
+            entry = json.load(f)
+        if isinstance(entry.get("options"), list) and entry["options"]:
+            return {
+                "options": entry["options"],
+                "fetched_at": float(entry["fetched_at"]),
+            }
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        logger.warning(f"Ignoring unreadable snapshot for {dataset_key}: {e}")
+    return None
+
+
+def _write_snapshot(dataset_key: str, entry: dict) -> None:
+    """Persist a dataset atomically (temp file + rename)."""
+    path = _snapshot_path(dataset_key)
+    if path is None:
+        return
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(
+            dir=path.parent, prefix=f".{dataset_key}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"dataset": dataset_key, **entry}, f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError as e:
+        # A read-only or full disk must not break serving the dataset
+        logger.warning(f"Could not write snapshot for {dataset_key}: {e}")
+
+
+def _is_fresh(fetched_at: float) -> bool:
+    return time.time() - fetched_at < DATASET_CACHE_TIMEOUT
+
+
+def is_dataset_fresh(dataset_key: str) -> bool:
+    """Whether the latest copy of a dataset is younger than DATASET_CACHE_TIMEOUT.
+
+    The cached copy is checked first, then the on-disk snapshot, so a
+    process with an empty (e.g. local-memory) cache still sees what other
+    processes fetched.
     """
-    if dataset_key not in AVAILABLE_DATASETS:
-        raise DatasetFetchError(f"Unknown dataset key: {dataset_key}")
+    fetched_at = cache.get(VERSION_KEY.format(dataset_key=dataset_key))
+    if fetched_at is None:
+        snapshot = _read_snapshot(dataset_key)
+        fetched_at = snapshot["fetched_at"] if snapshot else None
+    return fetched_at is not None and _is_fresh(fetched_at)
 
-    # Check cache first
-    cache_key = f"external_dataset:{dataset_key}"
-    cached_data = cache.get(cache_key)
-    if cached_data is not None:
-        logger.debug(f"Returning cached dataset: {dataset_key}")
-        return cached_data
 
-    # Fetch from external API
+def _download_dataset(dataset_key: str) -> list[str]:
+    """
+    Fetch and transform a dataset from the upstream API (no caching).
+
+    Raises:
+        DatasetFetchError: If the request or the response is invalid
+    """
     try:
         api_url = _get_api_url()
         api_key = _get_api_key()
@@ -280,19 +415,15 @@ def fetch_dataset(dataset_key: str) -> list[str]:
         if api_key:
             headers["Authorization"] = f"Bearer {api_key}"
 
-        response = requests.get(url, headers=headers, timeout=10)
+        response = get_http_session().get(
+            url, headers=headers, timeout=DATASET_FETCH_TIMEOUT
+        )
         response.raise_for_status()
 
         data = response.json()
 
         # Transform API response to option strings
-        options = _transform_response_to_options(dataset_key, data)
-
-        # Cache the result
-        cache.set(cache_key, options, DATASET_CACHE_TIMEOUT)
-        logger.info(f"Cached {len(options)} options for dataset: {dataset_key}")
-
-        return options
+        return _transform_response_to_options(dataset_key, data)
 
     except requests.RequestException as e:
         logger.error(f"Failed to fetch dataset {dataset_key}: {e}")
@@ -302,19 +433,268 @@ def fetch_dataset(dataset_key: str) -> list[str]:
         raise DatasetFetchError(f"Failed to parse dataset: {str(e)}") from e
 
 
+def store_dataset(
+    dataset_key: str, options: list[str], fetched_at: float | None = None
+) -> dict:
+    """
+    Put a dataset in the cache and build its search index.
+
+    Args:
+        dataset_key: The dataset key
+        options: Transformed option strings
+        fetched_at: When the options were fetched (defaults to now)
+
+    Returns:
+        The cache entry ({"options": [...], "fetched_at": epoch seconds})
+    """
+    entry = {
+        "options": options,
+        "fetched_at": time.time() if fetched_at is None else fetched_at,
+    }
+    cache.set_many(
+        {
+            CACHE_KEY.format(dataset_key=dataset_key): entry,
+            VERSION_KEY.format(dataset_key=dataset_key): entry["fetched_at"],
+            PAYLOAD_KEY.format(dataset_key=dataset_key): _encode_payload(
+                dataset_key, entry
+            ),
+        },
+        DATASET_STALE_TIMEOUT,
+    )
+    _indexes[dataset_key] = DatasetIndex(options, version=entry["fetched_at"])
+    return entry
+
+
+def _encode_payload(dataset_key: str, entry: dict) -> dict:
+    body = json.dumps(
+        {"dataset_key": dataset_key, "options": entry["options"]},
+        separators=(",", ":"),
+        ensure_ascii=False,
+    ).encode("utf-8")
+    return {
+        "body": body,
+        # mtime=0 keeps the compressed bytes identical for identical content
+        "gzip": (
+            gzip.compress(body, mtime=0)
+            if len(body) >= DATASET_GZIP_MIN_BYTES
+            else None
+        ),
+        "etag": hashlib.sha256(body).hexdigest()[:32],
+        "fetched_at": entry["fetched_at"],
+    }
+
+
+def refresh_dataset(dataset_key: str) -> list[str]:
+    """
+    Fetch a dataset upstream, then update the cache and its snapshot.
+
+    Raises:
+        DatasetFetchError: If the fetch fails (cache and snapshot are kept)
+    """
+    return _refresh_entry(dataset_key)["options"]
+
+
+def _refresh_entry(dataset_key: str) -> dict:
+    options = _download_dataset(dataset_key)
+    entry = store_dataset(dataset_key, options)
+    _write_snapshot(dataset_key, entry)
+    logger.info(f"Cached {len(options)} options for dataset: {dataset_key}")
+    return entry
+
+
+def _refresh_locked(dataset_key: str) -> None:
+    """Refresh a dataset under its single-flight lock.
+
+    On success the lock is released. On failure it is left to expire, so an
+    upstream outage is retried at most once per DATASET_LOCK_TIMEOUT while
+    the stale copy keeps being served.
+    """
+    try:
+        refresh_dataset(dataset_key)
+    except DatasetFetchError:
+        return
+    except Exception:
+        logger.exception(f"Unexpected error refreshing dataset {dataset_key}")
+        return
+    cache.delete(LOCK_KEY.format(dataset_key=dataset_key))
+
+
+def _schedule_refresh(dataset_key: str) -> Future | None:
+    """
+    Start a background refresh unless one is already running.
+
+    "Already running" is as far as the cache can see: in this process with
+    the default local-memory cache, across processes with a shared one.
+
+    Returns:
+        The refresh future, or None if another refresh holds the lock
+    """
+    if not cache.add(LOCK_KEY.format(dataset_key=dataset_key), 1, DATASET_LOCK_TIMEOUT):
+        return None
+    return _refresh_executor.submit(_refresh_locked, dataset_key)
+
+
+def fetch_dataset(dataset_key: str) -> list[str]:
+    """
+    Fetch dataset options, served from the cache wherever possible.
+
+    - Fresh cache entry: returned as is
+    - Stale entry (older than DATASET_CACHE_TIMEOUT): returned immediately
+      while a single background refresh fetches a new copy
+    - No cache entry: the on-disk snapshot is served and loaded into the
+      cache (cold start, cache flush), with a background refresh if it is
+      stale;
+      only with no snapshot either is the upstream API called inline, by one
+      request at a time per dataset (others fail fast meanwhile)
+    - A failed refresh keeps the stale copy or snapshot in service
+
+    Args:
+        dataset_key: The key identifying which dataset to fetch
+
+    Returns:
+        List of option strings
+
+    Raises:
+        DatasetFetchError: If dataset key is invalid, or the fetch fails and
+            no earlier copy of the dataset exists
+    """
+    return _get_entry(dataset_key)["options"]
+
+
+def _get_entry(dataset_key: str) -> dict:
+    """The cache entry behind fetch_dataset() (options and fetched_at)."""
+    if dataset_key not in AVAILABLE_DATASETS:
+        raise DatasetFetchError(f"Unknown dataset key: {dataset_key}")
+
+    entry = cache.get(CACHE_KEY.format(dataset_key=dataset_key))
+    if entry is not None:
+        if not _is_fresh(entry["fetched_at"]):
+            _schedule_refresh(dataset_key)
+        logger.debug(f"Returning cached dataset: {dataset_key}")
+        return entry
+
+    snapshot = _read_snapshot(dataset_key)
+    if snapshot is not None:
+        # The cache was empty because of a cold start, a cache flush or a
+        # process-local cache; a snapshot written by warm_dataset_cache or
+        # another process is as good as a cached copy of the same age
+        logger.info(f"Loaded dataset {dataset_key} from snapshot")
+        entry = store_dataset(dataset_key, **snapshot)
+        if not _is_fresh(entry["fetched_at"]):
+            _schedule_refresh(dataset_key)
+        return entry
+
+    return _fetch_cold(dataset_key)
+
+
+def get_dataset_index(dataset_key: str) -> DatasetIndex:
+    """
+    Search index for a dataset, following the same caching rules as
+    fetch_dataset().
+
+    Indexes are kept per process. While the cached copy is unchanged only its
+    small version key is read from the cache; a new copy (refreshed here or
+    by another process) is re-indexed on first use.
+
+    Raises:
+        DatasetFetchError: As for fetch_dataset()
+    """
+    version_key = VERSION_KEY.format(dataset_key=dataset_key)
+    fetched_at = cache.get(version_key)
+    index = _indexes.get(dataset_key)
+    if index is not None and fetched_at is not None and index.version == fetched_at:
+        if not _is_fresh(fetched_at):
+            _schedule_refresh(dataset_key)
+        return index
+
+    entry = _get_entry(dataset_key)
+    if fetched_at is None:
+        cache.set(version_key, entry["fetched_at"], DATASET_STALE_TIMEOUT)
+    index = _indexes.get(dataset_key)
+    if index is None or index.version != entry["fetched_at"]:
+        index = DatasetIndex(entry["options"], version=entry["fetched_at"])
+        _indexes[dataset_key] = index
+    return index
+
+
+def get_dataset_payload(dataset_key: str) -> dict:
+    """
+    A dataset as ready-to-send JSON, following the same caching rules as
+    fetch_dataset().
+
+    The payload is encoded when the dataset is cached, so serving it does not
+    serialize the option list again.
+
+    Returns:
+        Dict with body (compact JSON bytes of {"dataset_key", "options"}),
+        gzip (the body gzip-compressed, or None for small datasets), etag (a
+        hash of body) and fetched_at
+
+    Raises:
+        DatasetFetchError: As for fetch_dataset()
+    """
+    payload_key = PAYLOAD_KEY.format(dataset_key=dataset_key)
+    payload = cache.get(payload_key)
+    if payload is not None:
+        if not _is_fresh(payload["fetched_at"]):
+            _schedule_refresh(dataset_key)
+        return payload
+
+    entry = _get_entry(dataset_key)
+    # Storing a snapshot or a fetch result has just encoded it
+    payload = cache.get(payload_key)
+    if payload is None or payload["fetched_at"] != entry["fetched_at"]:
+        payload = _encode_payload(dataset_key, entry)
+        cache.set(payload_key, payload, DATASET_STALE_TIMEOUT)
+    return payload
+
+
+def _fetch_cold(dataset_key: str) -> dict:
+    """Fetch a dataset nobody has a copy of, one request at a time.
+
+    A request that finds another fetch in progress fails straight away
+    rather than holding its worker until that fetch completes; the client
+    can retry once the dataset is cached.
+
+    Raises:
+        DatasetFetchError: If the fetch fails or another one is in progress
+    """
+    lock_key = LOCK_KEY.format(dataset_key=dataset_key)
+    if not cache.add(lock_key, 1, DATASET_LOCK_TIMEOUT):
+        # The other fetch may have finished since the caller looked
+        entry = cache.get(CACHE_KEY.format(dataset_key=dataset_key))
+        if entry is not None:
+            return entry
+        raise DatasetFetchError(
+            f"Dataset {dataset_key} is being fetched; try again shortly"
+        )
+    try:
+        return _refresh_entry(dataset_key)
+    finally:
+        cache.delete(lock_key)
+
+
 def clear_dataset_cache(dataset_key: str | None = None) -> None:
     """
-    Clear cached dataset(s).
+    Clear cached dataset(s) and start a background refresh of each.
+
+    On-disk snapshots are kept: requests are served from the snapshot until
+    the refresh completes.
 
     Args:
         dataset_key: If provided, clear only this dataset. Otherwise clear all.
     """
+    keys = [dataset_key] if dataset_key else list(AVAILABLE_DATASETS)
+    cache.delete_many(
+        [
+            pattern.format(dataset_key=key)
+            for key in keys
+            for pattern in (CACHE_KEY, VERSION_KEY, PAYLOAD_KEY)
+        ]
+    )
+    for key in keys:
+        _schedule_refresh(key)
     if dataset_key:
-        cache_key = f"external_dataset:{dataset_key}"
-        cache.delete(cache_key)
         logger.info(f"Cleared cache for dataset: {dataset_key}")
     else:
-        for key in AVAILABLE_DATASETS:
-            cache_key = f"external_dataset:{key}"
-            cache.delete(cache_key)
         logger.info("Cleared all dataset caches")
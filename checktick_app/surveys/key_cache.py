@@ -0,0 +1,118 @@
+"""
+Short-lived in-process cache of unwrapped survey KEKs.
+
+get_survey_key_from_session re-derives the KEK on every request (Option 4),
+which costs one scrypt to open the session credentials and usually another
+to unwrap the KEK. This cache keeps the unwrapped KEK for the remainder of the
+existing unlock window so repeat requests from the same session skip both.
+
+- Keyed by (session key, survey slug) and pinned to the session's
+  unlock_verified_at, so a fresh unlock never reuses an older entry
+- Entries expire at the end of the 30-minute unlock window
+- Bounded size with least-recently-used eviction
+- Key material is held in bytearrays and overwritten with zeros on eviction
+- Cleared for a session on logout and when the unlock window expires
+
+The cache is per process; each worker warms its own entries.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from datetime import datetime, timedelta
+import threading
+
+from django.conf import settings
+from django.utils import timezone
+
+UNLOCK_WINDOW = timedelta(minutes=30)
+
+
+def _zeroize(buf: bytearray) -> None:
+    for i in range(len(buf)):
+        buf[i] = 0
+
+
+class _Entry:
+    __slots__ = ("kek", "verified_at", "expires_at")
+
+    def __init__(self, kek: bytes, verified_at: str, expires_at: datetime):
+        self.kek = bytearray(kek)
+        self.verified_at = verified_at
+        self.expires_at = expires_at
+
+
+class SurveyKeyCache:
+    """Bounded, TTL-based KEK cache that zeroizes key material on eviction."""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, str], _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_key: str, survey_slug: str, verified_at: str) -> bytes | None:
+        """Return the cached KEK, or None if absent, stale or expired."""
+        key = (session_key, survey_slug)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.verified_at != verified_at or timezone.now() >= entry.expires_at:
+                self._evict(key)
+                return None
+            self._entries.move_to_end(key)
+            return bytes(entry.kek)
+
+    def set(
+        self,
+        session_key: str,
+        survey_slug: str,
+        verified_at: str,
+        kek: bytes,
+        expires_at: datetime,
+    ) -> None:
+        """Cache a KEK until expires_at (the end of the unlock window)."""
+        key = (session_key, survey_slug)
+        with self._lock:
+            if key in self._entries:
+                self._evict(key)
+            self._entries[key] = _Entry(kek, verified_at, expires_at)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._evict(oldest)
+
+    def discard(self, session_key: str, survey_slug: str | None = None) -> None:
+        """Evict one survey's KEK, or every KEK held for the session."""
+        with self._lock:
+            if survey_slug is not None:
+                self._evict((session_key, survey_slug))
+                return
+            for key in [k for k in self._entries if k[0] == session_key]:
+                self._evict(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in list(self._entries):
+                self._evict(key)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _evict(self, key: tuple[str, str]) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            _zeroize(entry.kek)
+
+
+survey_key_cache = SurveyKeyCache(
+    max_entries=getattr(settings, "CHECKTICK_KEK_CACHE_MAX_ENTRIES", 256)
+)
+
+
+def clear_session_keys(sender=None, request=None, **kwargs) -> None:
+    """Drop all cached KEKs for the request's session (user_logged_out receiver)."""
+    if request is None or not hasattr(request, "session"):
+        return
+    session_key = request.session.session_key
+    if session_key:
+        survey_key_cache.discard(session_key)
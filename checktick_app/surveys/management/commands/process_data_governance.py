@@ -2,22 +2,54 @@
 """
 Django management command to process data governance tasks.
 
-This command should be run daily (e.g., via cron or Northflank scheduled job) to:
+This command should be run at least daily (e.g., via cron or Northflank scheduled
+job); it is safe to run hourly, as each warning is only sent once per deletion
+date. It will:
 1. Send deletion warning emails (30 days, 7 days, 1 day before deletion)
 2. Automatically soft-delete surveys that have passed their retention period
 3. Automatically hard-delete surveys that have passed their grace period
 
+Only one run (per shard) is active at a time: a run takes a JobLock row and
+a second, overlapping run exits straight away. A lock left behind by a run
+that crashed expires after --lock-timeout seconds. A run that loses its lock
+(it was taken over as stale) aborts instead of carrying on alongside the
+new holder.
+
+Large installations can split the work across parallel workers with
+--shards N --shard-index i; each worker handles the surveys whose
+id % N == i and holds its own lock. Every worker must use the same --shards:
+a run refuses to start while a run with another --shards holds a lock, or
+left automatic deletion progress unfinished.
+
+Each run ends with a "data_governance_run" log line of JSON metrics
+(duration, surveys scanned, warnings sent, deleted, skipped, errors).
+
 Usage:
     python manage.py process_data_governance
     python manage.py process_data_governance --dry-run
     python manage.py process_data_governance --verbose
+    python manage.py process_data_governance --shards 4 --shard-index 0
 """
 
-from django.core.management.base import BaseCommand
+from datetime import timedelta
+import json
+import logging
+import os
+import socket
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
 from django.utils import timezone
 
+from checktick_app.surveys.models import JobLock, RetentionRun
 from checktick_app.surveys.services.retention_service import RetentionService
 
+logger = logging.getLogger(__name__)
+
+LOCK_PREFIX = "process_data_governance:shard-"
+LOCK_NAME = LOCK_PREFIX + "{index}-of-{count}"
+
 
 class Command(BaseCommand):
     help = "Process data governance tasks (deletion warnings and automatic deletions)"
@@ -33,32 +65,58 @@ class Command(BaseCommand):
             action="store_true",
             help="Show detailed output",
         )
+        parser.add_argument(
+            "--shards",
+            type=int,
+            default=1,
+            help="Split surveys into this many shards (by id) for parallel runs",
+        )
+        parser.add_argument(
+            "--shard-index",
+            type=int,
+            default=0,
+            help="Shard handled by this run, from 0 to --shards - 1",
+        )
+        parser.add_argument(
+            "--lock-timeout",
+            type=int,
+            default=7200,
+            help="Seconds after which a lock left by a crashed run is taken over",
+        )
 
     def handle(self, *args, **options):
         dry_run = options["dry_run"]
         verbose = options["verbose"]
+        shard_count = options["shards"]
+        shard_index = options["shard_index"]
+        if shard_count < 1:
+            raise CommandError("--shards must be at least 1")
+        if not 0 <= shard_index < shard_count:
+            raise CommandError(f"--shard-index must be between 0 and {shard_count - 1}")
+        if options["lock_timeout"] < 1:
+            raise CommandError("--lock-timeout must be at least 1 second")
+        shard = (shard_index, shard_count) if shard_count > 1 else None
 
         self.stdout.write(
             self.style.SUCCESS(
                 f"Starting data governance processing at {timezone.now()}"
             )
         )
+        if shard:
+            self.stdout.write(f"Shard {shard_index + 1} of {shard_count}")
 
         if dry_run:
             self.stdout.write(
                 self.style.WARNING("DRY RUN MODE - No changes will be made")
             )
-
-        # Process deletion warnings
-        self._process_deletion_warnings(dry_run, verbose)
-
-        # Process automatic deletions
-        if not dry_run:
-            self._process_automatic_deletions(verbose)
-        else:
+            self._process_deletion_warnings(dry_run, verbose, shard)
             self.stdout.write(
                 self.style.WARNING("Skipping automatic deletions in dry-run mode")
             )
+        elif not self._process_with_lock(
+            verbose, shard_index, shard_count, options["lock_timeout"]
+        ):
+            return
 
         self.stdout.write(
             self.style.SUCCESS(
@@ -66,14 +124,123 @@ class Command(BaseCommand):
             )
         )
 
-    def _process_deletion_warnings(self, dry_run, verbose):
-        """Send deletion warning emails for surveys approaching deletion."""
+    def _process_with_lock(self, verbose, shard_index, shard_count, lock_timeout):
+        """
+        Run warnings and deletions for one shard under its JobLock.
+
+        Returns False (doing nothing) if another run holds the lock, or a
+        run with a different shard count holds one of its locks. Logs and
+        prints a data_governance_run metrics line when the run ends, also if
+        it fails.
+
+        Raises:
+            CommandError: If a different shard count left unfinished deletion
+                progress, or the lock is lost during the run
+        """
+        shard = (shard_index, shard_count) if shard_count > 1 else None
+        lock_name = LOCK_NAME.format(index=shard_index, count=shard_count)
+        holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        lock_timeout = timedelta(seconds=lock_timeout)
+        if not JobLock.acquire(lock_name, holder, lock_timeout):
+            self.stdout.write(
+                self.style.WARNING(f"Another run holds {lock_name}; nothing to do")
+            )
+            return False
+        # Checked while holding the lock, so of two layouts starting at the
+        # same time at least one sees the other
+        try:
+            self._check_shard_layout(shard_count)
+        except Exception:
+            JobLock.release(lock_name, holder)
+            raise
+        if conflicting := self._other_layout_locks(shard_count):
+            JobLock.release(lock_name, holder)
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Another run holds {', '.join(conflicting)}; nothing to do"
+                )
+            )
+            return False
+
+        def heartbeat():
+            if not JobLock.refresh(lock_name, holder, lock_timeout):
+                logger.error("Lost job lock %s (held by %s)", lock_name, holder)
+                raise CommandError(
+                    f"Lost {lock_name} to another run; aborting (progress is "
+                    "kept and resumed by the next run)"
+                )
+
+        started = time.monotonic()
+        metrics = {
+            "shard": f"{shard_index}/{shard_count}",
+            "status": "failed",
+        }
+        try:
+            metrics.update(
+                self._process_deletion_warnings(False, verbose, shard, heartbeat)
+            )
+            metrics.update(self._process_automatic_deletions(verbose, shard, heartbeat))
+            metrics["status"] = "ok"
+        finally:
+            JobLock.release(lock_name, holder)
+            metrics["duration_seconds"] = round(time.monotonic() - started, 3)
+            line = json.dumps(metrics, sort_keys=True)
+            logger.info("data_governance_run %s", line)
+            self.stdout.write(f"\ndata_governance_run {line}")
+        return True
+
+    @staticmethod
+    def _other_layout_locks(shard_count):
+        """Names of live locks taken by runs with a different --shards."""
+        return [
+            name
+            for name in JobLock.objects.filter(
+                name__startswith=LOCK_PREFIX,
+                expires_at__gt=timezone.now(),
+            )
+            .exclude(holder="")
+            .exclude(name__endswith=f"-of-{shard_count}")
+            .values_list("name", flat=True)
+        ]
+
+    @staticmethod
+    def _check_shard_layout(shard_count):
+        """Refuse to start while another --shards left a run unfinished.
+
+        Its checkpoints would otherwise never be resumed, and its surveys
+        would be split differently from this run's.
+        """
+        unfinished = sorted(
+            set(
+                RetentionRun.objects.filter(finished_at__isnull=True)
+                .exclude(shard_count=shard_count)
+                .values_list("shard_count", flat=True)
+            )
+        )
+        if unfinished:
+            layouts = ", ".join(f"--shards {count}" for count in unfinished)
+            raise CommandError(
+                f"Automatic deletion runs started with {layouts} are unfinished; "
+                "complete them with the same --shards (every --shard-index) "
+                "before changing the shard count"
+            )
+
+    def _process_deletion_warnings(self, dry_run, verbose, shard=None, heartbeat=None):
+        """Send deletion warning emails for surveys approaching deletion.
+
+        heartbeat, if given, is called after every survey so a long run keeps
+        its job lock; an exception it raises aborts the run.
+        """
         self.stdout.write(self.style.HTTP_INFO("\n--- Deletion Warnings ---"))
 
         warning_counts = {}
+        warnings_due = 0
         for days in RetentionService.WARNING_DAYS:
-            surveys = RetentionService.get_surveys_pending_deletion_warning(days)
+            surveys = RetentionService.get_surveys_pending_deletion_warning(
+                days, shard=shard
+            )
             warning_counts[days] = len(surveys)
+            warnings_due += len(surveys)
 
             if verbose or dry_run:
                 self.stdout.write(f"\n{days}-day warnings: {len(surveys)} surveys")
@@ -86,9 +253,16 @@ class Command(BaseCommand):
                     )
 
             if not dry_run:
+                sent = 0
                 for survey in surveys:
                     try:
-                        RetentionService.send_deletion_warning(survey, days)
+                        # Recorded in the warning ledger, so a later run (or
+                        # one running alongside) does not send it again
+                        if not RetentionService.send_deletion_warning_once(
+                            survey, days
+                        ):
+                            continue
+                        sent += 1
                         if verbose:
                             self.stdout.write(
                                 self.style.SUCCESS(
@@ -101,6 +275,10 @@ class Command(BaseCommand):
                                 f"  ✗ Failed to send warning for {survey.name}: {e}"
                             )
                         )
+                    finally:
+                        if heartbeat is not None:
+                            heartbeat()
+                warning_counts[days] = sent
 
         # Summary
         total_warnings = sum(warning_counts.values())
@@ -112,13 +290,16 @@ class Command(BaseCommand):
         )
         for days in sorted(warning_counts.keys(), reverse=True):
             self.stdout.write(f"  - {days}-day warnings: {warning_counts[days]}")
+        return {"warnings_due": warnings_due, "warnings_sent": total_warnings}
 
-    def _process_automatic_deletions(self, verbose):
+    def _process_automatic_deletions(self, verbose, shard=None, heartbeat=None):
         """Process automatic soft and hard deletions."""
         self.stdout.write(self.style.HTTP_INFO("\n--- Automatic Deletions ---"))
 
         try:
-            stats = RetentionService.process_automatic_deletions()
+            stats = RetentionService.process_automatic_deletions(
+                shard=shard, heartbeat=heartbeat
+            )
 
             # Report results
             self.stdout.write(
@@ -128,6 +309,9 @@ class Command(BaseCommand):
                 self.style.SUCCESS(f"Hard deleted: {stats['hard_deleted']} surveys")
             )
 
+            if verbose or stats["responses_deleted"] > 0:
+                self.stdout.write(f"Responses deleted: {stats['responses_deleted']}")
+
             if stats["skipped_legal_hold"] > 0:
                 self.stdout.write(
                     self.style.WARNING(
@@ -135,6 +319,14 @@ class Command(BaseCommand):
                     )
                 )
 
+            if stats["errors"] > 0:
+                self.stdout.write(
+                    self.style.ERROR(
+                        f"Failed: {stats['errors']} surveys (see logs); "
+                        "they are retried on the next run"
+                    )
+                )
+
             # Alert if any deletions occurred
             total_deletions = stats["soft_deleted"] + stats["hard_deleted"]
             if total_deletions > 0:
@@ -144,6 +336,7 @@ class Command(BaseCommand):
                         "Check audit logs for details."
                     )
                 )
+            return stats
 
         except Exception as e:
             self.stdout.write(
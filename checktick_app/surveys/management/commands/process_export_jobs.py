@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Django management command that generates queued data exports.
+
+Exports requested from the web UI are stored as pending DataExport rows and
+built here, outside the request/response cycle. Jobs are claimed with
+SELECT ... FOR UPDATE SKIP LOCKED, so several workers can run side by side
+(e.g. as separate containers or processes).
+
+Usage:
+    python manage.py process_export_jobs
+    python manage.py process_export_jobs --once
+    python manage.py process_export_jobs --poll-interval 2 --max-jobs 100
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from checktick_app.surveys.services.export_service import ExportService
+
+
+class Command(BaseCommand):
+    help = "Generate queued data exports (runs until stopped unless --once)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Process the jobs currently queued, then exit",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=5.0,
+            help="Seconds to wait between polls when the queue is empty",
+        )
+        parser.add_argument(
+            "--max-jobs",
+            type=int,
+            default=0,
+            help="Exit after processing this many jobs (0 = no limit)",
+        )
+
+    def handle(self, *args, **options):
+        once = options["once"]
+        poll_interval = options["poll_interval"]
+        max_jobs = options["max_jobs"]
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Export worker started at {timezone.now()}")
+        )
+
+        processed = failed = 0
+        try:
+            while not max_jobs or processed < max_jobs:
+                close_old_connections()
+                export = ExportService.claim_next_export()
+                if export is None:
+                    if once:
+                        break
+                    time.sleep(poll_interval)
+                    continue
+
+                processed += 1
+                started = time.monotonic()
+                try:
+                    # Background worker: legacy demographics may be decrypted
+                    # across a process pool (never done in web requests)
+                    ExportService.process_export(export, decrypt_workers=None)
+                except Exception as e:
+                    failed += 1
+                    self.stdout.write(
+                        self.style.ERROR(f"  ✗ Export {export.id} failed: {e}")
+                    )
+                    continue
+
+                self.stdout.write(
+                    f"  ✓ Export {export.id}: {export.rows_done} rows, "
+                    f"{export.file_size_bytes} bytes in "
+                    f"{time.monotonic() - started:.1f}s"
+                )
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING("Interrupted"))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Export worker stopped at {timezone.now()}: "
+                f"{processed} processed, {failed} failed"
+            )
+        )
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Django management command that delivers queued survey invitation emails.
+
+Invitations entered on the publish page are stored as InviteMessage rows and
+sent here, outside the request/response cycle. Each batch is sent over one
+email backend connection. Failed recipients are retried with exponential
+backoff. Batches are claimed with SELECT ... FOR UPDATE SKIP LOCKED, so
+several workers can run side by side.
+
+Usage:
+    python manage.py process_invite_outbox
+    python manage.py process_invite_outbox --once
+    python manage.py process_invite_outbox --batch-size 200 --poll-interval 2
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from checktick_app.surveys.services.invite_service import InviteService
+
+
+class Command(BaseCommand):
+    help = "Deliver queued survey invitation emails (runs until stopped unless --once)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Deliver the messages currently due, then exit",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=InviteService.BATCH_SIZE,
+            help="Messages sent per connection",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=5.0,
+            help="Seconds to wait between polls when nothing is due",
+        )
+
+    def handle(self, *args, **options):
+        once = options["once"]
+        batch_size = options["batch_size"]
+        poll_interval = options["poll_interval"]
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Invite worker started at {timezone.now()}")
+        )
+
+        total_sent = total_failed = 0
+        try:
+            while True:
+                close_old_connections()
+                messages = InviteService.claim_batch(batch_size)
+                if not messages:
+                    if once:
+                        break
+                    time.sleep(poll_interval)
+                    continue
+
+                started = time.monotonic()
+                sent, failed = InviteService.deliver_batch(messages)
+                total_sent += sent
+                total_failed += failed
+                self.stdout.write(
+                    f"  ✓ Batch of {len(messages)}: {sent} sent, {failed} not sent "
+                    f"in {time.monotonic() - started:.1f}s"
+                )
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING("Interrupted"))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Invite worker stopped at {timezone.now()}: "
+                f"{total_sent} sent, {total_failed} not sent"
+            )
+        )
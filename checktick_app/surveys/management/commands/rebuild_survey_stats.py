@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Django management command to rebuild the daily survey stats rollup.
+
+SurveyDailyStats is kept up to date as responses and invites are created,
+and as responses are deleted (including the batched deletes of the retention
+engine). Run this to backfill it, or to repair drift after responses or
+invite tokens were changed outside the application (manual SQL, restores).
+
+Usage:
+    python manage.py rebuild_survey_stats
+    python manage.py rebuild_survey_stats --survey my-survey-slug
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from checktick_app.surveys.models import Survey, SurveyDailyStats
+
+
+class Command(BaseCommand):
+    help = "Recompute SurveyDailyStats from responses and invite tokens"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--survey",
+            action="append",
+            metavar="SLUG",
+            help="Only rebuild this survey (may be repeated)",
+        )
+
+    def handle(self, *args, **options):
+        surveys = Survey.objects.order_by("id")
+        if options["survey"]:
+            surveys = surveys.filter(slug__in=options["survey"])
+            missing = set(options["survey"]) - set(
+                surveys.values_list("slug", flat=True)
+            )
+            if missing:
+                raise CommandError(f"Unknown survey: {', '.join(sorted(missing))}")
+
+        survey_count = day_count = 0
+        for survey in surveys.only("id", "slug").iterator():
+            day_count += SurveyDailyStats.rebuild(survey)
+            survey_count += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt daily stats for {survey_count} surveys ({day_count} days)"
+            )
+        )
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Django management command that fetches the prefilled datasets ahead of use.
+
+Every dataset (or the ones named) is fetched from the upstream API in
+parallel, over the shared HTTP session, validated, and written to the cache
+and its on-disk snapshot. Run it from deploy hooks so the first survey-taker
+after a deploy or cache flush is not the one waiting on the upstream API, and
+on a schedule (with --stale-only) to keep datasets fresh without relying on
+request-triggered refreshes.
+
+Web processes only see the result through a shared cache or the snapshot
+files, so with the default local-memory cache the snapshot directory must be
+shared with them (see docs/self-hosting-scheduled-tasks.md).
+
+A dataset that fails keeps its previous cached copy and snapshot; the command
+exits with an error if any dataset failed.
+
+Usage:
+    python manage.py warm_dataset_cache
+    python manage.py warm_dataset_cache nhs_trusts welsh_lhbs
+    python manage.py warm_dataset_cache --stale-only --workers 2
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from checktick_app.surveys.external_datasets import (
+    AVAILABLE_DATASETS,
+    DatasetFetchError,
+    is_dataset_fresh,
+    refresh_dataset,
+)
+
+
+def _warm(dataset_key: str) -> tuple[str, float, list[str] | None, str]:
+    """Refresh one dataset; returns (key, seconds, options or None, error)."""
+    started = time.monotonic()
+    try:
+        options = refresh_dataset(dataset_key)
+    except DatasetFetchError as e:
+        return dataset_key, time.monotonic() - started, None, str(e)
+    return dataset_key, time.monotonic() - started, options, ""
+
+
+class Command(BaseCommand):
+    help = "Fetch prefilled datasets in parallel into the cache and snapshots"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "datasets",
+            nargs="*",
+            metavar="dataset_key",
+            help="Datasets to fetch (default: all available datasets)",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Datasets fetched at the same time",
+        )
+        parser.add_argument(
+            "--stale-only",
+            action="store_true",
+            help="Skip datasets whose cached copy or snapshot is still fresh",
+        )
+
+    def handle(self, *args, **options):
+        dataset_keys = options["datasets"] or list(AVAILABLE_DATASETS)
+        unknown = [key for key in dataset_keys if key not in AVAILABLE_DATASETS]
+        if unknown:
+            raise CommandError(f"Unknown dataset key(s): {', '.join(unknown)}")
+        if options["workers"] < 1:
+            raise CommandError("--workers must be at least 1")
+
+        if options["stale_only"]:
+            fresh = [key for key in dataset_keys if is_dataset_fresh(key)]
+            for key in fresh:
+                self.stdout.write(f"  - {key}: fresh, skipped")
+            dataset_keys = [key for key in dataset_keys if key not in fresh]
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Warming {len(dataset_keys)} dataset(s) at {timezone.now()}"
+            )
+        )
+
+        started = time.monotonic()
+        failed = []
+        workers = min(options["workers"], len(dataset_keys)) or 1
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="dataset-warm"
+        ) as executor:
+            for key, seconds, dataset, error in executor.map(_warm, dataset_keys):
+                if dataset is None:
+                    failed.append(key)
+                    self.stdout.write(
+                        self.style.ERROR(f"  ✗ {key}: {error} ({seconds:.2f}s)")
+                    )
+                    continue
+                size_kb = len(json.dumps(dataset).encode()) / 1024
+                self.stdout.write(
+                    f"  ✓ {key}: {len(dataset)} options, {size_kb:.1f} KB "
+                    f"in {seconds:.2f}s"
+                )
+
+        elapsed = time.monotonic() - started
+        if failed:
+            raise CommandError(
+                f"{len(failed)} of {len(dataset_keys)} dataset(s) failed "
+                f"({', '.join(failed)}) in {elapsed:.2f}s; "
+                "their previous copies are still served"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Warmed {len(dataset_keys)} dataset(s) in {elapsed:.2f}s"
+            )
+        )
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("surveys", "0018_alter_survey_retention_months"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dataexport",
+            name="file_path",
+            field=models.CharField(
+                blank=True,
+                help_text="Name of the generated artifact in the exports storage",
+                max_length=500,
+            ),
+        ),
+    ]
@@ -0,0 +1,90 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:32
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("surveys", "0019_dataexport_file_path"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dataexport",
+            name="attempts",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="dataexport",
+            name="completed_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="dataexport",
+            name="error",
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name="dataexport",
+            name="heartbeat_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="dataexport",
+            name="job_secrets",
+            field=models.BinaryField(
+                blank=True,
+                help_text="Sealed password/survey key for the worker; cleared when the job ends",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="dataexport",
+            name="rows_done",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="dataexport",
+            name="started_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        # Exports created before the job queue were generated synchronously,
+        # so existing rows are already complete; new rows start as pending.
+        migrations.AddField(
+            model_name="dataexport",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("pending", "Pending"),
+                    ("running", "Running"),
+                    ("completed", "Completed"),
+                    ("failed", "Failed"),
+                ],
+                default="completed",
+                max_length=20,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="dataexport",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("pending", "Pending"),
+                    ("running", "Running"),
+                    ("completed", "Completed"),
+                    ("failed", "Failed"),
+                ],
+                default="pending",
+                max_length=20,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="dataexport",
+            index=models.Index(
+                fields=["status", "created_at"], name="surveys_dat_status_357f70_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,93 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:58
+
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.deletion
+from django.db.models.functions import TruncDate
+
+
+def backfill_daily_stats(apps, schema_editor):
+    """Build the rollup from existing responses and invite tokens.
+
+    Mirrors SurveyDailyStats.rebuild; the rebuild_survey_stats command can
+    repeat this at any time.
+    """
+    SurveyResponse = apps.get_model("surveys", "SurveyResponse")
+    SurveyAccessToken = apps.get_model("surveys", "SurveyAccessToken")
+    SurveyDailyStats = apps.get_model("surveys", "SurveyDailyStats")
+
+    def per_day(queryset, field):
+        rows = (
+            queryset.annotate(day=TruncDate(field))
+            .values("survey_id", "day")
+            .annotate(n=Count("id"))
+            .order_by()
+        )
+        return {(row["survey_id"], row["day"]): row["n"] for row in rows}
+
+    invites = SurveyAccessToken.objects.filter(note__icontains="invited")
+    responses = per_day(SurveyResponse.objects.all(), "submitted_at")
+    invites_sent = per_day(invites, "created_at")
+    invites_used = per_day(
+        SurveyResponse.objects.filter(access_token__in=invites), "submitted_at"
+    )
+
+    keys = set(responses) | set(invites_sent) | set(invites_used)
+    SurveyDailyStats.objects.bulk_create(
+        (
+            SurveyDailyStats(
+                survey_id=survey_id,
+                day=day,
+                responses=responses.get((survey_id, day), 0),
+                invites_sent=invites_sent.get((survey_id, day), 0),
+                invites_used=invites_used.get((survey_id, day), 0),
+            )
+            for survey_id, day in keys
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("surveys", "0020_dataexport_job_status"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SurveyDailyStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("responses", models.PositiveIntegerField(default=0)),
+                ("invites_sent", models.PositiveIntegerField(default=0)),
+                ("invites_used", models.PositiveIntegerField(default=0)),
+                (
+                    "survey",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_stats",
+                        to="surveys.survey",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["survey", "day"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("survey", "day"), name="unique_survey_daily_stats"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_daily_stats, migrations.RunPython.noop),
+    ]
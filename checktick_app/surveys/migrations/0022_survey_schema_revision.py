@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("surveys", "0021_survey_daily_stats"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="survey",
+            name="schema_revision",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
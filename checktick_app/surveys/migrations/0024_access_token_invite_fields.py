@@ -0,0 +1,93 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:06
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def backfill_invites(apps, schema_editor):
+    """Fill invite_email/invite_sent_at from "Invited: <email>" notes.
+
+    Invites queued through the outbox take their sent/bounced times from
+    their InviteMessage rows; older invites were sent synchronously when
+    the token was created.
+    """
+    SurveyAccessToken = apps.get_model("surveys", "SurveyAccessToken")
+    InviteMessage = apps.get_model("surveys", "InviteMessage")
+
+    sent = dict(
+        InviteMessage.objects.filter(status="sent")
+        .values("token_id")
+        .annotate(at=Max("sent_at"))
+        .values_list("token_id", "at")
+    )
+    bounced = dict(
+        InviteMessage.objects.filter(status="failed")
+        .values("token_id")
+        .annotate(at=Max("claimed_at"))
+        .values_list("token_id", "at")
+    )
+    queued = set(InviteMessage.objects.values_list("token_id", flat=True))
+
+    batch = []
+    tokens = SurveyAccessToken.objects.filter(note__icontains="invited").only(
+        "id", "note", "created_at"
+    )
+    for token in tokens.iterator(chunk_size=2000):
+        note = token.note
+        email = note.split(":", 1)[1].strip() if ":" in note else ""
+        token.invite_email = (email or note)[:254]
+        if token.id in queued:
+            token.invite_sent_at = sent.get(token.id)
+            token.invite_bounced_at = bounced.get(token.id)
+        else:
+            token.invite_sent_at = token.created_at
+        batch.append(token)
+        if len(batch) == 1000:
+            SurveyAccessToken.objects.bulk_update(
+                batch, ["invite_email", "invite_sent_at", "invite_bounced_at"]
+            )
+            batch = []
+    SurveyAccessToken.objects.bulk_update(
+        batch, ["invite_email", "invite_sent_at", "invite_bounced_at"]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("surveys", "0023_invite_message"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="surveyaccesstoken",
+            name="invite_bounced_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="surveyaccesstoken",
+            name="invite_email",
+            field=models.CharField(blank=True, default="", max_length=254),
+        ),
+        migrations.AddField(
+            model_name="surveyaccesstoken",
+            name="invite_resent_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="surveyaccesstoken",
+            name="invite_sent_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_invites, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="surveyaccesstoken",
+            index=models.Index(
+                condition=models.Q(("invite_email", ""), _negated=True),
+                fields=["survey", "created_at"],
+                name="surveys_token_invites_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("surveys", "0024_access_token_invite_fields"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RetentionRun",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("started_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "phase",
+                    models.CharField(
+                        choices=[
+                            ("soft_delete", "Soft delete"),
+                            ("hard_delete", "Hard delete"),
+                            ("done", "Done"),
+                        ],
+                        default="soft_delete",
+                        max_length=20,
+                    ),
+                ),
+                ("last_survey_id", models.BigIntegerField(default=0)),
+                ("stats", models.JSONField(blank=True, default=dict)),
+            ],
+            options={
+                "ordering": ["-started_at", "-id"],
+            },
+        ),
+    ]
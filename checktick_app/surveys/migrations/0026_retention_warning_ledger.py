@@ -0,0 +1,67 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:29
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("surveys", "0025_retention_run"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RetentionWarningSent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("threshold_days", models.PositiveSmallIntegerField()),
+                ("deletion_date", models.DateTimeField()),
+                ("sent_at", models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                "ordering": ["-sent_at"],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="survey",
+            index=models.Index(
+                fields=["deleted_at", "deletion_date"],
+                name="surveys_sur_deleted_eac135_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="survey",
+            index=models.Index(
+                fields=["deleted_at", "hard_deletion_date"],
+                name="surveys_sur_deleted_775aaf_idx",
+            ),
+        ),
+        migrations.AddField(
+            model_name="retentionwarningsent",
+            name="survey",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="retention_warnings",
+                to="surveys.survey",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="retentionwarningsent",
+            constraint=models.UniqueConstraint(
+                fields=("survey", "threshold_days"),
+                name="unique_retention_warning_per_threshold",
+            ),
+        ),
+    ]
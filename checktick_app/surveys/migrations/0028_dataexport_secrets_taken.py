@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("surveys", "0027_governance_lock_and_shards"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dataexport",
+            name="secrets_taken",
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AlterField(
+            model_name="dataexport",
+            name="job_secrets",
+            field=models.BinaryField(
+                blank=True,
+                help_text="Sealed password/survey key; cleared once a worker claims the job",
+                null=True,
+            ),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("surveys", "0028_dataexport_secrets_taken"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="dataexport",
+            name="job_secrets",
+            field=models.BinaryField(
+                blank=True,
+                help_text="Sealed file key (derived from the password); cleared once a worker claims the job",
+                null=True,
+            ),
+        ),
+    ]
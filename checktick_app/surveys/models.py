@@ -1,17 +1,29 @@
 from __future__ import annotations
 
+from datetime import timedelta
+import logging
+import math
+import secrets
+from typing import Iterable, Iterator
 import uuid
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import IntegrityError, models, transaction
 from django.db.models import Q
 from django.utils import timezone
 
-from .utils import decrypt_sensitive, encrypt_sensitive, make_key_hash
+from .utils import (
+    decrypt_sensitive,
+    decrypt_sensitive_batch,
+    encrypt_sensitive,
+    encrypt_sensitive_record,
+    make_key_hash,
+)
 
 User = get_user_model()
+logger = logging.getLogger(__name__)
 
 
 def get_default_retention_months():
@@ -216,6 +228,20 @@ class Survey(models.Model):
         help_text="When ownership was transferred",
     )
 
+    # Bumped on every builder edit; keys the cached runtime schema
+    # (see runtime_schema.py). Only ever written with F() updates; saves
+    # reload it first so a stale instance never rolls it back.
+    schema_revision = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = [
+            # Retention scheduling: deletion warnings and soft deletion
+            # (deleted_at IS NULL, deletion_date range), hard deletion
+            # (deleted_at set, hard_deletion_date passed)
+            models.Index(fields=["deleted_at", "deletion_date"]),
+            models.Index(fields=["deleted_at", "hard_deletion_date"]),
+        ]
+
     def is_live(self) -> bool:
         now = timezone.now()
         time_ok = (self.start_at is None or self.start_at <= now) and (
@@ -611,13 +637,19 @@ class Survey(models.Model):
 
     def hard_delete(self) -> None:
         """Permanently delete survey data."""
-        # Delete responses
-        if hasattr(self, "responses"):
-            self.responses.all().delete()
+        with transaction.atomic():
+            # Delete responses
+            if hasattr(self, "responses"):
+                SurveyDailyStats.forget_responses(self.responses.all())
+                self.responses.all().delete()
+
+            # Stored export files are removed once the deletion commits
+            # (records cascade with the survey), so a rollback keeps them
+            for export in self.exports.exclude(file_path=""):
+                transaction.on_commit(export.delete_artifact, robust=True)
 
-        # Delete exports (will implement DataExport model later)
-        # if hasattr(self, 'data_exports'):
-        #     self.data_exports.all().delete()
+            # Delete survey
+            self.delete()
 
         # Purge backups (external API call - to be implemented)
         # from .services import BackupService
@@ -631,16 +663,13 @@ class Survey(models.Model):
         #     timestamp=timezone.now()
         # )
 
-        # Delete survey
-        self.delete()
-
     @property
     def days_until_deletion(self) -> int | None:
-        """Days remaining until automatic deletion."""
+        """Days remaining until automatic deletion, rounded up (0 once passed)."""
         if not self.deletion_date or self.deleted_at:
             return None
-        delta = self.deletion_date - timezone.now()
-        return max(0, delta.days)
+        remaining = self.deletion_date - timezone.now()
+        return max(0, math.ceil(remaining / timedelta(days=1)))
 
     @property
     def can_extend_retention(self) -> bool:
@@ -900,14 +929,92 @@ class SurveyResponse(models.Model):
         related_name="response",
     )
 
-    def store_demographics(self, survey_key: bytes, demographics: dict):
-        self.enc_demographics = encrypt_sensitive(survey_key, demographics)
+    def store_demographics(
+        self, survey_key: bytes, demographics: dict, *, is_kek: bool = False
+    ):
+        """
+        Encrypt and attach demographics.
+
+        is_kek must say whether survey_key is an unwrapped survey KEK (see
+        views.survey_key_is_kek); it is never guessed from the key, since a
+        legacy user-supplied key can have any length.
+        """
+        if is_kek:
+            # Unwrapped KEK: fast per-record HKDF subkey
+            self.enc_demographics = encrypt_sensitive_record(survey_key, demographics)
+        else:
+            # Legacy user-supplied keys may be low entropy; keep scrypt
+            self.enc_demographics = encrypt_sensitive(survey_key, demographics)
 
     def load_demographics(self, survey_key: bytes) -> dict:
         if not self.enc_demographics:
             return {}
         return decrypt_sensitive(survey_key, self.enc_demographics)
 
+    # Written in place of demographics that could not be decrypted
+    DEMOGRAPHICS_UNREADABLE = "[decryption failed]"
+
+    @staticmethod
+    def load_demographics_batch(
+        survey_key: bytes, responses, max_workers: int | None = 1
+    ):
+        """
+        Yield (response, demographics) pairs for an iterable of responses.
+
+        Decryption is batched (see utils.decrypt_sensitive_batch); results
+        keep the input order and stream, so callers can pass a chunked
+        queryset iterator. Responses whose demographics cannot be decrypted
+        yield None, and are counted and logged once the stream ends.
+
+        max_workers defaults to decrypting inline. Only background workers
+        (process_export_jobs) should pass None or a pool size: a process pool
+        must never be started from a web request.
+        """
+        from collections import deque
+
+        pending: deque[SurveyResponse] = deque()
+        failed: list[int] = []
+
+        def blobs():
+            for response in responses:
+                pending.append(response)
+                yield response.enc_demographics
+
+        for demographics in decrypt_sensitive_batch(
+            survey_key, blobs(), max_workers=max_workers
+        ):
+            response = pending.popleft()
+            if demographics is None:
+                failed.append(response.pk)
+            yield response, demographics
+
+        if failed:
+            logger.warning(
+                "Could not decrypt demographics of %d response(s) (ids: %s%s)",
+                len(failed),
+                ", ".join(str(pk) for pk in failed[:20]),
+                ", ..." if len(failed) > 20 else "",
+            )
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            return super().save(*args, **kwargs)
+        # Count the new response in the daily rollup in the same transaction
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            invited = self.access_token_id is not None and self.access_token.is_invite
+            SurveyDailyStats.record(
+                self.survey_id,
+                self.submitted_at,
+                responses=1,
+                invites_used=1 if invited else 0,
+            )
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            SurveyDailyStats.forget_responses(SurveyResponse.objects.filter(pk=self.pk))
+            return super().delete(*args, **kwargs)
+
     class Meta:
         constraints = [
             models.UniqueConstraint(
@@ -937,9 +1044,21 @@ class SurveyAccessToken(models.Model):
     )
     note = models.CharField(max_length=255, blank=True)
 
+    # Email invite tracking (blank/null for tokens not sent by email)
+    invite_email = models.CharField(max_length=254, blank=True, default="")
+    invite_sent_at = models.DateTimeField(null=True, blank=True)
+    invite_bounced_at = models.DateTimeField(null=True, blank=True)
+    invite_resent_at = models.DateTimeField(null=True, blank=True)
+
     class Meta:
         indexes = [
             models.Index(fields=["survey", "expires_at"]),
+            # Invite counts and the pending list only touch invite rows
+            models.Index(
+                fields=["survey", "created_at"],
+                condition=~Q(invite_email=""),
+                name="surveys_token_invites_idx",
+            ),
         ]
 
     def is_valid(self) -> bool:  # pragma: no cover
@@ -949,6 +1068,341 @@ class SurveyAccessToken(models.Model):
             return False
         return True
 
+    # Most tokens one request may mint, and rows per INSERT statement
+    MAX_BULK = 100_000
+    BULK_BATCH_SIZE = 1000
+
+    # Attempts at inserting a batch before a token collision is re-raised
+    COLLISION_RETRIES = 3
+
+    @property
+    def is_invite(self) -> bool:
+        """Whether this token was created by the email invite workflow."""
+        return bool(self.invite_email)
+
+    @classmethod
+    def mint_batches(
+        cls,
+        survey: Survey,
+        created_by,
+        notes: Iterable[str],
+        expires_at=None,
+        batch_size: int | None = None,
+        invite_emails: Iterable[str] | None = None,
+    ) -> Iterator[list[SurveyAccessToken]]:
+        """
+        Create one token per note with multi-row INSERTs.
+
+        Args:
+            survey: Survey the tokens grant access to
+            created_by: User creating the tokens
+            notes: Note for each token (e.g. itertools.repeat(note, count))
+            expires_at: Optional expiry applied to every token
+            batch_size: Rows per INSERT (defaults to BULK_BATCH_SIZE)
+            invite_emails: Invite recipient for each token, in the same
+                           order as notes (invite workflow only)
+
+        Yields:
+            Each batch of saved tokens (with primary keys)
+
+        Each batch is inserted in a savepoint; if a generated token collides
+        with an existing one the batch is regenerated and retried. Invite
+        tokens are counted in SurveyDailyStats here, since bulk_create
+        bypasses save(). Run inside transaction.atomic() for all-or-nothing.
+        """
+        from itertools import islice
+
+        notes = iter(notes)
+        invite_emails = iter(invite_emails) if invite_emails is not None else None
+        batch_size = batch_size or cls.BULK_BATCH_SIZE
+        while batch_notes := list(islice(notes, batch_size)):
+            batch_emails = (
+                list(islice(invite_emails, len(batch_notes)))
+                if invite_emails is not None
+                else []
+            )
+            batch_emails += [""] * (len(batch_notes) - len(batch_emails))
+            for attempt in range(1, cls.COLLISION_RETRIES + 1):
+                tokens = [
+                    cls(
+                        survey=survey,
+                        token=secrets.token_urlsafe(24),
+                        created_by=created_by,
+                        expires_at=expires_at,
+                        note=note,
+                        invite_email=invite_email,
+                    )
+                    for note, invite_email in zip(batch_notes, batch_emails)
+                ]
+                try:
+                    with transaction.atomic():
+                        cls.objects.bulk_create(tokens)
+                        SurveyDailyStats.record(
+                            survey.id,
+                            invites_sent=sum(1 for t in tokens if t.is_invite),
+                        )
+                except IntegrityError:
+                    if attempt == cls.COLLISION_RETRIES:
+                        raise
+                    continue
+                break
+            yield tokens
+
+    @classmethod
+    def bulk_mint(
+        cls,
+        survey: Survey,
+        created_by,
+        notes: Iterable[str],
+        expires_at=None,
+        invite_emails: Iterable[str] | None = None,
+    ) -> list[SurveyAccessToken]:
+        """Atomically create one token per note (see mint_batches)."""
+        with transaction.atomic():
+            return [
+                token
+                for batch in cls.mint_batches(
+                    survey,
+                    created_by,
+                    notes,
+                    expires_at,
+                    invite_emails=invite_emails,
+                )
+                for token in batch
+            ]
+
+    def save(self, *args, **kwargs):
+        if not (self._state.adding and self.is_invite):
+            return super().save(*args, **kwargs)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            SurveyDailyStats.record(self.survey_id, self.created_at, invites_sent=1)
+
+
+class SurveyDailyStats(models.Model):
+    """
+    Per-survey, per-day counters for dashboards and metrics.
+
+    - Bumped with F() expressions in the same transaction as the response or
+      invite being counted, so reads touch a handful of rows instead of
+      counting SurveyResponse
+    - Paths that bypass save()/delete() (bulk_create, queryset deletes of
+      responses) must call record() or forget_responses() themselves;
+      deleted invite tokens are subtracted by a post_delete receiver
+    - Days are calendar days in the site timezone
+    - rebuild() recomputes a survey's rows from the source tables (backfill
+      and drift repair; see the rebuild_survey_stats command)
+    """
+
+    survey = models.ForeignKey(
+        Survey, on_delete=models.CASCADE, related_name="daily_stats"
+    )
+    day = models.DateField()
+    responses = models.PositiveIntegerField(default=0)
+    invites_sent = models.PositiveIntegerField(default=0)
+    invites_used = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["survey", "day"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["survey", "day"], name="unique_survey_daily_stats"
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"Stats for survey {self.survey_id} on {self.day}"
+
+    @classmethod
+    def record(cls, survey_id: int, when=None, **deltas: int) -> None:
+        """Atomically add deltas (e.g. responses=1) to a survey's day row."""
+        day = timezone.localdate(when) if when else timezone.localdate()
+        cls._add(survey_id, day, deltas)
+
+    @classmethod
+    def _add(cls, survey_id: int, day, deltas: dict[str, int]) -> None:
+        from django.db.models.functions import Greatest
+
+        deltas = {field: n for field, n in deltas.items() if n}
+        if not deltas:
+            return
+        rows = cls.objects.filter(survey_id=survey_id, day=day)
+        if any(n > 0 for n in deltas.values()):
+            rows.get_or_create(survey_id=survey_id, day=day)
+        # Subtractions only touch an existing row: with no row there is
+        # nothing to subtract, and the survey may be mid-deletion
+        rows.update(
+            **{
+                # Never below zero, even if the row had already drifted
+                field: (
+                    models.F(field) + n if n > 0 else Greatest(models.F(field) + n, 0)
+                )
+                for field, n in deltas.items()
+            }
+        )
+
+    @classmethod
+    def forget_responses(cls, responses) -> None:
+        """
+        Subtract responses that are about to be deleted from their day rows.
+
+        Call in the same transaction as a queryset delete, which bypasses
+        SurveyResponse.delete(). One aggregate query, plus one update per
+        affected survey and day.
+        """
+        from django.db.models.functions import TruncDate
+
+        rows = (
+            responses.annotate(day=TruncDate("submitted_at"))
+            .values("survey_id", "day")
+            .annotate(
+                n=models.Count("id"),
+                invited=models.Count(
+                    "id",
+                    filter=Q(access_token__isnull=False)
+                    & ~Q(access_token__invite_email=""),
+                ),
+            )
+            .order_by()
+        )
+        for row in rows:
+            cls._add(
+                row["survey_id"],
+                row["day"],
+                {"responses": -row["n"], "invites_used": -row["invited"]},
+            )
+
+    @classmethod
+    def forget_invite_token(cls, sender, instance, **kwargs) -> None:
+        """
+        Signal receiver (post_delete): subtract a deleted invite token.
+
+        It no longer counts as sent on the day it was created, nor as used
+        on the day it was used. Queryset deletes send the signal per row, so
+        they are covered too.
+        """
+        if not instance.is_invite:
+            return
+        cls.record(instance.survey_id, instance.created_at, invites_sent=-1)
+        if instance.used_at:
+            cls.record(instance.survey_id, instance.used_at, invites_used=-1)
+
+    @classmethod
+    def rebuild(cls, survey: Survey) -> int:
+        """
+        Recompute a survey's daily rows from responses and invite tokens.
+
+        Returns:
+            Number of day rows written
+        """
+        from django.db.models.functions import TruncDate
+
+        def per_day(queryset, field):
+            rows = (
+                queryset.annotate(day=TruncDate(field))
+                .values("day")
+                .annotate(n=models.Count("id"))
+                .order_by()
+            )
+            return {row["day"]: row["n"] for row in rows}
+
+        invites = SurveyAccessToken.objects.filter(survey=survey).exclude(
+            invite_email=""
+        )
+        responses = per_day(survey.responses.all(), "submitted_at")
+        invites_sent = per_day(invites, "created_at")
+        invites_used = per_day(
+            survey.responses.filter(access_token__in=invites), "submitted_at"
+        )
+
+        days = sorted(set(responses) | set(invites_sent) | set(invites_used))
+        with transaction.atomic():
+            cls.objects.filter(survey=survey).delete()
+            cls.objects.bulk_create(
+                cls(
+                    survey=survey,
+                    day=day,
+                    responses=responses.get(day, 0),
+                    invites_sent=invites_sent.get(day, 0),
+                    invites_used=invites_used.get(day, 0),
+                )
+                for day in days
+            )
+        return len(days)
+
+    @classmethod
+    def totals(cls, survey: Survey, today=None) -> dict:
+        """
+        Summary counts for a survey in one aggregate query.
+
+        Returns:
+            Dict with total, today, last7, last14 (responses over the last N
+            calendar days including today), invites_sent and invites_used
+        """
+        from datetime import timedelta
+
+        today = today or timezone.localdate()
+        sums = cls.objects.filter(survey=survey).aggregate(
+            total=models.Sum("responses"),
+            today=models.Sum("responses", filter=Q(day=today)),
+            last7=models.Sum("responses", filter=Q(day__gt=today - timedelta(days=7))),
+            last14=models.Sum(
+                "responses", filter=Q(day__gt=today - timedelta(days=14))
+            ),
+            invites_sent=models.Sum("invites_sent"),
+            invites_used=models.Sum("invites_used"),
+        )
+        return {key: value or 0 for key, value in sums.items()}
+
+
+class InviteMessage(models.Model):
+    """
+    Outbox entry for one survey invitation email.
+
+    - Queued by the publish page together with the recipient's access token,
+      then delivered by the process_invite_outbox worker
+    - Each row tracks its own delivery status, attempts and last error;
+      failed sends are retried with exponential backoff (next_attempt_at)
+    - batch groups the rows queued by one publish action so the publish page
+      can report delivery progress
+    """
+
+    class Status(models.TextChoices):
+        QUEUED = "queued", "Queued"
+        SENDING = "sending", "Sending"
+        SENT = "sent", "Sent"
+        FAILED = "failed", "Failed"
+
+    survey = models.ForeignKey(
+        Survey, on_delete=models.CASCADE, related_name="invite_messages"
+    )
+    token = models.ForeignKey(
+        SurveyAccessToken, on_delete=models.CASCADE, related_name="invite_messages"
+    )
+    batch = models.UUIDField(default=uuid.uuid4, db_index=True)
+    email = models.EmailField()
+    contact_email = models.EmailField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    status = models.CharField(
+        max_length=20, choices=Status.choices, default=Status.QUEUED
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ["created_at", "id"]
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"]),
+            models.Index(fields=["survey", "status"]),
+        ]
+
+    def __str__(self):
+        return f"Invite to {self.email} ({self.status})"
+
 
 def validate_markdown_survey(md_text: str) -> list[dict]:
     if not md_text or not md_text.strip():
@@ -1148,8 +1602,16 @@ class DataExport(models.Model):
     - Download tokens prevent unauthorized access after export creation
     - Audit trail tracks who exported what and when
     - Downloaded_at tracks actual downloads for compliance reporting
+    - Generated in the background: status/rows_done track the job while a
+      process_export_jobs worker builds the file
     """
 
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        RUNNING = "running", "Running"
+        COMPLETED = "completed", "Completed"
+        FAILED = "failed", "Failed"
+
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     survey = models.ForeignKey(Survey, on_delete=models.CASCADE, related_name="exports")
     created_by = models.ForeignKey(
@@ -1164,6 +1626,11 @@ class DataExport(models.Model):
     download_count = models.PositiveIntegerField(default=0)
 
     # Export metadata
+    file_path = models.CharField(
+        max_length=500,
+        blank=True,
+        help_text="Name of the generated artifact in the exports storage",
+    )
     file_size_bytes = models.BigIntegerField(null=True, blank=True)
     response_count = models.PositiveIntegerField()
     export_format = models.CharField(max_length=10, default="csv")  # Future: json, xlsx
@@ -1172,11 +1639,33 @@ class DataExport(models.Model):
     is_encrypted = models.BooleanField(default=True)
     encryption_key_id = models.CharField(max_length=255, null=True, blank=True)
 
+    # Background job state
+    status = models.CharField(
+        max_length=20, choices=Status.choices, default=Status.PENDING
+    )
+    rows_done = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    job_secrets = models.BinaryField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Sealed file key (derived from the password); cleared once a "
+        "worker claims the job",
+    )
+    # A worker took job_secrets off the row; if it dies the job cannot be
+    # retried, as the file key is gone
+    secrets_taken = models.BooleanField(default=False, editable=False)
+
     class Meta:
         ordering = ["-created_at"]
         indexes = [
             models.Index(fields=["survey", "-created_at"]),
             models.Index(fields=["download_token"]),
+            models.Index(fields=["status", "created_at"]),
         ]
 
     def __str__(self) -> str:
@@ -1189,6 +1678,20 @@ class DataExport(models.Model):
 
         return timezone.now() > self.download_url_expires_at
 
+    @property
+    def is_ready(self) -> bool:
+        """Check if the export file has been generated."""
+        return self.status == self.Status.COMPLETED
+
+    @property
+    def progress_percent(self) -> int:
+        """Rows written so far as a percentage of response_count."""
+        if self.status == self.Status.COMPLETED:
+            return 100
+        if not self.response_count:
+            return 0
+        return min(99, self.rows_done * 100 // self.response_count)
+
     def mark_downloaded(self) -> None:
         """Record that this export was downloaded."""
         from django.utils import timezone
@@ -1198,6 +1701,15 @@ class DataExport(models.Model):
         self.download_count += 1
         self.save(update_fields=["downloaded_at", "download_count"])
 
+    def delete_artifact(self) -> None:
+        """Delete the stored export file, if any."""
+        from django.core.files.storage import storages
+
+        if not self.file_path:
+            return
+        storages["exports"].delete(self.file_path)
+        self.file_path = ""
+
 
 class LegalHold(models.Model):
     """
@@ -1447,3 +1959,123 @@ class DataRetentionExtension(models.Model):
         """Calculate the number of days extended."""
         delta = self.new_deletion_date - self.previous_deletion_date
         return delta.days
+
+
+class RetentionRun(models.Model):
+    """
+    Checkpoint and statistics of one automatic deletion run.
+
+    - RetentionService.process_automatic_deletions() records its progress
+      after every survey: the phase it is in and the last survey id handled
+    - A run that did not finish (finished_at is empty) is resumed by the
+      next call, from where it stopped
+    - stats holds the run's counts (soft/hard deleted, skipped for a legal
+      hold, responses deleted, errors)
+    - Sharded runs (process_data_governance --shards) keep one checkpoint
+      per shard
+    """
+
+    class Phase(models.TextChoices):
+        SOFT_DELETE = "soft_delete", "Soft delete"
+        HARD_DELETE = "hard_delete", "Hard delete"
+        DONE = "done", "Done"
+
+    started_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    phase = models.CharField(
+        max_length=20, choices=Phase.choices, default=Phase.SOFT_DELETE
+    )
+    last_survey_id = models.BigIntegerField(default=0)
+    stats = models.JSONField(default=dict, blank=True)
+
+    # Surveys with id % shard_count == shard_index
+    shard_index = models.PositiveIntegerField(default=0)
+    shard_count = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        ordering = ["-started_at", "-id"]
+
+    def __str__(self) -> str:
+        status = "finished" if self.finished_at else self.phase
+        return f"Retention run {self.pk} ({status})"
+
+
+class RetentionWarningSent(models.Model):
+    """
+    Ledger of deletion warning emails, one row per survey and threshold.
+
+    - Written by RetentionService.send_deletion_warning_once() before the
+      email is sent; the unique constraint stops two runs sending the same
+      warning
+    - deletion_date is the date the warning announced: once the survey's
+      deletion_date changes (retention extended, deletion cancelled) the
+      warning is due again and the row is reused
+    """
+
+    survey = models.ForeignKey(
+        Survey, on_delete=models.CASCADE, related_name="retention_warnings"
+    )
+    threshold_days = models.PositiveSmallIntegerField()
+    deletion_date = models.DateTimeField()
+    sent_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ["-sent_at"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["survey", "threshold_days"],
+                name="unique_retention_warning_per_threshold",
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.threshold_days}-day deletion warning for survey {self.survey_id}"
+
+
+class JobLock(models.Model):
+    """
+    Database-row lock that keeps one instance of a scheduled job running.
+
+    - One row per lock name, taken under SELECT ... FOR UPDATE
+    - A lock past its expires_at is stale (its holder crashed or hung) and
+      is taken over by the next caller
+    - Holders doing long work call refresh() to push expires_at back
+    """
+
+    name = models.CharField(max_length=100, unique=True)
+    holder = models.CharField(max_length=255, blank=True)
+    acquired_at = models.DateTimeField(null=True, blank=True)
+    expires_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self) -> str:
+        return f"{self.name} ({self.holder or 'free'})"
+
+    @classmethod
+    def acquire(cls, name: str, holder: str, timeout: timedelta) -> bool:
+        """Take the lock for holder; False if someone else holds it."""
+        cls.objects.get_or_create(name=name)
+        now = timezone.now()
+        with transaction.atomic():
+            lock = cls.objects.select_for_update().get(name=name)
+            if lock.holder and lock.expires_at and lock.expires_at > now:
+                return False
+            lock.holder = holder
+            lock.acquired_at = now
+            lock.expires_at = now + timeout
+            lock.save(update_fields=["holder", "acquired_at", "expires_at"])
+        return True
+
+    @classmethod
+    def refresh(cls, name: str, holder: str, timeout: timedelta) -> bool:
+        """Extend a held lock; False if holder lost it (e.g. it went stale)."""
+        return bool(
+            cls.objects.filter(name=name, holder=holder).update(
+                expires_at=timezone.now() + timeout
+            )
+        )
+
+    @classmethod
+    def release(cls, name: str, holder: str) -> None:
+        cls.objects.filter(name=name, holder=holder).update(holder="", expires_at=None)
@@ -1,54 +1,226 @@
+"""
+Permission predicates for surveys and organizations.
+
+Predicates read the user's memberships from a PermissionContext. The first
+check loads their owned organizations, OrganizationMembership and
+SurveyMembership rows together (and data custodianships, when an export check
+needs them), one query each. While a request is being handled
+(PermissionContextMiddleware) the context is shared by every predicate call
+for that user, so repeated checks - a dashboard rendering several flags, a
+list page checking each survey - cost no further queries. Outside a request
+each call builds a fresh context.
+"""
+
 from __future__ import annotations
 
+from contextvars import ContextVar
+from functools import cached_property
+
 from django.core.exceptions import PermissionDenied
+from django.db.models import Exists, OuterRef, Q, QuerySet
+from django.utils.functional import SimpleLazyObject
 
 from .models import Organization, OrganizationMembership, Survey, SurveyMembership
 
+# user id -> PermissionContext for the request being handled (None outside one)
+_request_contexts: ContextVar[dict | None] = ContextVar(
+    "checktick_permission_contexts", default=None
+)
+
+
+class PermissionContext:
+    """A user's organization and survey memberships, loaded once."""
+
+    def __init__(self, user):
+        self.user = user
+        self.user_id = user.pk if user.is_authenticated else None
+
+    @cached_property
+    def _memberships(self) -> tuple[frozenset[int], dict[int, str], dict[int, str]]:
+        if self.user_id is None:
+            return frozenset(), {}, {}
+        owned_org_ids = frozenset(
+            Organization.objects.filter(owner_id=self.user_id).values_list(
+                "id", flat=True
+            )
+        )
+        org_roles = dict(
+            OrganizationMembership.objects.filter(user_id=self.user_id).values_list(
+                "organization_id", "role"
+            )
+        )
+        survey_roles = dict(
+            SurveyMembership.objects.filter(user_id=self.user_id).values_list(
+                "survey_id", "role"
+            )
+        )
+        return owned_org_ids, org_roles, survey_roles
+
+    @property
+    def owned_org_ids(self) -> frozenset[int]:
+        """Ids of organizations the user owns."""
+        return self._memberships[0]
+
+    @property
+    def org_roles(self) -> dict[int, str]:
+        """OrganizationMembership role by organization id."""
+        return self._memberships[1]
+
+    @property
+    def survey_roles(self) -> dict[int, str]:
+        """SurveyMembership role by survey id."""
+        return self._memberships[2]
+
+    @cached_property
+    def custodianships(self) -> dict:
+        """Unrevoked DataCustodian grants by survey id (most recent first)."""
+        from .models import DataCustodian
+
+        if self.user_id is None:
+            return {}
+        grants = {}
+        for custodian in DataCustodian.objects.filter(
+            user_id=self.user_id, revoked_at__isnull=True
+        ):
+            grants.setdefault(custodian.survey_id, custodian)
+        return grants
+
+    def owns_survey(self, survey: Survey) -> bool:
+        return self.user_id is not None and survey.owner_id == self.user_id
+
+    def owns_org_of(self, survey: Survey) -> bool:
+        return bool(survey.organization_id) and (
+            survey.organization_id in self.owned_org_ids
+        )
+
+    def is_org_admin(self, org_id: int | None) -> bool:
+        return org_id is not None and (
+            self.org_roles.get(org_id) == OrganizationMembership.Role.ADMIN
+        )
+
+    def survey_role(self, survey: Survey) -> str | None:
+        return self.survey_roles.get(survey.id)
+
+
+def get_permission_context(user) -> PermissionContext:
+    """The user's PermissionContext, shared for the rest of the request."""
+    contexts = _request_contexts.get()
+    if contexts is None or not user.is_authenticated:
+        return PermissionContext(user)
+    context = contexts.get(user.pk)
+    if context is None:
+        context = contexts[user.pk] = PermissionContext(user)
+    return context
+
+
+def clear_permission_contexts(*args, **kwargs) -> None:
+    """Forget memberships loaded during this request (signal receiver)."""
+    contexts = _request_contexts.get()
+    if contexts:
+        contexts.clear()
+
+
+class PermissionContextMiddleware:
+    """Share one PermissionContext per user for the duration of a request.
+
+    Also exposes the current user's context as ``request.permissions``.
+    Place after AuthenticationMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = _request_contexts.set({})
+        try:
+            request.permissions = SimpleLazyObject(
+                lambda: get_permission_context(request.user)
+            )
+            return self.get_response(request)
+        finally:
+            _request_contexts.reset(token)
+
 
 def is_org_admin(user, org: Organization | None) -> bool:
     if not user.is_authenticated or org is None:
         return False
-    return OrganizationMembership.objects.filter(
-        user=user, organization=org, role=OrganizationMembership.Role.ADMIN
-    ).exists()
+    return get_permission_context(user).is_org_admin(org.id)
 
 
 def can_view_survey(user, survey: Survey) -> bool:
     if not user.is_authenticated:
         return False
-    if survey.owner_id == getattr(user, "id", None):
+    ctx = get_permission_context(user)
+    if ctx.owns_survey(survey):
         return True
     # Organization owner can view all surveys in their organization
-    if survey.organization_id and survey.organization.owner_id == getattr(
-        user, "id", None
-    ):
+    if ctx.owns_org_of(survey):
         return True
-    if survey.organization_id and is_org_admin(user, survey.organization):
+    if ctx.is_org_admin(survey.organization_id):
         return True
     # creators and viewers of the specific survey can view it
-    if SurveyMembership.objects.filter(user=user, survey=survey).exists():
-        return True
-    return False
+    return ctx.survey_role(survey) is not None
+
+
+def visible_surveys(
+    user, queryset: QuerySet | None = None, *, include_org_owner: bool = True
+) -> QuerySet:
+    """
+    The surveys can_view_survey allows, as one queryset.
+
+    Each rule is an Exists() subquery annotated on the survey row
+    (via_org_owner, via_org_admin, via_membership), so the database decides
+    visibility in a single query without joins that duplicate rows.
+
+    Args:
+        user: User whose surveys to list
+        queryset: Optional Survey queryset to narrow (defaults to all surveys)
+        include_org_owner: Whether owning a survey's organization is enough
+            to list it (the API list only includes org owners who are also
+            org admins)
+    """
+    if queryset is None:
+        queryset = Survey.objects.all()
+    if not user.is_authenticated:
+        return queryset.none()
+    rules = {
+        "via_org_admin": Exists(
+            OrganizationMembership.objects.filter(
+                organization_id=OuterRef("organization_id"),
+                user=user,
+                role=OrganizationMembership.Role.ADMIN,
+            )
+        ),
+        "via_membership": Exists(
+            SurveyMembership.objects.filter(survey_id=OuterRef("pk"), user=user)
+        ),
+    }
+    if include_org_owner:
+        rules["via_org_owner"] = Exists(
+            Organization.objects.filter(pk=OuterRef("organization_id"), owner=user)
+        )
+    visible = Q(owner=user)
+    for name in rules:
+        visible |= Q(**{name: True})
+    return queryset.annotate(**rules).filter(visible)
 
 
 def can_edit_survey(user, survey: Survey) -> bool:
     # Edit requires: owner, org owner, org admin, or survey-level creator/editor
     if not user.is_authenticated:
         return False
-    if survey.owner_id == getattr(user, "id", None):
+    ctx = get_permission_context(user)
+    if ctx.owns_survey(survey):
         return True
     # Organization owner can edit all surveys in their organization
-    if survey.organization_id and survey.organization.owner_id == getattr(
-        user, "id", None
-    ):
+    if ctx.owns_org_of(survey):
         return True
-    if survey.organization_id and is_org_admin(user, survey.organization):
+    if ctx.is_org_admin(survey.organization_id):
         return True
-    return SurveyMembership.objects.filter(
-        user=user,
-        survey=survey,
-        role__in=[SurveyMembership.Role.CREATOR, SurveyMembership.Role.EDITOR],
-    ).exists()
+    return ctx.survey_role(survey) in (
+        SurveyMembership.Role.CREATOR,
+        SurveyMembership.Role.EDITOR,
+    )
 
 
 def can_manage_org_users(user, org: Organization) -> bool:
@@ -57,14 +229,13 @@ def can_manage_org_users(user, org: Organization) -> bool:
 
 def can_manage_survey_users(user, survey: Survey) -> bool:
     # Only survey creators (not editors), org admins, or owner can manage users on a survey
-    if survey.organization_id and is_org_admin(user, survey.organization):
+    ctx = get_permission_context(user)
+    if ctx.is_org_admin(survey.organization_id):
         return True
-    if survey.owner_id == getattr(user, "id", None):
+    if ctx.owns_survey(survey):
         return True
     # Only CREATOR role can manage users, EDITOR cannot
-    return SurveyMembership.objects.filter(
-        user=user, survey=survey, role=SurveyMembership.Role.CREATOR
-    ).exists()
+    return ctx.survey_role(survey) == SurveyMembership.Role.CREATOR
 
 
 def require_can_view(user, survey: Survey) -> None:
@@ -80,7 +251,7 @@ def require_can_edit(user, survey: Survey) -> None:
 def user_has_org_membership(user) -> bool:
     if not user.is_authenticated:
         return False
-    return OrganizationMembership.objects.filter(user=user).exists()
+    return bool(get_permission_context(user).org_roles)
 
 
 # ============================================================================
@@ -97,9 +268,7 @@ def can_close_survey(user, survey: Survey) -> bool:
         return False
     if survey.owner_id == getattr(user, "id", None):
         return True
-    if survey.organization_id and survey.organization.owner_id == getattr(
-        user, "id", None
-    ):
+    if get_permission_context(user).owns_org_of(survey):
         return True
     return False
 
@@ -116,30 +285,18 @@ def can_export_survey_data(user, survey: Survey) -> bool:
     if survey.owner_id == getattr(user, "id", None):
         return True
 
+    ctx = get_permission_context(user)
     # Organization owner can export all surveys in their org
-    if survey.organization_id and survey.organization.owner_id == getattr(
-        user, "id", None
-    ):
+    if ctx.owns_org_of(survey):
         return True
 
     # Organization admins can export
-    if survey.organization_id and is_org_admin(user, survey.organization):
+    if ctx.is_org_admin(survey.organization_id):
         return True
 
-    # Check if user is an active data custodian for this survey
-    from .models import DataCustodian
-
-    if DataCustodian.objects.filter(
-        user=user, survey=survey, revoked_at__isnull=True
-    ).exists():
-        # Verify custodianship is still active (not expired)
-        custodian = DataCustodian.objects.filter(
-            user=user, survey=survey, revoked_at__isnull=True
-        ).first()
-        if custodian and custodian.is_active:
-            return True
-
-    return False
+    # Check if user is an active (unrevoked, unexpired) data custodian
+    custodian = ctx.custodianships.get(survey.id)
+    return bool(custodian and custodian.is_active)
 
 
 def can_extend_retention(user, survey: Survey) -> bool:
@@ -151,9 +308,7 @@ def can_extend_retention(user, survey: Survey) -> bool:
         return False
 
     # Organization owner only (not even survey owner)
-    if survey.organization_id and survey.organization.owner_id == getattr(
-        user, "id", None
-    ):
+    if get_permission_context(user).owns_org_of(survey):
         return True
 
     # If no organization, survey owner can extend
@@ -172,9 +327,7 @@ def can_manage_legal_hold(user, survey: Survey) -> bool:
         return False
 
     # Organization owner only
-    if survey.organization_id and survey.organization.owner_id == getattr(
-        user, "id", None
-    ):
+    if get_permission_context(user).owns_org_of(survey):
         return True
 
     # If no organization, survey owner can manage holds
@@ -193,9 +346,7 @@ def can_manage_data_custodians(user, survey: Survey) -> bool:
         return False
 
     # Organization owner only (not survey owner for security)
-    if survey.organization_id and survey.organization.owner_id == getattr(
-        user, "id", None
-    ):
+    if get_permission_context(user).owns_org_of(survey):
         return True
 
     # If no organization, survey owner can manage custodians
@@ -214,9 +365,7 @@ def can_soft_delete_survey(user, survey: Survey) -> bool:
         return False
     if survey.owner_id == getattr(user, "id", None):
         return True
-    if survey.organization_id and survey.organization.owner_id == getattr(
-        user, "id", None
-    ):
+    if get_permission_context(user).owns_org_of(survey):
         return True
     return False
 
@@ -230,9 +379,7 @@ def can_hard_delete_survey(user, survey: Survey) -> bool:
         return False
 
     # Organization owner only
-    if survey.organization_id and survey.organization.owner_id == getattr(
-        user, "id", None
-    ):
+    if get_permission_context(user).owns_org_of(survey):
         return True
 
     # If no organization, survey owner can hard delete (with caution)
@@ -0,0 +1,226 @@
+"""
+Compiled, cached survey schema for the participant take/submit path.
+
+Rendering or accepting a response needs the question list, option sets,
+demographics/professional field selections and the condition graph. Loading
+those costs several queries plus template option normalisation on every GET
+and POST. Instead the schema is compiled once per survey revision and stored
+in the Django cache:
+
+- Keyed by (survey id, creation time, Survey.schema_revision), so a builder
+  edit makes the old entry unreachable rather than relying on explicit
+  deletes, and a reused primary key never matches an older survey's entry
+- schema_revision is bumped by signal receivers whenever questions,
+  conditions or the survey's question groups change (and explicitly by the
+  builder's bulk reorder updates, which bypass signals)
+- Saving a Survey reloads schema_revision from the database first, so an
+  instance loaded before a builder edit never writes the old revision back
+- Compiled values are frozen dataclasses and tuples; each cache read returns
+  a fresh copy, so request code cannot mutate the shared schema
+
+With a warm cache, participant traffic runs no schema queries at all.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+from django.core.cache import cache
+from django.db.models import F
+
+CACHE_KEY = "survey-runtime-schema:{survey_id}:{created}:{revision}"
+CACHE_TIMEOUT = 60 * 60 * 24
+
+
+@dataclass(frozen=True)
+class RuntimeGroup:
+    id: int
+    name: str
+    description: str
+
+
+@dataclass(frozen=True)
+class RuntimeCondition:
+    question_id: int
+    operator: str
+    value: str
+    action: str
+    target_question_id: int | None
+    target_group_id: int | None
+
+
+@dataclass(frozen=True)
+class RuntimeQuestion:
+    """A question as rendered to participants (mirrors the model attributes
+    the take template reads)."""
+
+    id: int
+    idx: int
+    text: str
+    type: str
+    required: bool
+    options: Any
+    group_id: int | None
+    group: RuntimeGroup | None
+    group_start: bool
+    group_end: bool
+
+
+@dataclass(frozen=True)
+class SurveyRuntimeSchema:
+    survey_id: int
+    revision: int
+    questions: tuple[RuntimeQuestion, ...]
+    conditions: tuple[RuntimeCondition, ...]
+    has_patient_group: bool
+    demographics_fields: tuple[str, ...]
+    has_professional_group: bool
+    professional_fields: tuple[str, ...]
+    professional_ods: tuple[tuple[str, bool], ...]
+
+    @property
+    def collects_patient_data(self) -> bool:
+        return self.has_patient_group and bool(self.demographics_fields)
+
+    @property
+    def professional_ods_map(self) -> dict[str, bool]:
+        return dict(self.professional_ods)
+
+
+def compile_runtime_schema(survey) -> SurveyRuntimeSchema:
+    """Build the runtime schema for a survey from the database."""
+    from .models import SurveyQuestion, SurveyQuestionCondition
+    from .views import (
+        _get_patient_group_and_fields,
+        _get_professional_group_and_fields,
+        _normalize_patient_template_options,
+        _normalize_professional_template_options,
+    )
+
+    rows = list(survey.questions.select_related("group").all())
+    questions = []
+    for i, q in enumerate(rows, start=1):
+        prev_gid = rows[i - 2].group_id if i >= 2 else None
+        next_gid = rows[i].group_id if i < len(rows) else None
+        options = q.options
+        if q.type == SurveyQuestion.Types.TEMPLATE_PATIENT:
+            options = _normalize_patient_template_options(options)
+        elif q.type == SurveyQuestion.Types.TEMPLATE_PROFESSIONAL:
+            options = _normalize_professional_template_options(options)
+        group = (
+            RuntimeGroup(q.group.id, q.group.name, q.group.description)
+            if q.group
+            else None
+        )
+        questions.append(
+            RuntimeQuestion(
+                id=q.id,
+                idx=i,
+                text=q.text,
+                type=q.type,
+                required=q.required,
+                options=options,
+                group_id=q.group_id,
+                group=group,
+                group_start=bool(q.group_id and q.group_id != prev_gid),
+                group_end=bool(q.group_id and q.group_id != next_gid),
+            )
+        )
+
+    conditions = tuple(
+        RuntimeCondition(*row)
+        for row in SurveyQuestionCondition.objects.filter(
+            question__survey=survey
+        ).values_list(
+            "question_id",
+            "operator",
+            "value",
+            "action",
+            "target_question_id",
+            "target_group_id",
+        )
+    )
+
+    patient_group, demographics_fields = _get_patient_group_and_fields(survey)
+    prof_group, professional_fields, professional_ods = (
+        _get_professional_group_and_fields(survey)
+    )
+
+    return SurveyRuntimeSchema(
+        survey_id=survey.id,
+        revision=survey.schema_revision,
+        questions=tuple(questions),
+        conditions=conditions,
+        has_patient_group=patient_group is not None,
+        demographics_fields=tuple(demographics_fields),
+        has_professional_group=prof_group is not None,
+        professional_fields=tuple(professional_fields),
+        professional_ods=tuple(sorted(professional_ods.items())),
+    )
+
+
+def get_runtime_schema(survey) -> SurveyRuntimeSchema:
+    """Return the cached runtime schema for the survey's current revision."""
+    key = CACHE_KEY.format(
+        survey_id=survey.id,
+        created=int(survey.created_at.timestamp() * 1_000_000),
+        revision=survey.schema_revision,
+    )
+    schema = cache.get(key)
+    if schema is None:
+        schema = compile_runtime_schema(survey)
+        cache.set(key, schema, CACHE_TIMEOUT)
+    return schema
+
+
+def bump_schema_revision(**filters) -> None:
+    """Invalidate the runtime schema of every survey matching filters."""
+    from .models import Survey
+
+    Survey.objects.filter(**filters).update(schema_revision=F("schema_revision") + 1)
+
+
+# ---------------------------------------------------------------------------
+# Signal receivers (connected in SurveysConfig.ready)
+# ---------------------------------------------------------------------------
+
+
+def survey_saving(sender, instance, update_fields=None, **kwargs) -> None:
+    if instance._state.adding or instance.pk is None:
+        return
+    if update_fields is not None and "schema_revision" not in update_fields:
+        return
+    current = (
+        sender.objects.filter(pk=instance.pk)
+        .values_list("schema_revision", flat=True)
+        .first()
+    )
+    if current is not None:
+        instance.schema_revision = current
+
+
+def question_changed(sender, instance, **kwargs) -> None:
+    bump_schema_revision(pk=instance.survey_id)
+
+
+def condition_changed(sender, instance, **kwargs) -> None:
+    bump_schema_revision(questions__id=instance.question_id)
+
+
+def group_changed(sender, instance, **kwargs) -> None:
+    bump_schema_revision(question_groups=instance)
+
+
+def survey_groups_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in {"post_add", "post_remove", "post_clear", "pre_clear"}:
+        return
+    if not reverse:
+        # instance is the Survey
+        if action != "pre_clear":
+            bump_schema_revision(pk=instance.pk)
+    elif action == "pre_clear":
+        # instance is a QuestionGroup losing all its surveys
+        group_changed(sender, instance)
+    elif pk_set:
+        bump_schema_revision(pk__in=pk_set)
@@ -3,10 +3,12 @@ Data governance services for survey data management.
 
 This package contains business logic for:
 - Data export and download management (ExportService)
+- Bulk survey invitation delivery (InviteService)
 - Retention period management and automatic deletion (RetentionService)
 """
 
 from .export_service import ExportService
+from .invite_service import InviteService
 from .retention_service import RetentionService
 
-__all__ = ["ExportService", "RetentionService"]
+__all__ = ["ExportService", "InviteService", "RetentionService"]
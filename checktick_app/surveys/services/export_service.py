@@ -13,18 +13,23 @@ from __future__ import annotations
 import csv
 from datetime import timedelta
 from io import StringIO
+import json
+import logging
+import os
 import secrets
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Callable, Iterator
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.db import transaction
+from django.db.models import Q
 from django.utils import timezone
 
 if TYPE_CHECKING:
     from ..models import DataExport, Survey
 
 User = get_user_model()
+logger = logging.getLogger(__name__)
 
 
 class ExportService:
@@ -32,40 +37,138 @@ class ExportService:
     Service for creating and managing survey data exports.
 
     Workflow:
-    1. User requests export via API
-    2. Service generates CSV from survey responses
-    3. Service encrypts CSV with user-provided password
-    4. Service creates DataExport record with download token
-    5. Service returns download URL (valid for configured days)
-    6. User downloads file using token
-    7. Service tracks download in audit trail
+    1. User requests export; a pending DataExport with download token is queued
+    2. A process_export_jobs worker claims the job
+    3. Worker generates CSV from survey responses, recording progress
+    4. Worker encrypts CSV with a key derived from the user's password
+    5. Worker writes the file once to the "exports" storage
+    6. Download page polls the job status until it completes
+    7. User downloads file using token (streamed from storage)
+    8. Service tracks download in audit trail
+
+    Exports that decrypt demographics with an unlocked survey key are never
+    queued: the key stays in the web process, which generates the file
+    itself (create_export).
     """
 
     # Download token length
     TOKEN_LENGTH = 32
 
+    # A running job whose heartbeat is older than this is assumed abandoned
+    # (worker killed) and may be claimed again
+    STALE_AFTER = timedelta(minutes=10)
+
+    # Give up on an export after this many claims
+    MAX_ATTEMPTS = 3
+
+    # A queued export whose sealed file key has waited this long for a
+    # worker is failed and the key wiped
+    QUEUED_SECRETS_TTL = timedelta(hours=1)
+
+    # Shown to users when generation fails; details go to the log
+    FAILED_MESSAGE = "The export could not be generated. Please try again."
+    LOST_SECRETS_MESSAGE = (
+        "The export was interrupted and cannot be resumed. Please request it again."
+    )
+    EXPIRED_MESSAGE = (
+        "The export was not started in time and has been cancelled. "
+        "Please request it again."
+    )
+
     @classmethod
-    @transaction.atomic
     def create_export(
         cls,
         survey: Survey,
         user: User,
         password: str | None = None,
+        survey_key: bytes | None = None,
     ) -> DataExport:
         """
-        Create a new data export for a survey.
+        Create a new data export for a survey and generate it immediately.
 
         Args:
             survey: Survey to export data from
             user: User requesting the export
             password: Optional password to encrypt the export
+            survey_key: Unlocked survey KEK; when given, encrypted
+                        demographics are decrypted into the export
 
         Returns:
-            DataExport instance with download token
+            Completed DataExport instance with download token
 
         Raises:
             ValueError: If survey has no responses or is deleted
+
+        The password and survey key are only held in memory, never written
+        to the database. Web requests should use queue_export unless they
+        need the survey key (see can_queue_export).
+        """
+        export = cls._new_export(survey, user, is_encrypted=bool(password))
+        export.save(force_insert=True)
+        cls._start(export)
+        cls.process_export(
+            export,
+            survey_key=survey_key,
+            stream_key=cls._stream_key(password),
+        )
+        return export
+
+    @classmethod
+    def can_queue_export(cls, password: str | None, survey_key: bytes | None) -> bool:
+        """
+        Whether an export may go to the process_export_jobs worker.
+
+        Never with a survey key, which must not leave the web process. With a
+        password only if SECRET_KEY is configured: without it every process
+        generates its own, and the worker could not open the sealed file key.
+        """
+        if survey_key:
+            return False
+        return not password or settings.SECRET_KEY_CONFIGURED
+
+    @classmethod
+    def queue_export(
+        cls,
+        survey: Survey,
+        user: User,
+        password: str | None = None,
+    ) -> DataExport:
+        """
+        Queue a data export for background generation.
+
+        Args:
+            survey: Survey to export data from
+            user: User requesting the export
+            password: Optional password to encrypt the export
+
+        Returns:
+            Pending DataExport instance with download token
+
+        Raises:
+            ValueError: If survey has no responses or is deleted, or a
+                password is given without a configured SECRET_KEY
+
+        Only validates and inserts the job row (and derives the file key),
+        so it is cheap enough to run inside a request. The password itself
+        is not stored: the row gets a key derived from it that can only
+        encrypt this one export, sealed for the worker. The worker wipes it
+        from the row when it claims the job; if no worker claims it within
+        QUEUED_SECRETS_TTL the job is failed and the key wiped (see
+        expire_queued_exports).
         """
+        if not cls.can_queue_export(password, None):
+            raise ValueError(
+                "Password-protected exports can only be queued with a "
+                "configured SECRET_KEY"
+            )
+        export = cls._new_export(survey, user, is_encrypted=bool(password))
+        export.job_secrets = cls._seal_job_secrets(export, cls._stream_key(password))
+        export.save(force_insert=True)
+        return export
+
+    @classmethod
+    def _new_export(cls, survey: Survey, user: User, is_encrypted: bool) -> DataExport:
+        """Validate the survey and build an unsaved pending DataExport."""
         from ..models import DataExport, SurveyResponse
 
         # Validate survey state
@@ -77,19 +180,6 @@ class ExportService:
         if response_count == 0:
             raise ValueError("Survey has no responses to export")
 
-        # Generate CSV data
-        csv_data = cls._generate_csv(survey)
-
-        # Encrypt if password provided
-        if password:
-            encrypted_data, encryption_key_id = cls._encrypt_csv(csv_data, password)
-            is_encrypted = True
-            file_data = encrypted_data
-        else:
-            is_encrypted = False
-            encryption_key_id = None
-            file_data = csv_data.encode("utf-8")
-
         # Generate secure download token
         download_token = secrets.token_urlsafe(cls.TOKEN_LENGTH)
 
@@ -98,72 +188,428 @@ class ExportService:
             days=settings.CHECKTICK_DOWNLOAD_LINK_EXPIRY_DAYS
         )
 
-        # Create DataExport record
-        export = DataExport.objects.create(
+        return DataExport(
             survey=survey,
             created_by=user,
             download_token=download_token,
             download_url_expires_at=expires_at,
             response_count=response_count,
-            file_size_bytes=len(file_data),
             is_encrypted=is_encrypted,
-            encryption_key_id=encryption_key_id,
+            status=DataExport.Status.PENDING,
+        )
+
+    @classmethod
+    def claim_next_export(cls) -> DataExport | None:
+        """
+        Claim the oldest queued export for this worker.
+
+        Returns:
+            The claimed DataExport (now running), or None if the queue is empty
+
+        Rows are locked with SELECT ... FOR UPDATE SKIP LOCKED, so any number
+        of workers can poll concurrently without claiming the same job. Jobs
+        left running by a dead worker are reclaimed once their heartbeat is
+        older than STALE_AFTER, and failed after MAX_ATTEMPTS claims; a job
+        whose secrets were already taken by the dead worker is failed, as it
+        cannot be regenerated without them.
+        """
+        from ..models import DataExport
+
+        cls.expire_queued_exports()
+        while True:
+            now = timezone.now()
+            with transaction.atomic():
+                export = (
+                    DataExport.objects.select_for_update(skip_locked=True)
+                    .filter(
+                        Q(status=DataExport.Status.PENDING)
+                        | Q(
+                            status=DataExport.Status.RUNNING,
+                            heartbeat_at__lt=now - cls.STALE_AFTER,
+                        )
+                    )
+                    .order_by("created_at")
+                    .first()
+                )
+                if export is None:
+                    return None
+
+                if export.attempts >= cls.MAX_ATTEMPTS or export.secrets_taken:
+                    cls._finish(
+                        export,
+                        DataExport.Status.FAILED,
+                        error=(
+                            cls.LOST_SECRETS_MESSAGE
+                            if export.secrets_taken
+                            else "Export worker stopped responding"
+                        ),
+                    )
+                    export.delete_artifact()
+                    continue
+
+                cls._start(export)
+                return export
+
+    @classmethod
+    def _start(cls, export: DataExport) -> None:
+        """
+        Mark an export as running and take a new lease (attempt) on it.
+
+        The sealed secrets are wiped from the row in the same update; only
+        this in-memory instance keeps them, for process_export.
+        """
+        now = timezone.now()
+        sealed = export.job_secrets
+        export.status = export.Status.RUNNING
+        export.started_at = now
+        export.heartbeat_at = now
+        export.rows_done = 0
+        export.error = ""
+        export.attempts += 1
+        export.job_secrets = None
+        export.secrets_taken = bool(sealed)
+        export.save(
+            update_fields=[
+                "status",
+                "started_at",
+                "heartbeat_at",
+                "rows_done",
+                "error",
+                "attempts",
+                "job_secrets",
+                "secrets_taken",
+            ]
         )
+        export.job_secrets = sealed
+
+    @classmethod
+    def expire_queued_exports(cls) -> int:
+        """
+        Fail queued exports that have waited longer than QUEUED_SECRETS_TTL.
 
-        # TODO: Store encrypted file in object storage (S3/Azure Blob)
-        # For now, we'll regenerate on download (stateless)
+        Their sealed password and survey key are wiped, so secrets of jobs
+        that never run do not stay in the database.
 
-        return export
+        Returns:
+            Number of exports expired
+        """
+        from ..models import DataExport
+
+        now = timezone.now()
+        return DataExport.objects.filter(
+            status=DataExport.Status.PENDING,
+            job_secrets__isnull=False,
+            created_at__lt=now - cls.QUEUED_SECRETS_TTL,
+        ).update(
+            status=DataExport.Status.FAILED,
+            error=cls.EXPIRED_MESSAGE,
+            completed_at=now,
+            job_secrets=None,
+        )
 
     @classmethod
-    def _generate_csv(cls, survey: Survey) -> str:
+    def process_export(
+        cls,
+        export: DataExport,
+        decrypt_workers: int | None = 1,
+        survey_key: bytes | None = None,
+        stream_key: bytes | None = None,
+    ) -> None:
+        """
+        Generate the file for a claimed (running) export.
+
+        Args:
+            export: Export returned by claim_next_export
+            decrypt_workers: Passed to iter_csv; the process_export_jobs
+                             worker decrypts legacy demographics in a pool
+            survey_key: Unlocked survey KEK (create_export only)
+            stream_key: File key for encrypted exports; defaults to the one
+                        sealed by queue_export
+
+        Raises:
+            Exception: Whatever stopped generation, after the export has been
+                       marked as failed
+
+        Runs outside any transaction so progress updates are visible to the
+        status endpoint while the file is written. Progress writes are
+        conditional on this worker's attempt number; if another worker has
+        reclaimed the job, or the export was deleted, generation stops.
+        """
+        from ..models import DataExport
+
+        lease = DataExport.objects.filter(
+            pk=export.pk,
+            status=DataExport.Status.RUNNING,
+            attempts=export.attempts,
+        )
+
+        def on_progress(rows_done: int) -> None:
+            if not lease.update(rows_done=rows_done, heartbeat_at=timezone.now()):
+                raise RuntimeError("Export job was cancelled or reassigned")
+            export.rows_done = rows_done
+
+        try:
+            if stream_key is None:
+                stream_key = cls._open_job_secrets(export)
+            chunks = (
+                chunk.encode("utf-8")
+                for chunk in cls.iter_csv(
+                    export.survey,
+                    survey_key=survey_key,
+                    on_progress=on_progress,
+                    decrypt_workers=decrypt_workers,
+                )
+            )
+
+            # Encrypt if password provided (streamed, segment by segment)
+            if stream_key:
+                chunks, export.encryption_key_id = cls._encrypt_stream(
+                    chunks, stream_key=stream_key
+                )
+
+            # Write the artifact once; downloads stream it back from storage
+            export.file_path, export.file_size_bytes = cls._store_artifact(
+                export, chunks
+            )
+            export.response_count = export.rows_done
+        except Exception:
+            logger.exception("Export %s failed", export.id)
+            export.delete_artifact()
+            cls._finish(
+                export, DataExport.Status.FAILED, error=cls.FAILED_MESSAGE, lease=lease
+            )
+            raise
+
+        if not cls._finish(export, DataExport.Status.COMPLETED, lease=lease):
+            export.delete_artifact()
+            raise RuntimeError("Export job was cancelled or reassigned")
+
+    @classmethod
+    def _finish(cls, export: DataExport, status: str, error: str = "", lease=None):
+        """
+        Record the outcome of an export job and wipe its sealed secrets.
+
+        Returns:
+            False if the lease was lost (nothing was written), else True
+        """
+        from ..models import DataExport
+
+        export.status = status
+        export.error = error[:2000]
+        export.completed_at = timezone.now()
+        export.job_secrets = None
+        fields = {
+            "status": export.status,
+            "error": export.error,
+            "completed_at": export.completed_at,
+            "job_secrets": None,
+            "rows_done": export.rows_done,
+            "response_count": export.response_count,
+            "file_path": export.file_path,
+            "file_size_bytes": export.file_size_bytes,
+            "encryption_key_id": export.encryption_key_id,
+        }
+        if lease is None:
+            lease = DataExport.objects.filter(pk=export.pk)
+        return bool(lease.update(**fields))
+
+    @classmethod
+    def _job_cipher(cls):
+        """AES-GCM cipher for sealing job secrets, keyed from SECRET_KEY."""
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+        from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+        from django.utils.encoding import force_bytes
+
+        key = HKDF(
+            algorithm=hashes.SHA256(),
+            length=32,
+            salt=None,
+            info=b"checktick:export-job:v1",
+        ).derive(force_bytes(settings.SECRET_KEY))
+        return AESGCM(key)
+
+    @classmethod
+    def _stream_key(cls, password: str | None) -> bytes | None:
+        """File key for an export encrypted with password (see export_crypto)."""
+        from ..export_crypto import derive_stream_key
+
+        return derive_stream_key(password) if password else None
+
+    @classmethod
+    def _seal_job_secrets(
+        cls, export: DataExport, stream_key: bytes | None
+    ) -> bytes | None:
+        """Seal an export's file key for the worker."""
+        if not stream_key:
+            return None
+        nonce = os.urandom(12)
+        return nonce + cls._job_cipher().encrypt(nonce, stream_key, export.id.bytes)
+
+    @classmethod
+    def _open_job_secrets(cls, export: DataExport) -> bytes | None:
+        """Recover the file key sealed by queue_export."""
+        if not export.job_secrets:
+            return None
+        blob = bytes(export.job_secrets)
+        return cls._job_cipher().decrypt(blob[:12], blob[12:], export.id.bytes)
+
+    @classmethod
+    def artifact_name(cls, export: DataExport) -> str:
+        """Storage name for an export's generated file."""
+        extension = "csv.enc" if export.is_encrypted else export.export_format
+        return f"exports/{export.survey_id}/{export.id}.{extension}"
+
+    @classmethod
+    def _store_artifact(cls, export: DataExport, chunks) -> tuple[str, int]:
+        """
+        Write export bytes to the "exports" storage.
+
+        Args:
+            export: Export the artifact belongs to (provides the name)
+            chunks: Iterable of bytes chunks
+
+        Returns:
+            Tuple of (storage name, size in bytes)
+
+        Chunks are spooled through a temporary file so large exports never
+        have to be held in memory before handing them to the storage backend.
+        """
+        from tempfile import TemporaryFile
+
+        from django.core.files import File
+        from django.core.files.storage import storages
+
+        storage = storages["exports"]
+        size = 0
+        with TemporaryFile() as tmp:
+            for chunk in chunks:
+                tmp.write(chunk)
+                size += len(chunk)
+            tmp.seek(0)
+            name = storage.save(cls.artifact_name(export), File(tmp))
+        return name, size
+
+    @classmethod
+    def open_artifact(cls, export: DataExport):
+        """
+        Open a stored export for reading.
+
+        Returns:
+            Binary file object, or None if the export has no stored artifact
+            (created before artifacts were persisted, or the file is gone).
+            Callers must not regenerate an encrypted export in its place.
+        """
+        from django.core.files.storage import storages
+
+        if not export.file_path:
+            return None
+        storage = storages["exports"]
+        if not storage.exists(export.file_path):
+            return None
+        return storage.open(export.file_path, "rb")
+
+    # Responses fetched per database round trip while streaming an export
+    EXPORT_CHUNK_SIZE = 2000
+
+    @classmethod
+    def _generate_csv(cls, survey: Survey, survey_key: bytes | None = None) -> str:
         """
         Generate CSV string from survey responses.
 
         Args:
             survey: Survey to export
+            survey_key: Optional unlocked survey KEK (see iter_csv)
 
         Returns:
             CSV string with headers and response data
 
+        Buffers the whole export; prefer iter_csv for anything that can
+        consume a stream (HTTP responses, file storage).
+        """
+        return "".join(cls.iter_csv(survey, survey_key=survey_key))
+
+    @classmethod
+    def iter_csv(
+        cls,
+        survey: Survey,
+        survey_key: bytes | None = None,
+        on_progress: Callable[[int], None] | None = None,
+        decrypt_workers: int | None = 1,
+    ):
+        """
+        Stream CSV text for survey responses, one chunk per database batch.
+
+        Args:
+            survey: Survey to export
+            survey_key: Optional unlocked survey KEK. When provided, a
+                        Demographics column is added and encrypted
+                        demographics are batch-decrypted
+            on_progress: Optional callback receiving the number of rows
+                         written so far, called once per chunk
+            decrypt_workers: Process pool size for legacy demographics
+                             (None: all cores); the default decrypts inline.
+                             Only the export worker uses a pool.
+
+        Yields:
+            CSV text chunks (header first)
+
         Note:
             - Answers are stored in SurveyResponse.answers as JSON dict
             - enc_demographics contains encrypted patient demographics
             - Question IDs are used as keys in the answers dict
+            - Responses are read with a chunked server-side iterator and the
+              submitting user is joined in, so memory stays flat and there is
+              no per-row query regardless of response count
         """
         from ..models import SurveyQuestion, SurveyResponse
 
-        output = StringIO()
-
-        # Get all questions for this survey, ordered
-        questions = SurveyQuestion.objects.filter(survey=survey).order_by("order")
-
-        # Create CSV writer
-        writer = csv.writer(output)
+        # Column plan: computed once, reused for every row
+        questions = list(
+            SurveyQuestion.objects.filter(survey=survey)
+            .order_by("order")
+            .values_list("id", "text")
+        )
+        answer_keys = [str(question_id) for question_id, _ in questions]
 
-        # Write header row
         headers = [
             "Response ID",
             "Submitted At",
             "Submitted By",
         ]
+        headers.extend(text for _, text in questions)
+        if survey_key:
+            headers.append("Demographics")
+
+        output = StringIO()
+        writer = csv.writer(output)
 
-        # Add question text as headers (using question ID as reference)
-        question_list = list(questions)
-        for question in question_list:
-            # Use question text for header, will lookup by ID in answers
-            headers.append(question.text)
+        def flush() -> str:
+            value = output.getvalue()
+            output.seek(0)
+            output.truncate(0)
+            return value
 
         writer.writerow(headers)
+        yield flush()
 
-        # Write response rows
-        responses = SurveyResponse.objects.filter(survey=survey).order_by(
-            "submitted_at"
+        responses = (
+            SurveyResponse.objects.filter(survey=survey)
+            .select_related("submitted_by")
+            .order_by("submitted_at", "id")
+            .iterator(chunk_size=cls.EXPORT_CHUNK_SIZE)
         )
 
-        for response in responses:
-            # Get the answers dict (already decrypted at model level if needed)
-            # Note: enc_demographics would need survey_key to decrypt, but answers field is plain JSON
+        if survey_key:
+            rows = SurveyResponse.load_demographics_batch(
+                survey_key, responses, max_workers=decrypt_workers
+            )
+        else:
+            rows = ((response, None) for response in responses)
+
+        pending = 0
+        rows_done = 0
+        for response, demographics in rows:
             answers_dict = response.answers or {}
 
             row = [
@@ -175,26 +621,64 @@ class ExportService:
                     else "Anonymous"
                 ),
             ]
-
-            # Add answer for each question
-            # Answers are keyed by question ID or field name
-            for question in question_list:
-                # Try both question.id and str(question.id) as keys
-                answer = (
-                    answers_dict.get(str(question.id))
-                    or answers_dict.get(question.id)
-                    or ""
-                )
+            for key in answer_keys:
+                answer = answers_dict.get(key)
                 row.append(str(answer) if answer else "")
 
+            if survey_key:
+                if demographics is None:
+                    row.append(SurveyResponse.DEMOGRAPHICS_UNREADABLE)
+                else:
+                    row.append(json.dumps(demographics) if demographics else "")
+
             writer.writerow(row)
+            pending += 1
+            if pending >= cls.EXPORT_CHUNK_SIZE:
+                yield flush()
+                rows_done += pending
+                pending = 0
+                if on_progress:
+                    on_progress(rows_done)
+
+        if pending:
+            yield flush()
+            rows_done += pending
+        if on_progress:
+            on_progress(rows_done)
+
+    @classmethod
+    def _encrypt_stream(
+        cls,
+        chunks,
+        password: str | None = None,
+        stream_key: bytes | None = None,
+    ) -> tuple[Iterator[bytes], str]:
+        """
+        Encrypt a stream of CSV bytes with a user-provided password.
 
-        return output.getvalue()
+        Args:
+            chunks: Iterable of plaintext CSV byte chunks
+            password: User-provided password
+            stream_key: Key already derived from the password (used instead)
+
+        Returns:
+            Tuple of (encrypted byte chunk iterator, encryption_key_id)
+
+        Uses the segmented AES-256-GCM format in export_crypto.py, so exports
+        are never buffered whole. Recipients can decrypt with that file
+        alone (python3 export_crypto.py decrypt ...).
+        """
+        from ..export_crypto import encrypt_stream_with_key
+
+        encryption_key_id = f"password-{secrets.token_hex(8)}"
+        if stream_key is None:
+            stream_key = cls._stream_key(password)
+        return encrypt_stream_with_key(chunks, stream_key), encryption_key_id
 
     @classmethod
     def _encrypt_csv(cls, csv_data: str, password: str) -> tuple[bytes, str]:
         """
-        Encrypt CSV data with user-provided password.
+        Encrypt an in-memory CSV string with a user-provided password.
 
         Args:
             csv_data: CSV string to encrypt
@@ -202,16 +686,11 @@ class ExportService:
 
         Returns:
             Tuple of (encrypted_bytes, encryption_key_id)
-
-        TODO: Implement actual encryption with cryptography library
-        For now, this is a placeholder that would use AES-256-GCM
         """
-        # Placeholder for encryption implementation
-        # In production, use cryptography.fernet or AES-256-GCM
-        encrypted_data = csv_data.encode("utf-8")  # TODO: Actually encrypt
-        encryption_key_id = f"password-{secrets.token_hex(8)}"
-
-        return encrypted_data, encryption_key_id
+        chunks, encryption_key_id = cls._encrypt_stream(
+            [csv_data.encode("utf-8")], password
+        )
+        return b"".join(chunks), encryption_key_id
 
     @classmethod
     def get_download_url(cls, export: DataExport) -> str:
@@ -276,6 +755,7 @@ class ExportService:
         """
         from ..models import DataExport
 
+        cls.expire_queued_exports()
         cutoff_date = timezone.now() - timedelta(days=days_old)
 
         # Find expired exports
@@ -283,7 +763,9 @@ class ExportService:
 
         count = expired_exports.count()
 
-        # TODO: Delete associated files from object storage
+        # Delete associated files from export storage
+        for export in expired_exports.exclude(file_path="").only("id", "file_path"):
+            export.delete_artifact()
 
         # Delete records
         expired_exports.delete()
@@ -0,0 +1,291 @@
+"""
+InviteService - Queues and delivers survey invitation emails.
+
+Features:
+- Mint one access token per invitee and queue an outbox row in bulk
+- Deliver queued invitations in batches over a single SMTP connection
+- Per-recipient status with retry and exponential backoff
+- Delivery progress for the publish page
+"""
+
+from __future__ import annotations
+
+from datetime import timedelta
+import logging
+from typing import TYPE_CHECKING, Iterable
+import uuid
+
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+if TYPE_CHECKING:
+    from ..models import InviteMessage, Survey
+
+logger = logging.getLogger(__name__)
+
+
+class InviteService:
+    """
+    Service for bulk survey invitations.
+
+    Workflow:
+    1. Publish page calls queue_invites: tokens and InviteMessage rows are
+       inserted in one transaction and the request returns immediately
+    2. A process_invite_outbox worker claims due messages in batches
+    3. Worker renders each message and sends the batch over one connection
+    4. Each message is marked sent, or rescheduled with backoff until
+       MAX_ATTEMPTS is reached and it is marked failed
+    5. Publish page polls delivery_progress for the batch
+    """
+
+    # Messages claimed per worker iteration (one SMTP connection per batch)
+    BATCH_SIZE = 100
+
+    # Rows inserted per bulk_create statement
+    INSERT_BATCH_SIZE = 1000
+
+    # Give up on a recipient after this many delivery attempts
+    MAX_ATTEMPTS = 5
+
+    # Retry delays: BACKOFF_BASE * 2 ** (attempt - 1), capped at BACKOFF_MAX
+    BACKOFF_BASE = timedelta(minutes=1)
+    BACKOFF_MAX = timedelta(hours=1)
+
+    # A message left "sending" for longer than this is assumed abandoned
+    # (worker killed mid-batch) and may be claimed again
+    STALE_AFTER = timedelta(minutes=10)
+
+    @staticmethod
+    def is_valid_email(email_address: str) -> bool:
+        """Basic email format check used by the publish page."""
+        return "@" in email_address and "." in email_address.split("@")[1]
+
+    @classmethod
+    def queue_invites(
+        cls,
+        survey: Survey,
+        emails: Iterable[str],
+        created_by,
+        expires_at=None,
+        contact_email: str | None = None,
+    ) -> tuple[uuid.UUID, int, list[str]]:
+        """
+        Mint invite tokens and queue one invitation email per address.
+
+        Args:
+            survey: Survey to invite participants to
+            emails: Recipient addresses (already parsed)
+            created_by: User creating the invitations
+            expires_at: Optional token expiry
+            contact_email: Optional contact address shown in the email
+
+        Returns:
+            Tuple of (batch id, number queued, invalid addresses)
+        """
+        from ..models import InviteMessage, SurveyAccessToken
+
+        batch = uuid.uuid4()
+        valid, invalid = [], []
+        for email_address in emails:
+            (valid if cls.is_valid_email(email_address) else invalid).append(
+                email_address
+            )
+        if not valid:
+            return batch, 0, invalid
+
+        now = timezone.now()
+        queued = 0
+        with transaction.atomic():
+            for tokens in SurveyAccessToken.mint_batches(
+                survey,
+                created_by,
+                (f"Invited: {email_address}" for email_address in valid),
+                expires_at=expires_at,
+                batch_size=cls.INSERT_BATCH_SIZE,
+                invite_emails=valid,
+            ):
+                InviteMessage.objects.bulk_create(
+                    InviteMessage(
+                        survey=survey,
+                        token=token,
+                        batch=batch,
+                        email=email_address,
+                        contact_email=contact_email or "",
+                        next_attempt_at=now,
+                    )
+                    for token, email_address in zip(
+                        tokens, valid[queued : queued + len(tokens)]
+                    )
+                )
+                queued += len(tokens)
+        return batch, len(valid), invalid
+
+    @classmethod
+    def claim_batch(cls, limit: int | None = None) -> list[InviteMessage]:
+        """
+        Claim up to limit due messages for this worker.
+
+        Returns:
+            Claimed messages (now sending), oldest first; empty if none are due
+
+        Rows are locked with SELECT ... FOR UPDATE SKIP LOCKED, so several
+        workers can drain the outbox concurrently without double-sending.
+        """
+        from ..models import InviteMessage
+
+        now = timezone.now()
+        with transaction.atomic():
+            messages = list(
+                InviteMessage.objects.select_for_update(skip_locked=True, of=("self",))
+                .select_related("survey__organization", "token")
+                .filter(
+                    Q(
+                        status=InviteMessage.Status.QUEUED,
+                        next_attempt_at__lte=now,
+                    )
+                    | Q(
+                        status=InviteMessage.Status.SENDING,
+                        claimed_at__lt=now - cls.STALE_AFTER,
+                    )
+                )
+                .order_by("next_attempt_at", "id")[: limit or cls.BATCH_SIZE]
+            )
+            if messages:
+                InviteMessage.objects.filter(pk__in=[m.pk for m in messages]).update(
+                    status=InviteMessage.Status.SENDING, claimed_at=now
+                )
+        for message in messages:
+            message.status = InviteMessage.Status.SENDING
+            message.claimed_at = now
+        return messages
+
+    @classmethod
+    def deliver_batch(cls, messages: list[InviteMessage]) -> tuple[int, int]:
+        """
+        Send claimed messages over a single email backend connection.
+
+        Args:
+            messages: Messages returned by claim_batch
+
+        Returns:
+            Tuple of (sent, not sent) counts; not sent messages are either
+            rescheduled or, after MAX_ATTEMPTS, marked failed
+
+        Messages are passed to send_messages one at a time on the already
+        open connection, so a recipient the server rejects does not take the
+        rest of the batch down with it. The email is rendered once per
+        survey and contact address (CompiledSurveyInvite); each recipient
+        only costs a token substitution.
+        """
+        from django.core.mail import get_connection
+
+        from checktick_app.core.email_utils import CompiledSurveyInvite
+
+        if not messages:
+            return 0, 0
+
+        sent = failed = 0
+        templates = {}
+        try:
+            connection = get_connection(fail_silently=False)
+            connection.open()
+        except Exception as e:
+            logger.error(f"Failed to open email connection: {e}", exc_info=True)
+            for message in messages:
+                cls._record_failure(message, e)
+            return 0, len(messages)
+
+        try:
+            for message in messages:
+                try:
+                    key = (message.survey_id, message.contact_email)
+                    if key not in templates:
+                        templates[key] = CompiledSurveyInvite(
+                            message.survey, message.contact_email or None
+                        )
+                    email = templates[key].build(message.email, message.token.token)
+                    if not connection.send_messages([email]):
+                        raise RuntimeError("Email backend did not accept the message")
+                except Exception as e:
+                    logger.warning(
+                        f"Failed to send invite {message.pk} to {message.email}: {e}"
+                    )
+                    cls._record_failure(message, e)
+                    failed += 1
+                else:
+                    cls._record_sent(message)
+                    sent += 1
+        finally:
+            try:
+                connection.close()
+            except Exception:
+                pass
+        return sent, failed
+
+    @classmethod
+    def _record_sent(cls, message: InviteMessage) -> None:
+        from ..models import SurveyAccessToken
+
+        message.status = message.Status.SENT
+        message.attempts += 1
+        message.sent_at = timezone.now()
+        message.last_error = ""
+        message.save(update_fields=["status", "attempts", "sent_at", "last_error"])
+        SurveyAccessToken.objects.filter(pk=message.token_id).update(
+            invite_sent_at=message.sent_at, invite_bounced_at=None
+        )
+
+    @classmethod
+    def _record_failure(cls, message: InviteMessage, error: Exception) -> None:
+        message.attempts += 1
+        message.last_error = f"{type(error).__name__}: {error}"[:2000]
+        if message.attempts >= cls.MAX_ATTEMPTS:
+            from ..models import SurveyAccessToken
+
+            message.status = message.Status.FAILED
+            SurveyAccessToken.objects.filter(pk=message.token_id).update(
+                invite_bounced_at=timezone.now()
+            )
+        else:
+            message.status = message.Status.QUEUED
+            message.next_attempt_at = timezone.now() + cls.retry_delay(message.attempts)
+        message.save(
+            update_fields=["status", "attempts", "last_error", "next_attempt_at"]
+        )
+
+    @classmethod
+    def retry_delay(cls, attempts: int) -> timedelta:
+        """Backoff before the next attempt after `attempts` failed ones."""
+        exponent = min(max(attempts - 1, 0), 20)
+        return min(cls.BACKOFF_BASE * 2**exponent, cls.BACKOFF_MAX)
+
+    @classmethod
+    def delivery_progress(cls, survey: Survey, batch=None) -> dict:
+        """
+        Delivery counts for a survey's invitations, in one aggregate query.
+
+        Args:
+            survey: Survey whose outbox to summarise
+            batch: Optional batch id to restrict to one publish action
+
+        Returns:
+            Dict with total, queued, sending, sent, failed, retrying (queued
+            after at least one failed attempt) and done (sent + failed)
+        """
+        from ..models import InviteMessage
+
+        qs = InviteMessage.objects.filter(survey=survey)
+        if batch:
+            qs = qs.filter(batch=batch)
+        Status = InviteMessage.Status
+        counts = qs.aggregate(
+            total=Count("id"),
+            queued=Count("id", filter=Q(status=Status.QUEUED)),
+            sending=Count("id", filter=Q(status=Status.SENDING)),
+            sent=Count("id", filter=Q(status=Status.SENT)),
+            failed=Count("id", filter=Q(status=Status.FAILED)),
+            retrying=Count("id", filter=Q(status=Status.QUEUED, attempts__gt=0)),
+        )
+        counts["done"] = counts["sent"] + counts["failed"]
+        return counts
@@ -12,17 +12,21 @@ Features:
 from __future__ import annotations
 
 from datetime import timedelta
-from typing import TYPE_CHECKING
+import logging
+from typing import TYPE_CHECKING, Callable
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db import transaction
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef, QuerySet
+from django.db.models.functions import Mod
 from django.utils import timezone
 
 if TYPE_CHECKING:
     from ..models import Survey
 
 User = get_user_model()
+logger = logging.getLogger(__name__)
 
 
 class RetentionService:
@@ -49,6 +53,10 @@ class RetentionService:
     # Warning intervals before deletion
     WARNING_DAYS = [30, 7, 1]
 
+    # How long a warning stays due after its threshold is reached, so that
+    # a missed run is made up by the next one
+    WARNING_CATCH_UP = timedelta(days=2)
+
     # Grace period for soft deletion
     SOFT_DELETE_GRACE_DAYS = 30
 
@@ -56,6 +64,21 @@ class RetentionService:
     DEFAULT_RETENTION_MONTHS = 6
     MAX_RETENTION_MONTHS = 24
 
+    # Automatic deletion: candidate surveys listed per query, and responses
+    # deleted per transaction when a survey is hard deleted
+    DELETION_PAGE_SIZE = 100
+    RESPONSE_DELETE_BATCH_SIZE = 5000
+
+    # Counts reported by process_automatic_deletions
+    DELETION_STATS = (
+        "scanned",
+        "soft_deleted",
+        "hard_deleted",
+        "skipped_legal_hold",
+        "responses_deleted",
+        "errors",
+    )
+
     @classmethod
     def calculate_deletion_date(
         cls, closed_at, retention_months: int = DEFAULT_RETENTION_MONTHS
@@ -75,39 +98,124 @@ class RetentionService:
         return closed_at + timedelta(days=retention_days)
 
     @classmethod
-    def get_surveys_pending_deletion_warning(cls, days_before: int) -> list[Survey]:
+    def get_surveys_pending_deletion_warning(
+        cls, days_before: int, shard: tuple[int, int] | None = None
+    ) -> list[Survey]:
         """
         Get surveys that need deletion warning emails.
 
+        A warning is due once the survey is within days_before days of its
+        deletion_date, and stays due for WARNING_CATCH_UP (so a missed run is
+        made up by the next one) or until the next, more urgent, warning
+        takes over. Surveys already warned at this threshold for their
+        current deletion_date (see RetentionWarningSent) are left out, so the
+        command can run as often as needed without resending.
+
         Args:
             days_before: Number of days before deletion (30, 7, or 1)
+            shard: Optional (index, count); only surveys whose id % count ==
+                index are returned
 
         Returns:
-            QuerySet of surveys needing warnings
+            List of surveys needing warnings (owners loaded)
         """
-        from ..models import Survey
+        from ..models import LegalHold, RetentionWarningSent, Survey
 
-        # Calculate the target date range
-        warning_date = timezone.now() + timedelta(days=days_before)
-        # Give a 1-day window for the warning
-        date_from = warning_date - timedelta(hours=12)
-        date_to = warning_date + timedelta(hours=12)
-
-        # Find surveys with deletion_date in the warning window
-        surveys = Survey.objects.filter(
-            deletion_date__gte=date_from,
-            deletion_date__lte=date_to,
-            deleted_at__isnull=True,  # Not already deleted
-        ).exclude(
-            legal_hold__isnull=False,  # No legal hold
-            legal_hold__removed_at__isnull=True,
+        now = timezone.now()
+        more_urgent = [days for days in cls.WARNING_DAYS if days < days_before]
+        window_start = max(
+            now + timedelta(days=days_before) - cls.WARNING_CATCH_UP,
+            now + timedelta(days=max(more_urgent, default=0)),
         )
 
-        # TODO: Track which warnings have been sent to avoid duplicates
-        # For now, this will send warnings within the 24-hour window
-
+        already_warned = RetentionWarningSent.objects.filter(
+            survey=OuterRef("pk"),
+            threshold_days=days_before,
+            deletion_date=OuterRef("deletion_date"),
+        )
+        active_hold = LegalHold.objects.filter(
+            survey=OuterRef("pk"), removed_at__isnull=True
+        )
+        surveys = (
+            cls._in_shard(
+                Survey.objects.filter(
+                    deleted_at__isnull=True,  # Not already deleted
+                    deletion_date__gt=window_start,
+                    deletion_date__lte=now + timedelta(days=days_before),
+                ),
+                shard,
+            )
+            .exclude(Exists(active_hold))
+            .exclude(Exists(already_warned))
+            .select_related("owner")
+            .order_by("deletion_date", "pk")
+        )
         return list(surveys)
 
+    @classmethod
+    def send_deletion_warning_once(cls, survey: Survey, days_before: int) -> bool:
+        """
+        Send a deletion warning unless it was already sent.
+
+        The warning is recorded in the RetentionWarningSent ledger before the
+        email goes out, so concurrent runs cannot both send it; if sending
+        fails the record is removed again and the next run retries. The email
+        states the time actually left (Survey.days_until_deletion), which is
+        less than days_before when the warning is caught up late.
+
+        Args:
+            survey: Survey approaching deletion
+            days_before: Warning threshold (30, 7, or 1)
+
+        Returns:
+            True if the warning was sent, False if it had been sent already
+        """
+        if not cls._record_deletion_warning(survey, days_before):
+            return False
+        try:
+            cls.send_deletion_warning(survey, survey.days_until_deletion or 0)
+        except Exception:
+            cls._forget_deletion_warning(survey, days_before)
+            raise
+        return True
+
+    @classmethod
+    def _record_deletion_warning(cls, survey: Survey, days_before: int) -> bool:
+        """Claim the ledger entry for a warning; False if it already exists."""
+        from ..models import RetentionWarningSent
+
+        with transaction.atomic():
+            # A warning sent for an earlier deletion_date (since extended or
+            # restored) no longer counts: take over its row
+            if (
+                RetentionWarningSent.objects.filter(
+                    survey=survey, threshold_days=days_before
+                )
+                .exclude(deletion_date=survey.deletion_date)
+                .update(deletion_date=survey.deletion_date, sent_at=timezone.now())
+            ):
+                return True
+            try:
+                with transaction.atomic():
+                    RetentionWarningSent.objects.create(
+                        survey=survey,
+                        threshold_days=days_before,
+                        deletion_date=survey.deletion_date,
+                    )
+            except IntegrityError:
+                return False
+        return True
+
+    @classmethod
+    def _forget_deletion_warning(cls, survey: Survey, days_before: int) -> None:
+        from ..models import RetentionWarningSent
+
+        RetentionWarningSent.objects.filter(
+            survey=survey,
+            threshold_days=days_before,
+            deletion_date=survey.deletion_date,
+        ).delete()
+
     @classmethod
     def send_deletion_warning(cls, survey: Survey, days_remaining: int) -> None:
         """
@@ -165,58 +273,223 @@ class RetentionService:
         )
 
     @classmethod
-    @transaction.atomic
-    def process_automatic_deletions(cls) -> dict[str, int]:
+    def process_automatic_deletions(
+        cls,
+        shard: tuple[int, int] | None = None,
+        heartbeat: Callable[[], None] | None = None,
+    ) -> dict[str, int]:
         """
         Process all surveys due for automatic deletion.
 
         This should be run daily via Celery task.
 
+        Runs as a batched, resumable engine, so one large survey cannot hold
+        locks for minutes or roll back the rest of the run:
+        - each survey is soft or hard deleted in its own transaction, and the
+          responses of a survey being hard deleted are removed in batches of
+          RESPONSE_DELETE_BATCH_SIZE, one transaction each
+        - active legal holds are loaded in one query per phase; each survey
+          is re-checked (still due, no active hold) in the same query that
+          locks it
+        - progress is checkpointed on a RetentionRun after every survey, and
+          a run that was interrupted is resumed by the next call
+        - a survey that fails is logged and counted, and the run moves on
+
+        Args:
+            shard: Optional (index, count); only surveys whose id % count ==
+                index are processed, so several workers can split the work.
+                Each shard keeps its own RetentionRun checkpoint.
+            heartbeat: Optional callable invoked after every survey (e.g. to
+                keep a job lock from going stale); an exception it raises
+                aborts the run, which the next call resumes
+
         Returns:
-            Dictionary with counts of soft and hard deletions
+            Dictionary with counts of surveys scanned, soft and hard
+            deletions, surveys skipped for a legal hold, responses deleted
+            and errors
         """
-        from ..models import Survey
+        from ..models import LegalHold, RetentionRun
+
+        shard_index, shard_count = shard or (0, 1)
+        run = RetentionRun.objects.filter(
+            finished_at__isnull=True,
+            shard_index=shard_index,
+            shard_count=shard_count,
+        ).first()
+        if run is None:
+            run = RetentionRun.objects.create(
+                shard_index=shard_index, shard_count=shard_count
+            )
+        else:
+            logger.info(
+                "Resuming automatic deletion run %s (%s after survey %s)",
+                run.pk,
+                run.phase,
+                run.last_survey_id,
+            )
+        stats = {**dict.fromkeys(cls.DELETION_STATS, 0), **run.stats}
 
         now = timezone.now()
-        stats = {
-            "soft_deleted": 0,
-            "hard_deleted": 0,
-            "skipped_legal_hold": 0,
-        }
-
-        # Find surveys past their deletion_date (need soft deletion)
-        # First, find all candidates
-        candidates_for_soft_delete = Survey.objects.filter(
+        phases = [
+            (
+                RetentionRun.Phase.SOFT_DELETE,
+                cls._in_shard(cls._soft_delete_candidates(now), shard),
+                cls._soft_delete_survey,
+            ),
+            (
+                RetentionRun.Phase.HARD_DELETE,
+                cls._in_shard(cls._hard_delete_candidates(now), shard),
+                cls._hard_delete_survey,
+            ),
+        ]
+        phase_order = [phase for phase, _, _ in phases]
+        for phase, candidates, delete_survey in phases:
+            if phase_order.index(phase) < phase_order.index(run.phase):
+                continue  # Completed before the run was interrupted
+            if run.phase != phase:
+                run.phase = phase
+                run.last_survey_id = 0
+                run.save(update_fields=["phase", "last_survey_id", "updated_at"])
+
+            held = set(
+                LegalHold.objects.filter(
+                    survey__in=candidates, removed_at__isnull=True
+                ).values_list("survey_id", flat=True)
+            )
+            while True:
+                survey_ids = list(
+                    candidates.filter(pk__gt=run.last_survey_id)
+                    .order_by("pk")
+                    .values_list("pk", flat=True)[: cls.DELETION_PAGE_SIZE]
+                )
+                if not survey_ids:
+                    break
+                for survey_id in survey_ids:
+                    stats["scanned"] += 1
+                    if survey_id in held:
+                        stats["skipped_legal_hold"] += 1
+                    else:
+                        try:
+                            delete_survey(candidates, survey_id, stats)
+                        except Exception:
+                            logger.exception(
+                                "Automatic deletion (%s) failed for survey %s",
+                                phase,
+                                survey_id,
+                            )
+                            stats["errors"] += 1
+                    run.last_survey_id = survey_id
+                    run.stats = stats
+                    run.save(update_fields=["last_survey_id", "stats", "updated_at"])
+                    if heartbeat is not None:
+                        heartbeat()
+
+        run.phase = RetentionRun.Phase.DONE
+        run.stats = stats
+        run.finished_at = timezone.now()
+        run.save(update_fields=["phase", "stats", "finished_at", "updated_at"])
+        logger.info(
+            "Automatic deletion run %s finished in %.1fs: %s",
+            run.pk,
+            (run.finished_at - run.started_at).total_seconds(),
+            " ".join(f"{key}={value}" for key, value in stats.items()),
+        )
+        return stats
+
+    @classmethod
+    def _in_shard(
+        cls, queryset: QuerySet[Survey], shard: tuple[int, int] | None
+    ) -> QuerySet[Survey]:
+        """Restrict surveys to one shard: id % count == index."""
+        if shard is None or shard[1] == 1:
+            return queryset
+        index, count = shard
+        return queryset.annotate(retention_shard=Mod("pk", count)).filter(
+            retention_shard=index
+        )
+
+    @classmethod
+    def _soft_delete_candidates(cls, now) -> QuerySet[Survey]:
+        """Surveys past their deletion_date (need soft deletion)."""
+        from ..models import Survey
+
+        return Survey.objects.filter(
             deletion_date__lte=now,
             deleted_at__isnull=True,
             closed_at__isnull=False,  # Must be closed
         )
 
-        for survey in candidates_for_soft_delete:
-            # Skip surveys with active legal holds
-            if hasattr(survey, "legal_hold") and survey.legal_hold.is_active:
-                stats["skipped_legal_hold"] += 1
-                continue
-
-            survey.soft_delete()
-            stats["soft_deleted"] += 1
+    @classmethod
+    def _hard_delete_candidates(cls, now) -> QuerySet[Survey]:
+        """Surveys past their hard_deletion_date (need permanent deletion)."""
+        from ..models import Survey
 
-        # Find surveys past their hard_deletion_date (need permanent deletion)
-        candidates_for_hard_delete = Survey.objects.filter(
+        return Survey.objects.filter(
             hard_deletion_date__lte=now,
             deleted_at__isnull=False,
         )
 
-        for survey in candidates_for_hard_delete:
-            # Skip surveys with active legal holds
-            if hasattr(survey, "legal_hold") and survey.legal_hold.is_active:
-                stats["skipped_legal_hold"] += 1
-                continue
+    @classmethod
+    def _lock_for_deletion(
+        cls, candidates: QuerySet[Survey], survey_id: int
+    ) -> Survey | None:
+        """
+        Lock a survey that is still due and has no active legal hold.
 
-            survey.hard_delete()
-            stats["hard_deleted"] += 1
+        Must be called inside a transaction. Returns None if the survey
+        changed since it was listed (restored, extended, put on hold).
+        """
+        from ..models import LegalHold
 
-        return stats
+        active_hold = LegalHold.objects.filter(
+            survey=OuterRef("pk"), removed_at__isnull=True
+        )
+        return (
+            candidates.select_for_update()
+            .filter(pk=survey_id)
+            .exclude(Exists(active_hold))
+            .first()
+        )
+
+    @classmethod
+    def _soft_delete_survey(
+        cls, candidates: QuerySet[Survey], survey_id: int, stats: dict[str, int]
+    ) -> None:
+        with transaction.atomic():
+            survey = cls._lock_for_deletion(candidates, survey_id)
+            if survey is not None:
+                survey.soft_delete()
+                stats["soft_deleted"] += 1
+
+    @classmethod
+    def _hard_delete_survey(
+        cls, candidates: QuerySet[Survey], survey_id: int, stats: dict[str, int]
+    ) -> None:
+        from ..models import SurveyDailyStats, SurveyResponse
+
+        # Responses first, in short transactions; each batch re-checks that
+        # the survey is still due, so a legal hold placed meanwhile stops it
+        while True:
+            with transaction.atomic():
+                if cls._lock_for_deletion(candidates, survey_id) is None:
+                    return
+                response_ids = list(
+                    SurveyResponse.objects.filter(survey_id=survey_id).values_list(
+                        "pk", flat=True
+                    )[: cls.RESPONSE_DELETE_BATCH_SIZE]
+                )
+                if not response_ids:
+                    break
+                batch = SurveyResponse.objects.filter(pk__in=response_ids)
+                SurveyDailyStats.forget_responses(batch)
+                batch.delete()
+            stats["responses_deleted"] += len(response_ids)
+
+        with transaction.atomic():
+            survey = cls._lock_for_deletion(candidates, survey_id)
+            if survey is not None:
+                survey.hard_delete()
+                stats["hard_deleted"] += 1
 
     @classmethod
     @transaction.atomic
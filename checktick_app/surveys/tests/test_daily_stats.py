@@ -0,0 +1,248 @@
+"""
+Tests for the SurveyDailyStats rollup.
+"""
+
+from __future__ import annotations
+
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.utils import timezone
+import pytest
+
+from checktick_app.surveys.models import (
+    Survey,
+    SurveyAccessToken,
+    SurveyDailyStats,
+    SurveyResponse,
+)
+
+TEST_PASSWORD = "x"
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(username="owner", password=TEST_PASSWORD)
+
+
+@pytest.fixture
+def survey(user):
+    return Survey.objects.create(owner=user, name="Stats", slug="stats")
+
+
+def _invite(survey, user, n):
+    return SurveyAccessToken.objects.create(
+        survey=survey,
+        token=f"invite-{n}",
+        created_by=user,
+        note=f"Invited: p{n}@example.com",
+        invite_email=f"p{n}@example.com",
+    )
+
+
+@pytest.mark.django_db
+class TestSurveyDailyStats:
+    def test_response_and_invites_are_counted_on_create(self, survey, user):
+        token = _invite(survey, user, 1)
+        _invite(survey, user, 2)
+        SurveyAccessToken.objects.create(survey=survey, token="plain", created_by=user)
+        SurveyResponse.objects.create(survey=survey, answers={})
+        SurveyResponse.objects.create(survey=survey, answers={}, access_token=token)
+
+        stats = SurveyDailyStats.objects.get(survey=survey)
+        assert stats.day == timezone.localdate()
+        assert (stats.responses, stats.invites_sent, stats.invites_used) == (2, 2, 1)
+
+    def test_updates_do_not_recount(self, survey):
+        response = SurveyResponse.objects.create(survey=survey, answers={"1": "a"})
+        response.answers = {"1": "b"}
+        response.save()
+
+        assert SurveyDailyStats.totals(survey)["total"] == 1
+
+    def test_failed_insert_is_not_counted(self, survey, user):
+        from django.db import IntegrityError
+
+        SurveyResponse.objects.create(survey=survey, answers={}, submitted_by=user)
+        with pytest.raises(IntegrityError):
+            SurveyResponse.objects.create(survey=survey, answers={}, submitted_by=user)
+
+        assert SurveyDailyStats.totals(survey)["total"] == 1
+
+    def test_totals_use_calendar_days(self, survey):
+        today = timezone.localdate()
+        for days_ago, responses in ((0, 2), (3, 1), (10, 4), (20, 8)):
+            SurveyDailyStats.objects.create(
+                survey=survey, day=today - timedelta(days=days_ago), responses=responses
+            )
+
+        totals = SurveyDailyStats.totals(survey)
+        assert totals["total"] == 15
+        assert totals["today"] == 2
+        assert totals["last7"] == 3
+        assert totals["last14"] == 7
+
+    def test_rebuild_repairs_drift(self, survey, user):
+        token = _invite(survey, user, 1)
+        old = SurveyResponse.objects.create(survey=survey, answers={})
+        SurveyResponse.objects.create(survey=survey, answers={}, access_token=token)
+        yesterday = timezone.now() - timedelta(days=1)
+        SurveyResponse.objects.filter(pk=old.pk).update(submitted_at=yesterday)
+        SurveyDailyStats.objects.filter(survey=survey).update(responses=99)
+
+        assert SurveyDailyStats.rebuild(survey) == 2
+
+        rows = list(
+            SurveyDailyStats.objects.filter(survey=survey).values_list(
+                "day", "responses", "invites_sent", "invites_used"
+            )
+        )
+        assert rows == [
+            (timezone.localdate(yesterday), 1, 0, 0),
+            (timezone.localdate(), 1, 1, 1),
+        ]
+
+    def _rows(self, survey):
+        return list(
+            SurveyDailyStats.objects.filter(survey=survey)
+            .exclude(responses=0, invites_sent=0, invites_used=0)
+            .values_list("day", "responses", "invites_sent", "invites_used")
+        )
+
+    def _rebuilt_rows(self, survey):
+        current = self._rows(survey)
+        SurveyDailyStats.rebuild(survey)
+        return current, self._rows(survey)
+
+    def test_deleted_responses_are_subtracted(self, survey, user):
+        token = _invite(survey, user, 1)
+        kept = SurveyResponse.objects.create(survey=survey, answers={})
+        single = SurveyResponse.objects.create(survey=survey, answers={})
+        invited = SurveyResponse.objects.create(
+            survey=survey, answers={}, access_token=token
+        )
+        old = SurveyResponse.objects.create(survey=survey, answers={})
+        SurveyResponse.objects.filter(pk=old.pk).update(
+            submitted_at=timezone.now() - timedelta(days=1)
+        )
+        SurveyDailyStats.rebuild(survey)
+
+        single.delete()
+        batch = SurveyResponse.objects.filter(pk__in=[invited.pk, old.pk])
+        SurveyDailyStats.forget_responses(batch)
+        batch.delete()
+
+        current, rebuilt = self._rebuilt_rows(survey)
+        assert current == rebuilt == [(timezone.localdate(), 1, 1, 0)]
+        assert SurveyDailyStats.totals(survey)["total"] == 1
+        assert SurveyResponse.objects.get() == kept
+
+    def test_batched_hard_delete_keeps_rollup_in_step(self, survey, user, monkeypatch):
+        from checktick_app.surveys.models import LegalHold
+        from checktick_app.surveys.services import RetentionService
+
+        monkeypatch.setattr(RetentionService, "RESPONSE_DELETE_BATCH_SIZE", 2)
+        for _ in range(5):
+            SurveyResponse.objects.create(survey=survey, answers={})
+        survey.soft_delete()
+        Survey.objects.filter(pk=survey.pk).update(
+            hard_deletion_date=timezone.now() - timedelta(days=1)
+        )
+
+        # A legal hold placed after the first batch stops the hard delete
+        # part-way, leaving the survey with fewer responses
+        original = RetentionService._lock_for_deletion.__func__
+        calls = []
+
+        def lock(cls, candidates, survey_id):
+            calls.append(survey_id)
+            if len(calls) == 2:
+                LegalHold.objects.create(
+                    survey=survey, placed_by=user, reason="Late", authority="Court"
+                )
+            return original(cls, candidates, survey_id)
+
+        monkeypatch.setattr(RetentionService, "_lock_for_deletion", classmethod(lock))
+        RetentionService.process_automatic_deletions()
+
+        assert SurveyResponse.objects.filter(survey=survey).count() == 3
+        current, rebuilt = self._rebuilt_rows(survey)
+        assert current == rebuilt
+        assert SurveyDailyStats.totals(survey)["total"] == 3
+
+    def test_bulk_minted_invites_are_counted(self, survey, user):
+        from itertools import repeat
+
+        emails = ["a@example.com", "b@example.com"]
+        SurveyAccessToken.bulk_mint(
+            survey,
+            user,
+            [f"Invited: {email}" for email in emails],
+            invite_emails=emails,
+        )
+        SurveyAccessToken.bulk_mint(survey, user, repeat("plain", 3))
+
+        current, rebuilt = self._rebuilt_rows(survey)
+        assert current == rebuilt == [(timezone.localdate(), 0, 2, 0)]
+
+    def test_deleted_invite_tokens_are_subtracted(self, survey, user):
+        used = _invite(survey, user, 1)
+        used.used_at = timezone.now()
+        used.save()
+        SurveyResponse.objects.create(survey=survey, answers={}, access_token=used)
+        single = _invite(survey, user, 2)
+        for n in range(3, 6):
+            _invite(survey, user, n)
+        SurveyAccessToken.objects.create(survey=survey, token="plain", created_by=user)
+
+        single.delete()
+        used.delete()
+        SurveyAccessToken.objects.filter(token__in=["invite-3", "invite-4"]).delete()
+
+        current, rebuilt = self._rebuilt_rows(survey)
+        assert current == rebuilt == [(timezone.localdate(), 1, 1, 0)]
+
+    def test_survey_with_invites_can_be_deleted(self, survey, user):
+        _invite(survey, user, 1)
+
+        survey.delete()
+
+        assert not SurveyDailyStats.objects.exists()
+
+    def test_subtracting_never_goes_negative(self, survey):
+        response = SurveyResponse.objects.create(survey=survey, answers={})
+        SurveyDailyStats.objects.filter(survey=survey).update(responses=0)
+
+        response.delete()
+
+        assert SurveyDailyStats.objects.get(survey=survey).responses == 0
+
+    def test_rebuild_command(self, survey, user):
+        other = Survey.objects.create(owner=user, name="Other", slug="other")
+        SurveyResponse.objects.create(survey=survey, answers={})
+        SurveyResponse.objects.create(survey=other, answers={})
+        SurveyDailyStats.objects.all().delete()
+
+        out = StringIO()
+        call_command("rebuild_survey_stats", "--survey", "stats", stdout=out)
+
+        assert "1 surveys" in out.getvalue()
+        assert SurveyDailyStats.totals(survey)["total"] == 1
+        assert SurveyDailyStats.totals(other)["total"] == 0
+
+    def test_metrics_api_reads_rollup(
+        self, survey, user, django_assert_max_num_queries
+    ):
+        from rest_framework.test import APIClient
+
+        for _ in range(3):
+            SurveyResponse.objects.create(survey=survey, answers={})
+
+        client = APIClient()
+        client.force_authenticate(user)
+        resp = client.get(f"/api/surveys/{survey.id}/metrics/responses/")
+
+        assert resp.status_code == 200
+        assert resp.data == {"total": 3, "today": 3, "last7": 3, "last14": 3}
@@ -6,14 +6,16 @@ Tests email sending, deletion warnings, soft deletion, and hard deletion.
 
 from datetime import timedelta
 from io import StringIO
+import json
 from unittest.mock import patch
 
 from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.test import TestCase
 from django.utils import timezone
 
 from checktick_app.core.models import User
-from checktick_app.surveys.models import LegalHold, Survey
+from checktick_app.surveys.models import JobLock, LegalHold, RetentionRun, Survey
 
 TEST_PASSWORD = "x"
 
@@ -120,6 +122,27 @@ class ProcessDataGovernanceCommandTests(TestCase):
         self.assertTrue(mock_send_warning.called)
         mock_send_warning.assert_called_with(survey, 1)
 
+    @patch(
+        "checktick_app.surveys.services.retention_service.RetentionService.send_deletion_warning"
+    )
+    def test_repeated_runs_send_warning_once(self, mock_send_warning):
+        """Running the command again (e.g. hourly) does not resend warnings."""
+        survey = Survey.objects.create(
+            name="Test Survey",
+            slug="test-survey-repeat",
+            owner=self.owner,
+        )
+        survey.close_survey(self.user)
+        survey.deletion_date = timezone.now() + timedelta(days=7)
+        survey.save()
+
+        call_command("process_data_governance", verbosity=0)
+        out = StringIO()
+        call_command("process_data_governance", stdout=out)
+
+        mock_send_warning.assert_called_once_with(survey, 7)
+        self.assertIn("7-day warnings: 0", out.getvalue())
+
     @patch("checktick_app.core.email_utils.send_branded_email")
     def test_deletion_warning_email_sent(self, mock_send_email):
         """Test that deletion warning emails are actually sent."""
@@ -302,3 +325,189 @@ class ProcessDataGovernanceCommandTests(TestCase):
         self.assertIn("7-day warnings: 1", output)
         # Should soft delete survey3
         self.assertIn("Soft deleted: 1", output)
+
+    def _expired_survey(self, slug):
+        survey = Survey.objects.create(name=slug, slug=slug, owner=self.owner)
+        survey.close_survey(self.user)
+        survey.deletion_date = timezone.now() - timedelta(days=1)
+        survey.save()
+        return survey
+
+    def _metrics(self, output):
+        (line,) = [
+            line
+            for line in output.splitlines()
+            if line.startswith("data_governance_run ")
+        ]
+        return json.loads(line.split(" ", 1)[1])
+
+    def test_run_reports_metrics_line(self):
+        """Each run ends with a structured metrics line."""
+        self._expired_survey("metrics-expired")
+
+        out = StringIO()
+        with self.assertLogs(
+            "checktick_app.surveys.management.commands.process_data_governance",
+            level="INFO",
+        ) as logs:
+            call_command("process_data_governance", stdout=out)
+
+        metrics = self._metrics(out.getvalue())
+        self.assertEqual(metrics["status"], "ok")
+        self.assertEqual(metrics["shard"], "0/1")
+        self.assertEqual(metrics["scanned"], 1)
+        self.assertEqual(metrics["soft_deleted"], 1)
+        self.assertEqual(metrics["skipped_legal_hold"], 0)
+        self.assertIn("duration_seconds", metrics)
+        self.assertTrue(
+            any("data_governance_run" in message for message in logs.output)
+        )
+
+    def test_overlapping_run_exits_without_processing(self):
+        """A run does nothing while another run holds the lock."""
+        survey = self._expired_survey("locked-expired")
+        JobLock.acquire(
+            "process_data_governance:shard-0-of-1",
+            "other-host:1",
+            timedelta(hours=1),
+        )
+
+        out = StringIO()
+        call_command("process_data_governance", stdout=out)
+
+        self.assertIn("Another run holds", out.getvalue())
+        survey.refresh_from_db()
+        self.assertIsNone(survey.deleted_at)
+
+    def test_stale_lock_is_taken_over(self):
+        """A lock left by a crashed run is taken over once it expires."""
+        survey = self._expired_survey("stale-expired")
+        JobLock.objects.create(
+            name="process_data_governance:shard-0-of-1",
+            holder="crashed-host:1",
+            acquired_at=timezone.now() - timedelta(hours=3),
+            expires_at=timezone.now() - timedelta(hours=1),
+        )
+
+        call_command("process_data_governance", verbosity=0, stdout=StringIO())
+
+        survey.refresh_from_db()
+        self.assertIsNotNone(survey.deleted_at)
+        lock = JobLock.objects.get(name="process_data_governance:shard-0-of-1")
+        self.assertEqual(lock.holder, "")
+
+    def test_lock_released_when_run_fails(self):
+        self._expired_survey("failing-expired")
+
+        out = StringIO()
+        with patch(
+            "checktick_app.surveys.services.retention_service."
+            "RetentionService.process_automatic_deletions",
+            side_effect=RuntimeError("boom"),
+        ):
+            with self.assertRaises(RuntimeError):
+                call_command("process_data_governance", stdout=out)
+
+        self.assertEqual(self._metrics(out.getvalue())["status"], "failed")
+        self.assertTrue(
+            JobLock.acquire(
+                "process_data_governance:shard-0-of-1", "next", timedelta(hours=1)
+            )
+        )
+
+    def test_shards_split_surveys_between_runs(self):
+        """Each shard only handles its own surveys, under its own lock."""
+        surveys = [self._expired_survey(f"shard-expired-{i}") for i in range(4)]
+        # Shard 1 is still running elsewhere
+        JobLock.acquire(
+            "process_data_governance:shard-1-of-2", "other-host:1", timedelta(hours=1)
+        )
+
+        out = StringIO()
+        call_command(
+            "process_data_governance", "--shards", "2", "--shard-index", "0", stdout=out
+        )
+
+        self.assertEqual(self._metrics(out.getvalue())["shard"], "0/2")
+        for survey in surveys:
+            survey.refresh_from_db()
+            if survey.pk % 2 == 0:
+                self.assertIsNotNone(survey.deleted_at)
+            else:
+                self.assertIsNone(survey.deleted_at)
+
+    def test_lost_lock_aborts_run(self):
+        """A run whose lock was taken over stops instead of running alongside."""
+        self._expired_survey("lost-lock-expired")
+
+        out = StringIO()
+        # Taken over while the first survey was being deleted
+        with patch.object(JobLock, "refresh", return_value=False):
+            with self.assertRaisesMessage(CommandError, "Lost"):
+                call_command("process_data_governance", stdout=out)
+
+        self.assertEqual(self._metrics(out.getvalue())["status"], "failed")
+        # Left to be resumed by the next run
+        self.assertTrue(RetentionRun.objects.filter(finished_at__isnull=True).exists())
+
+    @patch(
+        "checktick_app.surveys.services.retention_service.RetentionService.send_deletion_warning"
+    )
+    def test_lost_lock_aborts_warnings(self, mock_send_warning):
+        """The lock is refreshed after every warning, not only after them all."""
+        for i in range(2):
+            survey = Survey.objects.create(
+                name=f"warned-{i}", slug=f"warned-{i}", owner=self.owner
+            )
+            survey.close_survey(self.user)
+            survey.deletion_date = timezone.now() + timedelta(days=7)
+            survey.save()
+
+        out = StringIO()
+        with patch.object(JobLock, "refresh", return_value=False):
+            with self.assertRaisesMessage(CommandError, "Lost"):
+                call_command("process_data_governance", stdout=out)
+
+        self.assertEqual(mock_send_warning.call_count, 1)
+        self.assertEqual(self._metrics(out.getvalue())["status"], "failed")
+
+    def test_run_with_other_shard_count_active_exits(self):
+        """Shard layouts never overlap, even though their locks differ."""
+        survey = self._expired_survey("layout-expired")
+        JobLock.acquire(
+            "process_data_governance:shard-1-of-2", "other-host:1", timedelta(hours=1)
+        )
+
+        out = StringIO()
+        call_command("process_data_governance", stdout=out)
+
+        self.assertIn(
+            "Another run holds process_data_governance:shard-1-of-2", out.getvalue()
+        )
+        survey.refresh_from_db()
+        self.assertIsNone(survey.deleted_at)
+        self.assertEqual(
+            JobLock.objects.get(name="process_data_governance:shard-0-of-1").holder,
+            "",
+        )
+
+    def test_unfinished_run_with_other_shard_count_refuses_to_start(self):
+        survey = self._expired_survey("unfinished-expired")
+        RetentionRun.objects.create(shard_index=1, shard_count=4)
+
+        with self.assertRaisesMessage(CommandError, "--shards 4"):
+            call_command("process_data_governance", stdout=StringIO())
+
+        survey.refresh_from_db()
+        self.assertIsNone(survey.deleted_at)
+        self.assertTrue(
+            JobLock.acquire(
+                "process_data_governance:shard-0-of-1", "next", timedelta(hours=1)
+            )
+        )
+
+    def test_invalid_shard_index(self):
+        with self.assertRaises(CommandError):
+            call_command(
+                "process_data_governance", "--shards", "2", "--shard-index", "2"
+            )
@@ -148,7 +148,11 @@ class TestSurveySoftAndHardDeletion:
         closed_survey.save()
 
         days = closed_survey.days_until_deletion
-        assert 9 <= days <= 10  # Allow for timing differences
+        assert days == 10  # A part day left counts as a day
+
+    def test_days_until_deletion_is_zero_once_passed(self, closed_survey):
+        closed_survey.deletion_date = timezone.now() - timedelta(hours=1)
+        assert closed_survey.days_until_deletion == 0
 
     def test_days_until_deletion_returns_none_when_no_date(self, survey):
         """days_until_deletion should return None if no deletion_date."""
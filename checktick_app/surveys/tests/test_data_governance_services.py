@@ -8,6 +8,8 @@ from datetime import timedelta
 from unittest.mock import patch
 
 from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import QuerySet
 from django.utils import timezone
 import pytest
 
@@ -16,6 +18,8 @@ from checktick_app.surveys.models import (
     LegalHold,
     Organization,
     QuestionGroup,
+    RetentionRun,
+    RetentionWarningSent,
     Survey,
     SurveyQuestion,
     SurveyResponse,
@@ -25,6 +29,19 @@ from checktick_app.surveys.services import ExportService, RetentionService
 TEST_PASSWORD = "x"
 
 
+@pytest.fixture(autouse=True)
+def export_storage(settings, tmp_path):
+    """Write export artifacts to a per-test directory."""
+    settings.STORAGES = {
+        **settings.STORAGES,
+        "exports": {
+            "BACKEND": "django.core.files.storage.FileSystemStorage",
+            "OPTIONS": {"location": str(tmp_path)},
+        },
+    }
+    return tmp_path
+
+
 @pytest.fixture
 def user(db):
     return User.objects.create_user(username="testuser", password=TEST_PASSWORD)
@@ -232,9 +249,409 @@ class TestExportService:
         assert export.downloaded_at is not None
         assert export.download_count == 1
 
+    # ============================================================================
+    # RetentionService Tests
+    def test_generate_csv_decrypts_demographics_in_order(self, survey, user):
+        import os
+
+        kek = os.urandom(32)
+        for i in range(3):
+            response = SurveyResponse(survey=survey, answers={})
+            response.store_demographics(kek, {"first_name": f"P{i}"}, is_kek=True)
+            response.save()
+        # Response without demographics
+        SurveyResponse.objects.create(survey=survey, answers={})
+
+        csv_data = ExportService._generate_csv(survey, survey_key=kek)
+
+        lines = csv_data.strip().splitlines()
+        assert lines[0].endswith("Demographics")
+        assert '""first_name"": ""P0""' in lines[1]
+        assert '""first_name"": ""P1""' in lines[2]
+        assert '""first_name"": ""P2""' in lines[3]
+        assert lines[4].endswith(",")
+
+    def test_undecryptable_demographics_are_marked_and_logged(self, survey):
+        import os
+
+        kek = os.urandom(32)
+        good = SurveyResponse(survey=survey, answers={})
+        good.store_demographics(kek, {"first_name": "Ok"}, is_kek=True)
+        good.save()
+        bad = SurveyResponse(survey=survey, answers={})
+        bad.store_demographics(os.urandom(32), {"first_name": "X"}, is_kek=True)
+        bad.save()
+
+        with patch("checktick_app.surveys.models.logger") as logger:
+            csv_data = ExportService._generate_csv(survey, survey_key=kek)
+
+        lines = csv_data.strip().splitlines()
+        assert '""first_name"": ""Ok""' in lines[1]
+        assert lines[2].endswith(SurveyResponse.DEMOGRAPHICS_UNREADABLE)
+        logger.warning.assert_called_once()
+        assert logger.warning.call_args.args[1:3] == (1, str(bad.pk))
+
+    def test_iter_csv_decrypts_inline_by_default(self, survey):
+        import os
+
+        from checktick_app.surveys.utils import encrypt_sensitive
+
+        kek = os.urandom(32)
+        for i in range(2):
+            # Legacy scrypt blobs are the ones a pool would be used for
+            SurveyResponse.objects.create(
+                survey=survey,
+                answers={},
+                enc_demographics=encrypt_sensitive(kek, {"i": i}),
+            )
+
+        with patch(
+            "checktick_app.surveys.utils.ProcessPoolExecutor",
+            side_effect=AssertionError("pool started"),
+        ):
+            csv_data = ExportService._generate_csv(survey, survey_key=kek)
+
+        assert '""i"": 1' in csv_data
+
+    def test_iter_csv_streams_without_per_row_queries(
+        self, survey_with_responses, django_assert_max_num_queries
+    ):
+        other = User.objects.create_user(username="other", password=TEST_PASSWORD)
+        for _ in range(5):
+            SurveyResponse.objects.create(
+                survey=survey_with_responses, answers={}, submitted_by=None
+            )
+        SurveyResponse.objects.create(
+            survey=survey_with_responses, answers={}, submitted_by=other
+        )
+
+        # One query for the column plan, one for the joined responses
+        with django_assert_max_num_queries(2):
+            chunks = list(ExportService.iter_csv(survey_with_responses))
+
+        content = "".join(chunks)
+        assert content.splitlines()[0].startswith("Response ID,Submitted At")
+        assert "other" in content
+        assert len(content.strip().splitlines()) == 1 + 8
+
+    def test_create_export_persists_artifact(
+        self, survey_with_responses, user, export_storage
+    ):
+        export = ExportService.create_export(survey_with_responses, user)
+
+        assert export.file_path == f"exports/{survey_with_responses.id}/{export.id}.csv"
+        stored = export_storage / export.file_path
+        assert stored.exists()
+        assert stored.stat().st_size == export.file_size_bytes
+        assert stored.read_bytes() == ExportService._generate_csv(
+            survey_with_responses
+        ).encode("utf-8")
+
+    def test_create_export_with_password_stores_decryptable_artifact(
+        self, survey_with_responses, user, export_storage
+    ):
+        from checktick_app.surveys.export_crypto import decrypt_stream
+
+        export = ExportService.create_export(
+            survey_with_responses, user, password=TEST_PASSWORD
+        )
+
+        assert export.file_path.endswith(".csv.enc")
+        stored = export_storage / export.file_path
+        assert stored.stat().st_size == export.file_size_bytes
+        with stored.open("rb") as fh:
+            plaintext = b"".join(decrypt_stream(fh, TEST_PASSWORD))
+        assert plaintext == ExportService._generate_csv(survey_with_responses).encode(
+            "utf-8"
+        )
+
+    def test_hard_delete_removes_artifacts_after_commit(
+        self,
+        survey_with_responses,
+        user,
+        export_storage,
+        django_capture_on_commit_callbacks,
+    ):
+        export = ExportService.create_export(survey_with_responses, user)
+        stored = export_storage / export.file_path
+
+        with django_capture_on_commit_callbacks(execute=True):
+            survey_with_responses.hard_delete()
+            assert stored.exists()
+
+        assert not stored.exists()
+
+    def test_rolled_back_hard_delete_keeps_artifacts(
+        self, survey_with_responses, user, export_storage
+    ):
+        export = ExportService.create_export(survey_with_responses, user)
+        survey_id = survey_with_responses.pk
+
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                survey_with_responses.hard_delete()
+                raise RuntimeError("rolled back")
+
+        assert (export_storage / export.file_path).exists()
+        assert Survey.objects.filter(pk=survey_id).exists()
+
+    def test_cleanup_expired_exports_deletes_artifacts(
+        self, survey_with_responses, user, export_storage
+    ):
+        from checktick_app.surveys.models import DataExport
+
+        export = ExportService.create_export(survey_with_responses, user)
+        DataExport.objects.filter(id=export.id).update(
+            created_at=timezone.now() - timedelta(days=31)
+        )
+
+        assert ExportService.cleanup_expired_exports(days_old=30) == 1
+        assert not (export_storage / export.file_path).exists()
+        assert not DataExport.objects.filter(id=export.id).exists()
+
+    def test_generate_csv_without_key_omits_demographics(self, survey_with_responses):
+        csv_data = ExportService._generate_csv(survey_with_responses)
+
+        assert "Demographics" not in csv_data.splitlines()[0]
+
+
+class TestExportJobQueue:
+    """Test queued export generation (process_export_jobs worker)."""
+
+    @pytest.fixture(autouse=True)
+    def _configured_secret_key(self, settings):
+        settings.SECRET_KEY_CONFIGURED = True
+
+    def test_queue_export_creates_pending_job(self, survey_with_responses, user):
+        import io
+
+        from checktick_app.surveys.export_crypto import (
+            decrypt_stream,
+            encrypt_stream_with_key,
+        )
+        from checktick_app.surveys.models import DataExport
+
+        password = "correct horse battery staple"
+        export = ExportService.queue_export(
+            survey_with_responses, user, password=password
+        )
+
+        assert export.status == DataExport.Status.PENDING
+        assert export.is_encrypted
+        assert export.file_path == ""
+        # Only a key derived for this export is sealed, not the password
+        stream_key = ExportService._open_job_secrets(export)
+        assert password.encode() not in stream_key
+        blob = b"".join(encrypt_stream_with_key([b"a,b\n"], stream_key))
+        assert b"".join(decrypt_stream(io.BytesIO(blob), password)) == b"a,b\n"
+
+    def test_password_export_not_queued_without_secret_key(
+        self, survey_with_responses, user, settings
+    ):
+        from checktick_app.surveys.models import DataExport
+
+        settings.SECRET_KEY_CONFIGURED = False
+
+        assert not ExportService.can_queue_export(TEST_PASSWORD, None)
+        assert ExportService.can_queue_export(None, None)
+        with pytest.raises(ValueError, match="SECRET_KEY"):
+            ExportService.queue_export(
+                survey_with_responses, user, password=TEST_PASSWORD
+            )
+        assert not DataExport.objects.exists()
+
+    def test_survey_key_export_is_never_queued(
+        self, survey_with_responses, user, export_storage
+    ):
+        import os
+
+        from checktick_app.surveys.models import DataExport
+
+        kek = os.urandom(32)
+        assert not ExportService.can_queue_export(None, kek)
+        with pytest.raises(TypeError):
+            ExportService.queue_export(survey_with_responses, user, survey_key=kek)
+
+        # Generated in the calling process; nothing sealed into the row
+        with patch.object(
+            ExportService, "_seal_job_secrets", wraps=ExportService._seal_job_secrets
+        ) as seal:
+            export = ExportService.create_export(
+                survey_with_responses, user, TEST_PASSWORD, survey_key=kek
+            )
+        seal.assert_not_called()
+        row = DataExport.objects.get(id=export.id)
+        assert row.status == DataExport.Status.COMPLETED
+        assert row.job_secrets is None
+        assert not row.secrets_taken
+
+    def test_claim_and_process_completes_export(
+        self, survey_with_responses, user, export_storage
+    ):
+        from checktick_app.surveys.export_crypto import decrypt_stream
+        from checktick_app.surveys.models import DataExport
+
+        queued = ExportService.queue_export(
+            survey_with_responses, user, password=TEST_PASSWORD
+        )
+
+        export = ExportService.claim_next_export()
+        assert export.id == queued.id
+        assert export.status == DataExport.Status.RUNNING
+        assert ExportService.claim_next_export() is None
+
+        ExportService.process_export(export)
+
+        export.refresh_from_db()
+        assert export.status == DataExport.Status.COMPLETED
+        assert export.rows_done == export.response_count == 2
+        assert export.progress_percent == 100
+        assert export.job_secrets is None
+        with (export_storage / export.file_path).open("rb") as fh:
+            plaintext = b"".join(decrypt_stream(fh, TEST_PASSWORD))
+        assert plaintext == ExportService._generate_csv(survey_with_responses).encode(
+            "utf-8"
+        )
+
+    def test_stale_running_job_is_reclaimed(self, survey_with_responses, user):
+        from checktick_app.surveys.models import DataExport
+
+        ExportService.queue_export(survey_with_responses, user)
+        export = ExportService.claim_next_export()
+        assert ExportService.claim_next_export() is None
+
+        DataExport.objects.filter(id=export.id).update(
+            heartbeat_at=timezone.now() - ExportService.STALE_AFTER * 2
+        )
+
+        reclaimed = ExportService.claim_next_export()
+        assert reclaimed.id == export.id
+        assert reclaimed.attempts == 2
+
+        # The original worker lost its lease and must not complete the job
+        with pytest.raises(RuntimeError):
+            ExportService.process_export(export)
+        ExportService.process_export(reclaimed)
+        reclaimed.refresh_from_db()
+        assert reclaimed.status == DataExport.Status.COMPLETED
+
+    def test_stale_job_fails_after_max_attempts(self, survey_with_responses, user):
+        from checktick_app.surveys.models import DataExport
+
+        export = ExportService.queue_export(survey_with_responses, user)
+        DataExport.objects.filter(id=export.id).update(
+            status=DataExport.Status.RUNNING,
+            attempts=ExportService.MAX_ATTEMPTS,
+            heartbeat_at=timezone.now() - ExportService.STALE_AFTER * 2,
+        )
+
+        assert ExportService.claim_next_export() is None
+        export.refresh_from_db()
+        assert export.status == DataExport.Status.FAILED
+        assert export.error
+
+    def test_process_export_records_failure(self, survey_with_responses, user):
+        from checktick_app.surveys.models import DataExport
+
+        ExportService.queue_export(survey_with_responses, user)
+        export = ExportService.claim_next_export()
+
+        with patch.object(
+            ExportService, "iter_csv", side_effect=RuntimeError("disk full")
+        ):
+            with pytest.raises(RuntimeError):
+                ExportService.process_export(export)
+
+        export.refresh_from_db()
+        assert export.status == DataExport.Status.FAILED
+        # Users see a generic message; the exception goes to the log
+        assert export.error == ExportService.FAILED_MESSAGE
+        assert "disk full" not in export.error
+        assert export.file_path == ""
+        assert export.job_secrets is None
+
+    def test_claim_wipes_secrets_from_row(
+        self, survey_with_responses, user, export_storage
+    ):
+        from checktick_app.surveys.export_crypto import decrypt_stream
+        from checktick_app.surveys.models import DataExport
+
+        ExportService.queue_export(survey_with_responses, user, password=TEST_PASSWORD)
+        export = ExportService.claim_next_export()
+
+        row = DataExport.objects.get(id=export.id)
+        assert row.job_secrets is None
+        assert row.secrets_taken
+
+        # The claiming worker still has them in memory
+        ExportService.process_export(export)
+        export.refresh_from_db()
+        assert export.status == DataExport.Status.COMPLETED
+        with (export_storage / export.file_path).open("rb") as fh:
+            assert b"".join(decrypt_stream(fh, TEST_PASSWORD))
+
+    def test_stale_job_without_secrets_is_failed_not_retried(
+        self, survey_with_responses, user
+    ):
+        from checktick_app.surveys.models import DataExport
+
+        ExportService.queue_export(survey_with_responses, user, password=TEST_PASSWORD)
+        export = ExportService.claim_next_export()
+        DataExport.objects.filter(id=export.id).update(
+            heartbeat_at=timezone.now() - ExportService.STALE_AFTER * 2
+        )
+
+        assert ExportService.claim_next_export() is None
+        export.refresh_from_db()
+        assert export.status == DataExport.Status.FAILED
+        assert export.error == ExportService.LOST_SECRETS_MESSAGE
+
+    def test_unclaimed_job_secrets_expire(self, survey_with_responses, user):
+        from checktick_app.surveys.models import DataExport
+
+        old = ExportService.queue_export(
+            survey_with_responses, user, password=TEST_PASSWORD
+        )
+        fresh = ExportService.queue_export(
+            survey_with_responses, user, password=TEST_PASSWORD
+        )
+        DataExport.objects.filter(id=old.id).update(
+            created_at=timezone.now() - ExportService.QUEUED_SECRETS_TTL * 2
+        )
+
+        assert ExportService.expire_queued_exports() == 1
+
+        old.refresh_from_db()
+        fresh.refresh_from_db()
+        assert old.status == DataExport.Status.FAILED
+        assert old.job_secrets is None
+        assert old.error == ExportService.EXPIRED_MESSAGE
+        assert fresh.status == DataExport.Status.PENDING
+        assert fresh.job_secrets is not None
+        # Workers never pick up an expired job
+        assert ExportService.claim_next_export().id == fresh.id
+
+    def test_worker_command_processes_queue(self, survey_with_responses, user):
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        from checktick_app.surveys.models import DataExport
+
+        first = ExportService.queue_export(survey_with_responses, user)
+        second = ExportService.queue_export(survey_with_responses, user)
+
+        out = StringIO()
+        call_command("process_export_jobs", "--once", stdout=out)
+
+        assert "2 processed, 0 failed" in out.getvalue()
+        assert set(
+            DataExport.objects.filter(id__in=[first.id, second.id]).values_list(
+                "status", flat=True
+            )
+        ) == {DataExport.Status.COMPLETED}
+
 
-# ============================================================================
-# RetentionService Tests
 # ============================================================================
 
 
@@ -400,6 +817,280 @@ class TestRetentionService:
         assert closed_survey.deleted_at is None
 
 
+class TestDeletionWarningLedger:
+    """Deletion warnings are sent once per threshold and deletion date."""
+
+    def _due_in(self, survey, **delta):
+        survey.deletion_date = timezone.now() + timedelta(**delta)
+        survey.save()
+        return survey
+
+    def test_warning_sent_only_once(self, closed_survey):
+        self._due_in(closed_survey, days=30)
+
+        with patch.object(RetentionService, "send_deletion_warning") as send:
+            assert RetentionService.send_deletion_warning_once(closed_survey, 30)
+            assert not RetentionService.send_deletion_warning_once(closed_survey, 30)
+
+        send.assert_called_once_with(closed_survey, 30)
+        assert closed_survey not in (
+            RetentionService.get_surveys_pending_deletion_warning(30)
+        )
+
+    def test_late_warning_states_time_actually_left(self, closed_survey):
+        # Caught up a day and a half after the 30-day threshold
+        self._due_in(closed_survey, days=28, hours=12)
+
+        with patch.object(RetentionService, "send_deletion_warning") as send:
+            assert RetentionService.send_deletion_warning_once(closed_survey, 30)
+
+        send.assert_called_once_with(closed_survey, 29)
+
+    def test_missed_run_is_caught_up(self, closed_survey):
+        self._due_in(closed_survey, days=29)
+        assert closed_survey in (
+            RetentionService.get_surveys_pending_deletion_warning(30)
+        )
+
+        # Beyond the catch-up window the warning is no longer sent
+        self._due_in(closed_survey, days=27)
+        assert closed_survey not in (
+            RetentionService.get_surveys_pending_deletion_warning(30)
+        )
+
+    def test_only_most_urgent_warning_is_due(self, closed_survey):
+        self._due_in(closed_survey, hours=20)
+
+        assert closed_survey in (
+            RetentionService.get_surveys_pending_deletion_warning(1)
+        )
+        assert closed_survey not in (
+            RetentionService.get_surveys_pending_deletion_warning(7)
+        )
+
+    def test_new_deletion_date_rearms_warning(self, closed_survey):
+        self._due_in(closed_survey, days=30)
+        with patch.object(RetentionService, "send_deletion_warning"):
+            RetentionService.send_deletion_warning_once(closed_survey, 30)
+
+        self._due_in(closed_survey, days=29)
+
+        assert closed_survey in (
+            RetentionService.get_surveys_pending_deletion_warning(30)
+        )
+        with patch.object(RetentionService, "send_deletion_warning") as send:
+            assert RetentionService.send_deletion_warning_once(closed_survey, 30)
+        send.assert_called_once()
+        ledger = RetentionWarningSent.objects.get(survey=closed_survey)
+        assert ledger.deletion_date == closed_survey.deletion_date
+
+    def test_failed_send_is_retried(self, closed_survey):
+        self._due_in(closed_survey, days=7)
+
+        with patch.object(
+            RetentionService, "send_deletion_warning", side_effect=OSError("smtp")
+        ):
+            with pytest.raises(OSError):
+                RetentionService.send_deletion_warning_once(closed_survey, 7)
+
+        assert not RetentionWarningSent.objects.exists()
+        assert closed_survey in (
+            RetentionService.get_surveys_pending_deletion_warning(7)
+        )
+
+    def test_due_query_is_set_wise(self, user, org, django_assert_num_queries):
+        for i in range(3):
+            survey = Survey.objects.create(
+                owner=user, organization=org, name=f"S{i}", slug=f"s-{i}"
+            )
+            survey.close_survey(user)
+            self._due_in(survey, days=7)
+
+        with django_assert_num_queries(1):
+            surveys = RetentionService.get_surveys_pending_deletion_warning(7)
+            owners = {survey.owner.username for survey in surveys}
+
+        assert len(surveys) == 3
+        assert owners == {user.username}
+
+    def test_shards_partition_due_surveys(self, user, org):
+        surveys = []
+        for i in range(5):
+            survey = Survey.objects.create(
+                owner=user, organization=org, name=f"S{i}", slug=f"s-{i}"
+            )
+            survey.close_survey(user)
+            surveys.append(self._due_in(survey, days=7))
+
+        shards = [
+            RetentionService.get_surveys_pending_deletion_warning(7, shard=(i, 3))
+            for i in range(3)
+        ]
+
+        assert sorted(s.pk for shard in shards for s in shard) == sorted(
+            s.pk for s in surveys
+        )
+        for index, shard in enumerate(shards):
+            assert all(survey.pk % 3 == index for survey in shard)
+
+
+class TestAutomaticDeletionEngine:
+    """Batched, resumable processing of automatic deletions."""
+
+    def _due_surveys(self, user, org, count):
+        surveys = []
+        for i in range(count):
+            survey = Survey.objects.create(
+                owner=user, organization=org, name=f"Due {i}", slug=f"due-{i}"
+            )
+            survey.close_survey(user)
+            survey.deletion_date = timezone.now() - timedelta(days=1)
+            survey.save()
+            surveys.append(survey)
+        return surveys
+
+    def test_hard_delete_removes_responses_in_batches(
+        self, survey_with_responses, monkeypatch
+    ):
+        monkeypatch.setattr(RetentionService, "RESPONSE_DELETE_BATCH_SIZE", 2)
+        for i in range(3):
+            SurveyResponse.objects.create(survey=survey_with_responses, answers={})
+        survey_with_responses.soft_delete()
+        Survey.objects.filter(pk=survey_with_responses.pk).update(
+            hard_deletion_date=timezone.now() - timedelta(days=1)
+        )
+
+        deletes = []
+        original_delete = QuerySet.delete
+
+        def delete(queryset):
+            result = original_delete(queryset)
+            deletes.append(result[1].get("surveys.SurveyResponse", 0))
+            return result
+
+        with patch.object(QuerySet, "delete", delete):
+            stats = RetentionService.process_automatic_deletions()
+
+        assert stats["hard_deleted"] == 1
+        assert stats["responses_deleted"] == 5
+        assert max(deletes) == 2
+        assert not Survey.objects.filter(pk=survey_with_responses.pk).exists()
+        assert not SurveyResponse.objects.filter(
+            survey_id=survey_with_responses.pk
+        ).exists()
+
+    def test_failure_does_not_roll_back_other_surveys(self, user, org):
+        first, second = self._due_surveys(user, org, 2)
+        original = Survey.soft_delete
+
+        def soft_delete(survey):
+            if survey.pk == first.pk:
+                raise RuntimeError("boom")
+            original(survey)
+
+        with patch.object(
+            Survey, "soft_delete", autospec=True, side_effect=soft_delete
+        ):
+            stats = RetentionService.process_automatic_deletions()
+
+        assert stats["errors"] == 1
+        assert stats["soft_deleted"] == 1
+        first.refresh_from_db()
+        second.refresh_from_db()
+        assert first.deleted_at is None
+        assert second.deleted_at is not None
+
+    def test_interrupted_run_resumes(self, user, org):
+        surveys = self._due_surveys(user, org, 3)
+        original = Survey.soft_delete
+
+        def soft_delete(survey):
+            if survey.pk == surveys[1].pk:
+                raise KeyboardInterrupt
+            original(survey)
+
+        with patch.object(
+            Survey, "soft_delete", autospec=True, side_effect=soft_delete
+        ):
+            with pytest.raises(KeyboardInterrupt):
+                RetentionService.process_automatic_deletions()
+
+        run = RetentionRun.objects.get()
+        assert run.finished_at is None
+        assert run.last_survey_id == surveys[0].pk
+        assert run.stats["soft_deleted"] == 1
+
+        stats = RetentionService.process_automatic_deletions()
+
+        # Counts cover the whole run, not just the resumed part
+        assert stats["soft_deleted"] == 3
+        run = RetentionRun.objects.get()
+        assert run.finished_at is not None
+        assert run.phase == RetentionRun.Phase.DONE
+        assert run.stats == stats
+
+    def test_finished_run_is_not_resumed(self, user, org):
+        RetentionService.process_automatic_deletions()
+        self._due_surveys(user, org, 1)
+
+        stats = RetentionService.process_automatic_deletions()
+
+        assert stats["soft_deleted"] == 1
+        assert RetentionRun.objects.count() == 2
+
+    def test_shards_split_work_and_checkpoints(self, user, org):
+        surveys = self._due_surveys(user, org, 4)
+        heartbeats = []
+
+        first = RetentionService.process_automatic_deletions(
+            shard=(0, 2), heartbeat=lambda: heartbeats.append(1)
+        )
+        second = RetentionService.process_automatic_deletions(shard=(1, 2))
+
+        assert first["scanned"] + second["scanned"] == 4
+        assert first["soft_deleted"] + second["soft_deleted"] == 4
+        assert first["scanned"] == sum(1 for s in surveys if s.pk % 2 == 0)
+        assert heartbeats
+        assert set(RetentionRun.objects.values_list("shard_index", "shard_count")) == {
+            (0, 2),
+            (1, 2),
+        }
+        assert not Survey.objects.filter(deleted_at__isnull=True).exists()
+
+    def test_interrupted_shard_does_not_resume_other_shard(self, user, org):
+        RetentionRun.objects.create(shard_index=1, shard_count=2)
+        self._due_surveys(user, org, 2)
+
+        RetentionService.process_automatic_deletions(shard=(0, 2))
+
+        assert RetentionRun.objects.filter(
+            shard_index=1, finished_at__isnull=True
+        ).exists()
+        assert RetentionRun.objects.filter(
+            shard_index=0, finished_at__isnull=False
+        ).exists()
+
+    def test_legal_hold_placed_after_listing_blocks_deletion(self, user, org):
+        (survey,) = self._due_surveys(user, org, 1)
+        original = RetentionService._lock_for_deletion.__func__
+
+        def hold_then_lock(cls, candidates, survey_id):
+            LegalHold.objects.get_or_create(
+                survey_id=survey_id,
+                defaults={"placed_by": user, "reason": "Late", "authority": "Court"},
+            )
+            return original(cls, candidates, survey_id)
+
+        with patch.object(
+            RetentionService, "_lock_for_deletion", classmethod(hold_then_lock)
+        ):
+            stats = RetentionService.process_automatic_deletions()
+
+        assert stats["soft_deleted"] == 0
+        survey.refresh_from_db()
+        assert survey.deleted_at is None
+
+
 # ============================================================================
 # Integration Tests
 # ============================================================================
@@ -20,6 +20,19 @@ User = get_user_model()
 TEST_PASSWORD = "x"
 
 
+@pytest.fixture(autouse=True)
+def export_storage(settings, tmp_path):
+    """Write export artifacts to a per-test directory."""
+    settings.STORAGES = {
+        **settings.STORAGES,
+        "exports": {
+            "BACKEND": "django.core.files.storage.FileSystemStorage",
+            "OPTIONS": {"location": str(tmp_path)},
+        },
+    }
+    return tmp_path
+
+
 @pytest.fixture
 def user(db):
     """Create a test user."""
@@ -193,6 +206,43 @@ class TestSurveyExportCreateView:
         assert export is not None
         assert export.created_by == user
 
+        # Generation is left to the background worker
+        assert export.status == DataExport.Status.PENDING
+        assert export.file_path == ""
+
+    def test_export_with_unlocked_survey_key_is_generated_in_request(
+        self, client, user, closed_survey, export_storage
+    ):
+        """The unlocked survey key is never handed to the queue."""
+        from unittest.mock import patch
+
+        from checktick_app.surveys.models import SurveyResponse
+
+        SurveyResponse.objects.create(
+            survey=closed_survey,
+            submitted_by=user,
+            submitted_at=timezone.now(),
+            answers={},
+        )
+
+        client.force_login(user)
+        url = reverse(
+            "surveys:survey_export_create", kwargs={"slug": closed_survey.slug}
+        )
+        with patch(
+            "checktick_app.surveys.views.get_survey_key_from_session",
+            return_value=b"k" * 32,
+        ):
+            response = client.post(
+                url, {"password": "export-pass", "attestation_accepted": True}
+            )
+
+        assert response.status_code == 302
+        export = DataExport.objects.get(survey=closed_survey)
+        assert export.status == DataExport.Status.COMPLETED
+        assert export.is_encrypted
+        assert export.job_secrets is None
+
     def test_export_create_requires_attestation(self, client, user, closed_survey):
         """Export creation should require attestation acceptance."""
         client.force_login(user)
@@ -421,8 +471,8 @@ class TestSurveyExportFileView:
 
         assert response.status_code == 200
 
-        # Check content contains CSV data
-        content = response.content.decode()
+        # Export is streamed; check content contains CSV data
+        content = b"".join(response.streaming_content).decode()
 
         # Should be CSV with headers
         assert "Submitted At" in content or "submitted_at" in content
@@ -431,6 +481,181 @@ class TestSurveyExportFileView:
         # Should have CSV structure (commas and line breaks)
         assert "," in content and "\n" in content
 
+    def test_file_download_streams_stored_artifact(
+        self, client, user, export_with_token, export_storage
+    ):
+        """Downloads are served from the stored artifact, not regenerated."""
+        from unittest.mock import patch
+
+        client.force_login(user)
+        url = reverse(
+            "surveys:survey_export_file",
+            kwargs={
+                "slug": export_with_token.survey.slug,
+                "export_id": export_with_token.id,
+                "token": export_with_token.download_token,
+            },
+        )
+        with patch.object(ExportService, "iter_csv") as iter_csv:
+            response = client.get(url)
+
+        iter_csv.assert_not_called()
+        assert response.status_code == 200
+        assert response["Accept-Ranges"] == "bytes"
+        content = b"".join(response.streaming_content)
+        assert content == (export_storage / export_with_token.file_path).read_bytes()
+
+    def _file_url(self, export):
+        return reverse(
+            "surveys:survey_export_file",
+            kwargs={
+                "slug": export.survey.slug,
+                "export_id": export.id,
+                "token": export.download_token,
+            },
+        )
+
+    def test_missing_encrypted_artifact_is_gone(
+        self, client, user, closed_survey, export_storage
+    ):
+        """A lost password-protected file is never rebuilt as plaintext."""
+        from unittest.mock import patch
+
+        from checktick_app.surveys.models import SurveyResponse
+
+        SurveyResponse.objects.create(survey=closed_survey, answers={})
+        export = ExportService.create_export(
+            survey=closed_survey, user=user, password="correct horse battery"
+        )
+        (export_storage / export.file_path).unlink()
+
+        client.force_login(user)
+        with patch.object(ExportService, "iter_csv") as iter_csv:
+            response = client.get(self._file_url(export))
+
+        iter_csv.assert_not_called()
+        assert response.status_code == 410
+        export.refresh_from_db()
+        assert export.download_count == 0
+
+    def test_missing_stored_artifact_is_gone(
+        self, client, user, export_with_token, export_storage
+    ):
+        (export_storage / export_with_token.file_path).unlink()
+
+        client.force_login(user)
+        response = client.get(self._file_url(export_with_token))
+
+        assert response.status_code == 410
+
+    def test_legacy_unencrypted_export_is_streamed(
+        self, client, user, export_with_token
+    ):
+        """Unencrypted exports from before artifacts were stored still work."""
+        DataExport.objects.filter(pk=export_with_token.pk).update(file_path="")
+
+        client.force_login(user)
+        response = client.get(self._file_url(export_with_token))
+
+        assert response.status_code == 200
+        assert b"Submitted At" in b"".join(response.streaming_content)
+
+    def test_file_download_supports_range_requests(
+        self, client, user, export_with_token, export_storage
+    ):
+        """Range requests return the requested slice with 206."""
+        client.force_login(user)
+        url = reverse(
+            "surveys:survey_export_file",
+            kwargs={
+                "slug": export_with_token.survey.slug,
+                "export_id": export_with_token.id,
+                "token": export_with_token.download_token,
+            },
+        )
+        full = (export_storage / export_with_token.file_path).read_bytes()
+
+        response = client.get(url, HTTP_RANGE="bytes=5-14")
+
+        assert response.status_code == 206
+        assert response["Content-Range"] == f"bytes 5-14/{len(full)}"
+        assert b"".join(response.streaming_content) == full[5:15]
+
+        response = client.get(url, HTTP_RANGE=f"bytes={len(full)}-")
+        assert response.status_code == 416
+
+
+@pytest.mark.django_db
+class TestSurveyExportStatus:
+    """Test progress reporting for queued exports."""
+
+    @pytest.fixture
+    def queued_export(self, closed_survey, user):
+        from checktick_app.surveys.models import SurveyResponse
+
+        SurveyResponse.objects.create(
+            survey=closed_survey,
+            submitted_by=user,
+            submitted_at=timezone.now(),
+            answers={},
+        )
+        return ExportService.queue_export(closed_survey, user)
+
+    def _url(self, name, export, **kwargs):
+        return reverse(
+            f"surveys:{name}",
+            kwargs={"slug": export.survey.slug, "export_id": export.id, **kwargs},
+        )
+
+    def test_status_requires_permission(self, client, other_user, queued_export):
+        client.force_login(other_user)
+        response = client.get(self._url("survey_export_status", queued_export))
+
+        assert response.status_code == 403
+
+    def test_status_reports_progress(self, client, user, queued_export):
+        client.force_login(user)
+        url = self._url("survey_export_status", queued_export)
+
+        data = client.get(url).json()
+        assert data == {
+            "status": "pending",
+            "rows_done": 0,
+            "total": 1,
+            "percent": 0,
+            "error": "",
+        }
+
+        ExportService.process_export(ExportService.claim_next_export())
+
+        response = client.get(url)
+        assert response["Cache-Control"] == "no-store"
+        assert response.json()["status"] == "completed"
+        assert response.json()["percent"] == 100
+
+    def test_download_page_polls_while_pending(self, client, user, queued_export):
+        client.force_login(user)
+        response = client.get(self._url("survey_export_download", queued_export))
+
+        content = response.content.decode()
+        assert response.status_code == 200
+        assert "Preparing Export" in content
+        assert self._url("survey_export_status", queued_export) in content
+        assert queued_export.download_token not in content
+
+    def test_file_download_refused_until_ready(self, client, user, queued_export):
+        client.force_login(user)
+        response = client.get(
+            self._url(
+                "survey_export_file",
+                queued_export,
+                token=queued_export.download_token,
+            )
+        )
+
+        assert response.status_code == 302
+        assert response.url == self._url("survey_export_download", queued_export)
+
 
 # ========== Survey Close Integration Test ==========
 
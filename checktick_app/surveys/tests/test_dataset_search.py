@@ -0,0 +1,121 @@
+"""
+Tests for the dataset typeahead index and its caching alongside the dataset.
+"""
+
+import time
+from unittest.mock import patch
+
+from django.core.cache import cache
+import pytest
+
+from checktick_app.surveys import external_datasets
+from checktick_app.surveys.dataset_search import DatasetIndex, normalize
+from checktick_app.surveys.external_datasets import (
+    CACHE_KEY,
+    DATASET_CACHE_TIMEOUT,
+    get_dataset_index,
+    store_dataset,
+)
+
+HOSPITALS = [
+    "ADDENBROOKE'S HOSPITAL (RGT01)",
+    "AIREDALE GENERAL HOSPITAL (RCF22)",
+    "ALDER HEY CHILDREN'S HOSPITAL (RBS25)",
+    "YSBYTY GWYNEDD (7A1A4)",
+    "ST. MARY'S HOSPITAL (RGT22)",
+]
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(settings, tmp_path):
+    settings.EXTERNAL_DATASET_SNAPSHOT_DIR = str(tmp_path)
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def test_normalize_folds_case_accents_and_punctuation():
+    assert normalize("Hôpital  St.-Mary's") == "hopital st mary s"
+
+
+class TestDatasetIndex:
+    def test_every_word_must_prefix_a_token(self):
+        index = DatasetIndex(HOSPITALS)
+
+        assert index.search("hosp ald") == (1, [HOSPITALS[2]])
+        assert index.search("hosp gwynedd") == (0, [])
+
+    def test_exact_code_ranks_first(self):
+        index = DatasetIndex(HOSPITALS)
+
+        total, results = index.search("rgt22")
+
+        assert total == 1
+        assert results == [HOSPITALS[4]]
+        # A code prefix matches several options; dataset order is kept
+        assert index.search("rgt")[1] == [HOSPITALS[0], HOSPITALS[4]]
+
+    def test_name_prefix_ranks_before_word_match(self):
+        index = DatasetIndex(["GENERAL HOSPITAL (X1)", "AIREDALE GENERAL (X2)"])
+
+        assert index.search("general")[1][0] == "GENERAL HOSPITAL (X1)"
+        assert index.search("general")[0] == 2
+
+    def test_punctuation_and_case_are_ignored(self):
+        index = DatasetIndex(HOSPITALS)
+
+        assert index.search("addenbrookes")[1] == []
+        assert index.search("Addenbrooke")[1] == [HOSPITALS[0]]
+        assert index.search("st mary")[1] == [HOSPITALS[4]]
+
+    def test_limit_and_offset(self):
+        index = DatasetIndex(HOSPITALS)
+
+        total, page = index.search("hospital", limit=2, offset=1)
+
+        assert total == 4
+        assert page == [HOSPITALS[1], HOSPITALS[2]]
+
+    def test_empty_query_pages_through_everything(self):
+        index = DatasetIndex(HOSPITALS)
+
+        assert index.search("  ", limit=2) == (5, HOSPITALS[:2])
+
+
+class TestDatasetIndexCaching:
+    def test_index_built_when_dataset_cached(self):
+        store_dataset("nhs_trusts", ["A TRUST (RAA)"])
+
+        with patch.object(cache, "get", wraps=cache.get) as cache_get:
+            index = get_dataset_index("nhs_trusts")
+
+        assert index.search("raa") == (1, ["A TRUST (RAA)"])
+        # Only the version key is read, not the option list
+        keys = [call.args[0] for call in cache_get.call_args_list]
+        assert CACHE_KEY.format(dataset_key="nhs_trusts") not in keys
+
+    def test_new_copy_from_another_process_is_reindexed(self):
+        store_dataset("nhs_trusts", ["OLD TRUST (RAA)"])
+        get_dataset_index("nhs_trusts")
+
+        # Simulate a refresh by another worker: cache changes, local index not
+        other = {"options": ["NEW TRUST (RAA)"], "fetched_at": time.time() + 1}
+        cache.set(CACHE_KEY.format(dataset_key="nhs_trusts"), other)
+        cache.set(
+            external_datasets.VERSION_KEY.format(dataset_key="nhs_trusts"),
+            other["fetched_at"],
+        )
+
+        assert get_dataset_index("nhs_trusts").search("trust")[1] == ["NEW TRUST (RAA)"]
+
+    def test_stale_index_schedules_refresh(self, monkeypatch):
+        scheduled = []
+        monkeypatch.setattr(external_datasets, "_schedule_refresh", scheduled.append)
+        store_dataset(
+            "nhs_trusts",
+            ["OLD TRUST (RAA)"],
+            fetched_at=time.time() - DATASET_CACHE_TIMEOUT - 1,
+        )
+
+        assert get_dataset_index("nhs_trusts").search("old")[0] == 1
+        assert scheduled == ["nhs_trusts"]
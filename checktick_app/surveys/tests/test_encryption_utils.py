@@ -8,10 +8,15 @@ from cryptography.exceptions import InvalidTag
 import pytest
 
 from checktick_app.surveys.utils import (
+    RECORD_BLOB_MAGIC,
     create_recovery_hint,
     decrypt_kek_with_passphrase,
+    decrypt_sensitive,
+    decrypt_sensitive_batch,
     derive_key_from_passphrase,
     encrypt_kek_with_passphrase,
+    encrypt_sensitive,
+    encrypt_sensitive_record,
     generate_bip39_phrase,
 )
 
@@ -152,6 +157,129 @@ class TestKEKEncryption:
         assert decrypted2 == kek
 
 
+class TestRecordEncryption:
+    """Test fast per-record encryption with an unwrapped survey KEK."""
+
+    def test_record_roundtrip(self):
+        """Should decrypt records sealed with the versioned format."""
+        kek = os.urandom(32)
+        data = {"first_name": "Alice", "nhs_number": "1234567890"}
+
+        blob = encrypt_sensitive_record(kek, data)
+
+        assert blob.startswith(RECORD_BLOB_MAGIC)
+        assert decrypt_sensitive(kek, blob) == data
+
+    def test_record_accepts_memoryview(self):
+        """Should accept memoryview blobs from PostgreSQL BinaryField."""
+        kek = os.urandom(32)
+        blob = encrypt_sensitive_record(kek, {"a": 1})
+
+        assert decrypt_sensitive(kek, memoryview(blob)) == {"a": 1}
+
+    def test_record_uses_fresh_subkey_per_record(self):
+        """Should produce different ciphertexts for identical records."""
+        kek = os.urandom(32)
+        data = {"a": 1}
+
+        assert encrypt_sensitive_record(kek, data) != encrypt_sensitive_record(
+            kek, data
+        )
+
+    def test_record_wrong_key_fails(self):
+        """Should fail to decrypt with a different KEK."""
+        blob = encrypt_sensitive_record(os.urandom(32), {"a": 1})
+
+        with pytest.raises(InvalidTag):
+            decrypt_sensitive(os.urandom(32), blob)
+
+    def test_record_rejects_short_key(self):
+        """Should refuse keys that are not a 32-byte KEK."""
+        with pytest.raises(ValueError, match="32 bytes"):
+            encrypt_sensitive_record(b"short", {"a": 1})
+
+    def test_legacy_blob_still_readable(self):
+        """Should keep reading scrypt blobs written before the record format."""
+        kek = os.urandom(32)
+        data = {"first_name": "Bob"}
+
+        legacy_blob = encrypt_sensitive(kek, data)
+
+        assert not legacy_blob.startswith(RECORD_BLOB_MAGIC)
+        assert decrypt_sensitive(kek, legacy_blob) == data
+
+    def test_store_demographics_format_follows_unlock_method(self):
+        """A 32-character legacy passphrase must not be sealed as a KEK."""
+        from types import SimpleNamespace
+
+        from checktick_app.surveys.models import SurveyResponse
+        from checktick_app.surveys.views import survey_key_is_kek
+
+        passphrase = b"a 32 character legacy passphrase"[:32]
+        legacy = SimpleNamespace(session={"unlock_method": "legacy"})
+        unlocked = SimpleNamespace(session={"unlock_method": "password"})
+        assert not survey_key_is_kek(legacy)
+        assert survey_key_is_kek(unlocked)
+
+        response = SurveyResponse()
+        response.store_demographics(
+            passphrase, {"a": 1}, is_kek=survey_key_is_kek(legacy)
+        )
+        assert not response.enc_demographics.startswith(RECORD_BLOB_MAGIC)
+        assert decrypt_sensitive(passphrase, response.enc_demographics) == {"a": 1}
+
+        kek = os.urandom(32)
+        response.store_demographics(kek, {"a": 1}, is_kek=survey_key_is_kek(unlocked))
+        assert response.enc_demographics.startswith(RECORD_BLOB_MAGIC)
+
+
+class TestBatchDecryption:
+    """Test streaming batch decryption of sensitive blobs."""
+
+    def test_batch_preserves_order_across_formats(self):
+        """Should yield results in input order for mixed legacy/record blobs."""
+        kek = os.urandom(32)
+        blobs = [
+            encrypt_sensitive(kek, {"i": 0}),
+            encrypt_sensitive_record(kek, {"i": 1}),
+            None,
+            encrypt_sensitive(kek, {"i": 3}),
+            encrypt_sensitive_record(kek, {"i": 4}),
+        ]
+
+        results = list(decrypt_sensitive_batch(kek, iter(blobs), max_workers=2))
+
+        assert results == [{"i": 0}, {"i": 1}, {}, {"i": 3}, {"i": 4}]
+
+    def test_batch_streams_in_windows(self):
+        """Should decrypt lazily, one window at a time."""
+        kek = os.urandom(32)
+        consumed = []
+
+        def blobs():
+            for i in range(5):
+                consumed.append(i)
+                yield encrypt_sensitive_record(kek, {"i": i})
+
+        results = decrypt_sensitive_batch(kek, blobs(), max_workers=1, window=2)
+
+        assert next(results) == {"i": 0}
+        assert consumed == [0, 1]
+        assert [r["i"] for r in results] == [1, 2, 3, 4]
+
+    def test_batch_yields_none_for_undecryptable_blob(self):
+        """Should not abort the stream when one blob fails to decrypt."""
+        kek = os.urandom(32)
+        blobs = [
+            encrypt_sensitive_record(os.urandom(32), {"i": 0}),
+            encrypt_sensitive_record(kek, {"i": 1}),
+        ]
+
+        results = list(decrypt_sensitive_batch(kek, blobs, max_workers=1))
+
+        assert results == [None, {"i": 1}]
+
+
 class TestRecoveryHint:
     """Test recovery phrase hint generation."""
 
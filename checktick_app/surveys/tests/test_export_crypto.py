@@ -0,0 +1,122 @@
+"""Tests for the segmented export encryption format and standalone decryptor."""
+
+import io
+import os
+import struct
+
+import pytest
+
+from checktick_app.surveys.export_crypto import (
+    HEADER_SIZE,
+    MAGIC,
+    TAG_SIZE,
+    ExportDecryptionError,
+    decrypt_stream,
+    encrypt_stream,
+    main,
+)
+
+PASSWORD = "export-password"
+CHUNK = 64
+
+
+def _encrypt(data: bytes, pieces: int = 3) -> bytes:
+    step = max(1, len(data) // pieces)
+    parts = [data[i : i + step] for i in range(0, len(data), step)]
+    return b"".join(encrypt_stream(parts, PASSWORD, chunk_size=CHUNK))
+
+
+def _decrypt(blob: bytes, password: str = PASSWORD) -> bytes:
+    return b"".join(decrypt_stream(io.BytesIO(blob), password))
+
+
+@pytest.mark.parametrize("size", [0, 1, CHUNK - 1, CHUNK, CHUNK * 3, CHUNK * 3 + 7])
+def test_roundtrip(size):
+    data = os.urandom(size)
+
+    assert _decrypt(_encrypt(data)) == data
+
+
+def test_segments_are_fixed_size():
+    blob = _encrypt(os.urandom(CHUNK * 2 + 10))
+
+    # Two full segments plus a short final one
+    assert len(blob) == HEADER_SIZE + 2 * (CHUNK + TAG_SIZE) + 10 + TAG_SIZE
+
+
+def test_wrong_password_rejected():
+    blob = _encrypt(b"secret,data\n")
+
+    with pytest.raises(ExportDecryptionError, match="Wrong password"):
+        _decrypt(blob, "not-the-password")
+
+
+def test_truncation_at_segment_boundary_detected():
+    blob = _encrypt(os.urandom(CHUNK * 3 + 5))
+    truncated = blob[: HEADER_SIZE + 2 * (CHUNK + TAG_SIZE)]
+
+    with pytest.raises(ExportDecryptionError, match="truncated"):
+        _decrypt(truncated)
+
+
+def test_reordered_segments_detected():
+    blob = _encrypt(os.urandom(CHUNK * 3))
+    seg = CHUNK + TAG_SIZE
+    first = blob[HEADER_SIZE : HEADER_SIZE + seg]
+    second = blob[HEADER_SIZE + seg : HEADER_SIZE + 2 * seg]
+    swapped = blob[:HEADER_SIZE] + second + first + blob[HEADER_SIZE + 2 * seg :]
+
+    with pytest.raises(ExportDecryptionError):
+        _decrypt(swapped)
+
+
+def test_header_tampering_detected():
+    blob = bytearray(_encrypt(os.urandom(CHUNK)))
+    blob[HEADER_SIZE - 1] ^= 0x01  # flip a nonce prefix bit
+
+    with pytest.raises(ExportDecryptionError):
+        _decrypt(bytes(blob))
+
+
+@pytest.mark.parametrize(
+    "log_n, r, p",
+    [
+        (22, 8, 1),  # 4 GiB of scrypt memory
+        (14, 255, 1),  # r taken from the header is bounded too
+        (14, 8, 255),  # as is p
+        (14, 0, 1),
+    ],
+)
+def test_excessive_scrypt_parameters_rejected(log_n, r, p):
+    blob = bytearray(_encrypt(os.urandom(CHUNK)))
+    struct.pack_into(">BBB", blob, len(MAGIC) + 4, log_n, r, p)
+
+    with pytest.raises(ExportDecryptionError, match="Unsupported"):
+        _decrypt(bytes(blob))
+
+
+def test_not_an_export():
+    with pytest.raises(ExportDecryptionError, match="Not a CheckTick"):
+        _decrypt(b"Response ID,Submitted At\n")
+
+
+def test_cli_decrypt(tmp_path, monkeypatch):
+    data = b"Response ID,Submitted At\n1,2025-01-01\n"
+    src = tmp_path / "export.csv.enc"
+    dst = tmp_path / "export.csv"
+    src.write_bytes(b"".join(encrypt_stream([data], PASSWORD)))
+    monkeypatch.setenv("CHECKTICK_EXPORT_PASSWORD", PASSWORD)
+
+    assert main(["decrypt", str(src), str(dst)]) == 0
+    assert dst.read_bytes() == data
+
+
+def test_cli_decrypt_failure_leaves_no_output(tmp_path, monkeypatch):
+    src = tmp_path / "export.csv.enc"
+    dst = tmp_path / "export.csv"
+    src.write_bytes(b"".join(encrypt_stream([b"data"], PASSWORD)))
+    monkeypatch.setenv("CHECKTICK_EXPORT_PASSWORD", "wrong")
+
+    assert main(["decrypt", str(src), str(dst)]) == 1
+    assert not dst.exists()
+    assert not (tmp_path / "export.csv.part").exists()
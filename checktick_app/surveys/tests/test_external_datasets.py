@@ -0,0 +1,203 @@
+"""
+Tests for the external dataset cache: stale-while-revalidate, single-flight
+refreshes and on-disk snapshots.
+"""
+
+from concurrent.futures import Future
+import json
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+from django.core.cache import cache
+import pytest
+import requests
+
+from checktick_app.surveys import external_datasets
+from checktick_app.surveys.external_datasets import (
+    DATASET_CACHE_TIMEOUT,
+    LOCK_KEY,
+    DatasetFetchError,
+    fetch_dataset,
+    get_http_session,
+    store_dataset,
+)
+
+KEY = "nhs_trusts"
+SESSION_GET = "checktick_app.surveys.external_datasets.requests.Session.get"
+
+
+def _response(data):
+    response = MagicMock()
+    response.status_code = 200
+    response.json.return_value = data
+    return response
+
+
+def _trusts(name="NEW TRUST"):
+    return _response([{"ods_code": "RAA", "name": name}])
+
+
+class _SyncExecutor:
+    """Run background refreshes inline so tests can assert on their outcome."""
+
+    def __init__(self):
+        self.submitted = 0
+
+    def submit(self, fn, *args):
+        self.submitted += 1
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(settings, tmp_path):
+    settings.EXTERNAL_DATASET_SNAPSHOT_DIR = str(tmp_path)
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def executor(monkeypatch):
+    executor = _SyncExecutor()
+    monkeypatch.setattr(external_datasets, "_refresh_executor", executor)
+    return executor
+
+
+def _store_stale(options):
+    store_dataset(KEY, options, fetched_at=time.time() - DATASET_CACHE_TIMEOUT - 1)
+
+
+class TestStaleWhileRevalidate:
+    def test_fresh_entry_is_not_refreshed(self, executor):
+        store_dataset(KEY, ["CACHED (R1)"])
+
+        with patch(SESSION_GET) as mock_get:
+            assert fetch_dataset(KEY) == ["CACHED (R1)"]
+
+        assert mock_get.call_count == 0
+        assert executor.submitted == 0
+
+    def test_stale_entry_served_while_one_refresh_runs(self):
+        _store_stale(["OLD TRUST (RAA)"])
+        release = threading.Event()
+
+        def slow_upstream(*args, **kwargs):
+            release.wait(5)
+            return _trusts()
+
+        with patch(SESSION_GET, side_effect=slow_upstream) as mock_get:
+            # Everyone gets the stale copy while the refresh is in flight
+            results = [fetch_dataset(KEY) for _ in range(5)]
+            release.set()
+            deadline = time.monotonic() + 5
+            while cache.get(LOCK_KEY.format(dataset_key=KEY)) is not None:
+                assert time.monotonic() < deadline
+                time.sleep(0.01)
+
+        assert results == [["OLD TRUST (RAA)"]] * 5
+        assert mock_get.call_count == 1
+        assert fetch_dataset(KEY) == ["NEW TRUST (RAA)"]
+
+    def test_failed_refresh_keeps_stale_copy_and_backs_off(self, executor):
+        _store_stale(["OLD TRUST (RAA)"])
+
+        with patch(SESSION_GET, side_effect=requests.ConnectionError("down")) as get:
+            assert fetch_dataset(KEY) == ["OLD TRUST (RAA)"]
+            assert fetch_dataset(KEY) == ["OLD TRUST (RAA)"]
+
+        # The lock outlives the failed attempt, so requests do not retry
+        # upstream back to back
+        assert get.call_count == 1
+        assert cache.get(LOCK_KEY.format(dataset_key=KEY)) is not None
+
+
+class TestSnapshots:
+    def test_fetch_writes_snapshot(self, settings, tmp_path):
+        with patch(SESSION_GET, return_value=_trusts()):
+            fetch_dataset(KEY)
+
+        snapshot = json.loads((tmp_path / f"{KEY}.json").read_text())
+        assert snapshot["options"] == ["NEW TRUST (RAA)"]
+        assert snapshot["dataset"] == KEY
+        assert list(tmp_path.glob("*.tmp")) == []
+
+    def test_cold_start_served_from_fresh_snapshot_without_refetch(self, executor):
+        with patch(SESSION_GET, return_value=_trusts()):
+            fetch_dataset(KEY)
+        cache.clear()
+
+        with patch(SESSION_GET) as mock_get:
+            assert fetch_dataset(KEY) == ["NEW TRUST (RAA)"]
+
+        assert mock_get.call_count == 0
+        assert executor.submitted == 0
+
+    def test_cold_start_served_from_stale_snapshot_during_outage(self, executor):
+        external_datasets._write_snapshot(
+            KEY,
+            {
+                "options": ["OLD TRUST (RAA)"],
+                "fetched_at": time.time() - DATASET_CACHE_TIMEOUT - 1,
+            },
+        )
+
+        with patch(SESSION_GET, side_effect=requests.ConnectionError("down")):
+            assert fetch_dataset(KEY) == ["OLD TRUST (RAA)"]
+
+        # Revalidation was attempted in the background
+        assert executor.submitted == 1
+
+    def test_cache_clear_refreshes_while_snapshot_is_served(self, executor):
+        with patch(SESSION_GET, return_value=_trusts("OLD TRUST")):
+            fetch_dataset(KEY)
+
+        with patch(SESSION_GET, return_value=_trusts()):
+            external_datasets.clear_dataset_cache(KEY)
+            assert fetch_dataset(KEY) == ["NEW TRUST (RAA)"]
+
+        assert executor.submitted == 1
+
+    def test_no_copy_anywhere_raises(self):
+        with patch(SESSION_GET, side_effect=requests.ConnectionError("down")):
+            with pytest.raises(DatasetFetchError):
+                fetch_dataset(KEY)
+
+    def test_snapshots_can_be_disabled(self, settings, tmp_path):
+        settings.EXTERNAL_DATASET_SNAPSHOT_DIR = ""
+
+        with patch(SESSION_GET, return_value=_trusts()):
+            fetch_dataset(KEY)
+
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestSingleFlight:
+    def test_cold_request_fails_fast_while_fetch_in_progress(self):
+        cache.add(LOCK_KEY.format(dataset_key=KEY), 1)
+
+        with patch(SESSION_GET) as mock_get:
+            started = time.monotonic()
+            with pytest.raises(DatasetFetchError, match="try again"):
+                fetch_dataset(KEY)
+
+        assert time.monotonic() - started < 1
+        assert mock_get.call_count == 0
+
+    def test_cold_request_uses_result_of_finished_fetch(self):
+        cache.add(LOCK_KEY.format(dataset_key=KEY), 1)
+        entry = store_dataset(KEY, ["THEIRS (R1)"])
+
+        with patch(SESSION_GET) as mock_get:
+            assert external_datasets._fetch_cold(KEY) == entry
+
+        assert mock_get.call_count == 0
+
+
+def test_http_session_is_shared():
+    session = get_http_session()
+
+    assert get_http_session() is session
+    assert session.get_adapter("https://api.rcpch.ac.uk").max_retries.total == 2
@@ -0,0 +1,291 @@
+"""
+Tests for the invitation outbox and its delivery worker.
+"""
+
+from __future__ import annotations
+
+from datetime import timedelta
+from io import StringIO
+import secrets
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.mail import get_connection
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+import pytest
+
+from checktick_app.core import email_utils
+from checktick_app.core.email_utils import (
+    CompiledSurveyInvite,
+    build_survey_invite_email,
+)
+from checktick_app.surveys.models import (
+    InviteMessage,
+    Organization,
+    Survey,
+    SurveyAccessToken,
+    SurveyDailyStats,
+)
+from checktick_app.surveys.services import InviteService
+
+TEST_PASSWORD = "x"
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(
+        username="owner", email="owner@example.com", password=TEST_PASSWORD
+    )
+
+
+@pytest.fixture
+def survey(user):
+    org = Organization.objects.create(name="Org", owner=user)
+    return Survey.objects.create(
+        owner=user,
+        organization=org,
+        name="Invites",
+        slug="invites",
+        status=Survey.Status.PUBLISHED,
+        visibility=Survey.Visibility.TOKEN,
+    )
+
+
+def _queue(survey, user, emails):
+    return InviteService.queue_invites(
+        survey, emails, created_by=user, contact_email=user.email
+    )
+
+
+class _CountingConnection:
+    """Wrap the configured backend to count connections and sends."""
+
+    def __init__(self, fail_for=()):
+        self.opened = 0
+        self.fail_for = set(fail_for)
+
+    def __call__(self, *args, **kwargs):
+        connection = get_connection(*args, **kwargs)
+        original_open = connection.open
+        original_send = connection.send_messages
+
+        def open_():
+            self.opened += 1
+            return original_open()
+
+        def send_messages(messages):
+            if any(set(m.to) & self.fail_for for m in messages):
+                raise OSError("Recipient refused")
+            return original_send(messages)
+
+        connection.open = open_
+        connection.send_messages = send_messages
+        return connection
+
+
+@pytest.mark.django_db
+class TestQueueInvites:
+    def test_queues_tokens_and_messages(self, survey, user):
+        batch, queued, invalid = _queue(
+            survey, user, ["a@example.com", "bad", "b@example.com"]
+        )
+
+        assert queued == 2
+        assert invalid == ["bad"]
+        messages = InviteMessage.objects.filter(batch=batch)
+        assert sorted(m.email for m in messages) == ["a@example.com", "b@example.com"]
+        for message in messages:
+            assert message.status == InviteMessage.Status.QUEUED
+            assert message.token.note == f"Invited: {message.email}"
+            assert message.contact_email == "owner@example.com"
+        assert SurveyDailyStats.totals(survey)["invites_sent"] == 2
+        assert mail.outbox == []
+
+    def test_nothing_valid_queues_nothing(self, survey, user):
+        _, queued, invalid = _queue(survey, user, ["nope"])
+
+        assert queued == 0
+        assert invalid == ["nope"]
+        assert not SurveyAccessToken.objects.exists()
+
+
+@pytest.mark.django_db
+class TestDeliverBatch:
+    def test_batch_sent_over_one_connection(self, survey, user):
+        _queue(survey, user, [f"p{i}@example.com" for i in range(5)])
+        counter = _CountingConnection()
+
+        with mock.patch("django.core.mail.get_connection", counter):
+            sent, failed = InviteService.deliver_batch(InviteService.claim_batch())
+
+        assert (sent, failed) == (5, 0)
+        assert counter.opened == 1
+        assert len(mail.outbox) == 5
+        assert not InviteMessage.objects.exclude(status=InviteMessage.Status.SENT)
+        assert not SurveyAccessToken.objects.filter(invite_sent_at__isnull=True)
+        for message in InviteMessage.objects.select_related("token"):
+            (email,) = [m for m in mail.outbox if m.to == [message.email]]
+            assert f"/take/token/{message.token.token}/" in email.body
+
+    def test_failed_recipient_is_retried_with_backoff(self, survey, user):
+        _queue(survey, user, ["ok@example.com", "refused@example.com"])
+        counter = _CountingConnection(fail_for={"refused@example.com"})
+
+        with mock.patch("django.core.mail.get_connection", counter):
+            sent, failed = InviteService.deliver_batch(InviteService.claim_batch())
+
+        assert (sent, failed) == (1, 1)
+        refused = InviteMessage.objects.get(email="refused@example.com")
+        assert refused.status == InviteMessage.Status.QUEUED
+        assert refused.attempts == 1
+        assert "Recipient refused" in refused.last_error
+        assert refused.next_attempt_at > timezone.now()
+        # Not due yet
+        assert InviteService.claim_batch() == []
+
+    def test_gives_up_after_max_attempts(self, survey, user):
+        _queue(survey, user, ["refused@example.com"])
+        InviteMessage.objects.update(attempts=InviteService.MAX_ATTEMPTS - 1)
+        counter = _CountingConnection(fail_for={"refused@example.com"})
+
+        with mock.patch("django.core.mail.get_connection", counter):
+            InviteService.deliver_batch(InviteService.claim_batch())
+
+        assert InviteMessage.objects.get().status == InviteMessage.Status.FAILED
+        assert SurveyAccessToken.objects.get().invite_bounced_at is not None
+
+    def test_retry_delay_is_capped(self):
+        assert InviteService.retry_delay(1) == InviteService.BACKOFF_BASE
+        assert InviteService.retry_delay(2) == InviteService.BACKOFF_BASE * 2
+        assert InviteService.retry_delay(50) == InviteService.BACKOFF_MAX
+
+    def test_claimed_messages_are_not_claimed_twice(self, survey, user):
+        _queue(survey, user, ["a@example.com", "b@example.com"])
+
+        assert len(InviteService.claim_batch()) == 2
+        assert InviteService.claim_batch() == []
+
+    def test_stale_sending_messages_are_reclaimed(self, survey, user):
+        _queue(survey, user, ["a@example.com"])
+        InviteService.claim_batch()
+        InviteMessage.objects.update(
+            claimed_at=timezone.now() - InviteService.STALE_AFTER - timedelta(seconds=1)
+        )
+
+        assert len(InviteService.claim_batch()) == 1
+
+
+@pytest.mark.django_db
+class TestPublishQueuesInvites:
+    def test_publish_queues_without_sending(self, client, survey, user):
+        client.force_login(user)
+        response = client.post(
+            reverse("surveys:publish_settings", kwargs={"slug": survey.slug}),
+            {
+                "action": "save",
+                "visibility": "token",
+                "no_patient_data_ack": "on",
+                "invite_emails": "a@example.com\nb@example.com",
+            },
+        )
+
+        assert response.status_code == 302
+        batch = InviteMessage.objects.values_list("batch", flat=True).first()
+        assert response.url.endswith(f"?invite_batch={batch}")
+        assert InviteMessage.objects.count() == 2
+        assert mail.outbox == []
+
+        page = client.get(response.url)
+        assert page.context["invite_progress"]["total"] == 2
+        assert "0 of 2 invitations sent" in page.content.decode()
+
+    def test_progress_endpoint(self, client, survey, user):
+        batch, _, _ = _queue(survey, user, ["a@example.com", "b@example.com"])
+        InviteService.deliver_batch(InviteService.claim_batch(limit=1))
+        client.force_login(user)
+
+        response = client.get(
+            reverse("surveys:invite_progress", kwargs={"slug": survey.slug}),
+            {"batch": str(batch)},
+        )
+
+        data = response.json()
+        assert response["Cache-Control"] == "no-store"
+        assert (data["total"], data["sent"], data["queued"], data["done"]) == (
+            2,
+            1,
+            1,
+            1,
+        )
+
+    def test_progress_endpoint_requires_edit_permission(self, client, survey):
+        other = User.objects.create_user(username="other", password=TEST_PASSWORD)
+        client.force_login(other)
+
+        response = client.get(
+            reverse("surveys:invite_progress", kwargs={"slug": survey.slug})
+        )
+
+        assert response.status_code == 403
+
+
+@pytest.mark.django_db
+def test_worker_command_drains_outbox(survey, user):
+    _queue(survey, user, ["a@example.com", "b@example.com", "c@example.com"])
+    out = StringIO()
+
+    call_command("process_invite_outbox", "--once", "--batch-size", "2", stdout=out)
+
+    assert len(mail.outbox) == 3
+    assert "3 sent, 0 not sent" in out.getvalue()
+
+
+@pytest.mark.django_db
+class TestCompiledSurveyInvite:
+    TOKENS = ["abc", "_lead_and_trail_", "-dash-", "a__b--c", "x" * 32]
+
+    @pytest.fixture
+    def styled_survey(self, survey):
+        survey.end_at = timezone.now() + timedelta(days=7)
+        survey.style = {"title": "Brand *Title*", "primary_color": "#123456"}
+        survey.save()
+        return survey
+
+    def test_output_identical_to_full_render(self, styled_survey):
+        compiled = CompiledSurveyInvite(styled_survey, "owner@example.com")
+
+        for token in self.TOKENS + [secrets.token_urlsafe(24) for _ in range(20)]:
+            expected = build_survey_invite_email(
+                "p@example.com", styled_survey, token, "owner@example.com"
+            )
+            actual = compiled.build("p@example.com", token)
+
+            assert actual.subject == expected.subject
+            assert actual.body == expected.body
+            assert actual.alternatives == expected.alternatives
+            assert actual.from_email == expected.from_email
+            assert actual.to == ["p@example.com"]
+
+    def test_unsafe_token_falls_back_to_full_render(self, styled_survey):
+        compiled = CompiledSurveyInvite(styled_survey)
+        token = "not*url&safe"
+
+        expected = build_survey_invite_email("p@example.com", styled_survey, token)
+        actual = compiled.build("p@example.com", token)
+
+        assert actual.alternatives == expected.alternatives
+
+    def test_batch_renders_template_once(self, survey, user):
+        _queue(survey, user, [f"p{i}@example.com" for i in range(10)])
+
+        with mock.patch(
+            "checktick_app.core.email_utils.markdown_to_html",
+            wraps=email_utils.markdown_to_html,
+        ) as render:
+            sent, _ = InviteService.deliver_batch(InviteService.claim_batch())
+
+        assert sent == 10
+        assert render.call_count == 1
@@ -0,0 +1,60 @@
+"""Tests for the in-process survey KEK cache."""
+
+from datetime import timedelta
+
+from django.utils import timezone
+
+from checktick_app.surveys.key_cache import SurveyKeyCache
+
+VERIFIED_AT = "2025-01-01T00:00:00+00:00"
+
+
+def _future():
+    return timezone.now() + timedelta(minutes=30)
+
+
+def test_get_returns_cached_key():
+    cache = SurveyKeyCache()
+    cache.set("sess", "survey", VERIFIED_AT, b"k" * 32, _future())
+
+    assert cache.get("sess", "survey", VERIFIED_AT) == b"k" * 32
+
+
+def test_expired_entry_is_evicted():
+    cache = SurveyKeyCache()
+    cache.set(
+        "sess", "survey", VERIFIED_AT, b"k" * 32, timezone.now() - timedelta(seconds=1)
+    )
+
+    assert cache.get("sess", "survey", VERIFIED_AT) is None
+    assert len(cache) == 0
+
+
+def test_new_unlock_does_not_reuse_old_entry():
+    cache = SurveyKeyCache()
+    cache.set("sess", "survey", VERIFIED_AT, b"k" * 32, _future())
+
+    assert cache.get("sess", "survey", "2025-01-01T00:10:00+00:00") is None
+
+
+def test_bounded_size_evicts_least_recently_used():
+    cache = SurveyKeyCache(max_entries=2)
+    cache.set("a", "survey", VERIFIED_AT, b"a" * 32, _future())
+    cache.set("b", "survey", VERIFIED_AT, b"b" * 32, _future())
+    cache.get("a", "survey", VERIFIED_AT)
+    cache.set("c", "survey", VERIFIED_AT, b"c" * 32, _future())
+
+    assert cache.get("a", "survey", VERIFIED_AT) == b"a" * 32
+    assert cache.get("b", "survey", VERIFIED_AT) is None
+    assert len(cache) == 2
+
+
+def test_eviction_zeroizes_key_material():
+    cache = SurveyKeyCache()
+    cache.set("sess", "survey", VERIFIED_AT, b"k" * 32, _future())
+    buf = cache._entries[("sess", "survey")].kek
+
+    cache.discard("sess")
+
+    assert buf == bytearray(32)
+    assert len(cache) == 0
@@ -425,3 +425,197 @@ def test_group_builder_allows_authorized_users(client, users, org):
     res = client.get(url)
     assert res.status_code == 200
     assert b'aria-label="Special Templates"' in res.content
+
+
+def _in_request(user, view):
+    """Run view(request) inside PermissionContextMiddleware, as a real request would."""
+    from django.test import RequestFactory
+
+    from checktick_app.surveys.permissions import PermissionContextMiddleware
+
+    request = RequestFactory().get("/")
+    request.user = user
+    return PermissionContextMiddleware(view)(request)
+
+
+@pytest.mark.django_db
+def test_predicates_cost_no_queries_after_first_in_request(users, org, surveys):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    from checktick_app.surveys import permissions
+
+    admin, creator, viewer, outsider, participant = users
+    s1, s2 = surveys
+    SurveyMembership.objects.create(
+        survey=s2, user=creator, role=SurveyMembership.Role.EDITOR
+    )
+    predicates = [
+        permissions.can_view_survey,
+        permissions.can_edit_survey,
+        permissions.can_manage_survey_users,
+        permissions.can_close_survey,
+        permissions.can_export_survey_data,
+        permissions.can_extend_retention,
+        permissions.can_manage_legal_hold,
+        permissions.can_manage_data_custodians,
+        permissions.can_soft_delete_survey,
+        permissions.can_hard_delete_survey,
+    ]
+
+    def view(request):
+        results = {}
+        # Loads owned orgs, both membership tables and custodianships
+        with CaptureQueriesContext(connection) as first:
+            permissions.can_export_survey_data(request.user, s2)
+        for survey in (s1, s2):
+            for predicate in predicates:
+                with CaptureQueriesContext(connection) as ctx:
+                    results[predicate.__name__, survey.slug] = predicate(
+                        request.user, survey
+                    )
+                assert len(ctx) == 0, predicate.__name__
+        with CaptureQueriesContext(connection) as ctx:
+            results["is_org_admin"] = permissions.is_org_admin(request.user, org)
+            results["has_org"] = permissions.user_has_org_membership(request.user)
+        assert len(ctx) == 0
+        assert len(first) == 4
+        return results
+
+    results = _in_request(creator, view)
+
+    assert results["can_edit_survey", "s1"] is True
+    assert results["can_edit_survey", "s2"] is True
+    assert results["can_manage_survey_users", "s2"] is False
+    assert results["can_export_survey_data", "s2"] is False
+    assert results["is_org_admin"] is False
+    assert results["has_org"] is True
+
+    # Same answers as a fresh, unshared context outside a request
+    for predicate in predicates:
+        for survey in (s1, s2):
+            assert (
+                predicate(creator, survey) == results[predicate.__name__, survey.slug]
+            )
+
+
+@pytest.mark.django_db
+def test_membership_change_within_request_is_seen(users, org, surveys):
+    from checktick_app.surveys.permissions import can_edit_survey
+
+    admin, creator, viewer, outsider, participant = users
+    s1, s2 = surveys
+
+    def view(request):
+        before = can_edit_survey(request.user, s1)
+        SurveyMembership.objects.create(
+            survey=s1, user=request.user, role=SurveyMembership.Role.EDITOR
+        )
+        return before, can_edit_survey(request.user, s1)
+
+    assert _in_request(outsider, view) == (False, True)
+
+
+@pytest.mark.django_db
+def test_request_exposes_permission_context(users, org):
+    admin, creator, viewer, outsider, participant = users
+
+    def view(request):
+        return request.permissions.is_org_admin(org.id), request.permissions.org_roles
+
+    assert _in_request(admin, view) == (
+        True,
+        {org.id: OrganizationMembership.Role.ADMIN},
+    )
+
+
+@pytest.mark.django_db
+def test_visible_surveys_matches_can_view_survey(users, org, surveys):
+    from checktick_app.surveys.permissions import can_view_survey, visible_surveys
+
+    admin, creator, viewer, outsider, participant = users
+    s1, s2 = surveys
+    other_owner = User.objects.create_user(username="other_owner", password="x")
+    other_org = Organization.objects.create(name="Other", owner=other_owner)
+    s3 = Survey.objects.create(
+        owner=other_owner, organization=other_org, name="S3", slug="s3"
+    )
+    s4 = Survey.objects.create(owner=outsider, name="S4", slug="s4")
+    # Member of a survey in an organization they do not belong to
+    SurveyMembership.objects.create(
+        survey=s3, user=viewer, role=SurveyMembership.Role.VIEWER
+    )
+    # Two routes to the same survey must not list it twice
+    SurveyMembership.objects.create(
+        survey=s2, user=admin, role=SurveyMembership.Role.CREATOR
+    )
+
+    for user in (admin, creator, viewer, outsider, participant, other_owner):
+        expected = sorted(s.slug for s in (s1, s2, s3, s4) if can_view_survey(user, s))
+        assert sorted(visible_surveys(user).values_list("slug", flat=True)) == (
+            expected
+        ), user.username
+
+
+@pytest.mark.django_db
+def test_survey_list_query_count_independent_of_survey_count(client, users, org):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    admin, creator, viewer, outsider, participant = users
+    login(client, admin)
+
+    def list_queries():
+        with CaptureQueriesContext(connection) as ctx:
+            assert client.get(reverse("surveys:list")).status_code == 200
+        return len(ctx)
+
+    Survey.objects.create(owner=creator, organization=org, name="A", slug="a")
+    list_queries()  # warm per-user caches (navigation capability flags)
+    few = list_queries()
+    for i in range(10):
+        Survey.objects.create(
+            owner=creator, organization=org, name=f"B{i}", slug=f"b{i}"
+        )
+
+    assert list_queries() == few
+
+
+@pytest.mark.django_db
+def test_survey_list_keyset_pagination(client, users, org, monkeypatch):
+    from checktick_app.surveys import views
+
+    admin, creator, viewer, outsider, participant = users
+    monkeypatch.setattr(views, "SURVEY_LIST_PAGE_SIZE", 2)
+    created = [
+        Survey.objects.create(
+            owner=creator, organization=org, name=f"P{i}", slug=f"p{i}"
+        )
+        for i in range(5)
+    ]
+    login(client, admin)
+
+    seen = []
+    url = reverse("surveys:list")
+    while url:
+        res = client.get(url)
+        seen.extend(s.slug for s in res.context["surveys"])
+        before = res.context["next_before"]
+        url = f"{reverse('surveys:list')}?before={before}" if before else None
+
+    assert seen == [s.slug for s in reversed(created)]
+
+
+@pytest.mark.django_db
+def test_visible_surveys_without_org_owner_rule(users, org, surveys):
+    from checktick_app.surveys.permissions import visible_surveys
+
+    admin, creator, viewer, outsider, participant = users
+    OrganizationMembership.objects.filter(user=admin).update(
+        role=OrganizationMembership.Role.VIEWER
+    )
+
+    assert set(visible_surveys(admin).values_list("slug", flat=True)) == {"s1", "s2"}
+    assert set(
+        visible_surveys(admin, include_org_owner=False).values_list("slug", flat=True)
+    ) == {"s2"}
@@ -0,0 +1,192 @@
+"""
+Tests for the cached participant runtime schema.
+"""
+
+from __future__ import annotations
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+import pytest
+
+from checktick_app.surveys.models import (
+    Organization,
+    QuestionGroup,
+    Survey,
+    SurveyQuestion,
+    SurveyQuestionCondition,
+    SurveyResponse,
+)
+from checktick_app.surveys.runtime_schema import get_runtime_schema
+
+TEST_PASSWORD = "x"
+
+SCHEMA_TABLES = (
+    "surveys_surveyquestion",
+    "surveys_surveyquestioncondition",
+    "surveys_questiongroup",
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def owner(db):
+    return User.objects.create_user(username="owner", password=TEST_PASSWORD)
+
+
+@pytest.fixture
+def survey(owner):
+    org = Organization.objects.create(name="Org", owner=owner)
+    survey = Survey.objects.create(
+        owner=owner,
+        organization=org,
+        name="Runtime",
+        slug="runtime",
+        status=Survey.Status.PUBLISHED,
+        visibility=Survey.Visibility.PUBLIC,
+    )
+    group = QuestionGroup.objects.create(name="About you", owner=owner)
+    survey.question_groups.add(group)
+    q1 = SurveyQuestion.objects.create(
+        survey=survey, group=group, text="Name?", type="text", order=0
+    )
+    q2 = SurveyQuestion.objects.create(
+        survey=survey,
+        group=group,
+        text="Colours?",
+        type="mc_multi",
+        options=[{"label": "Red", "value": "red"}, {"label": "Blue", "value": "blue"}],
+        order=1,
+    )
+    SurveyQuestionCondition.objects.create(
+        question=q1, operator="exists", target_question=q2, action="show"
+    )
+    survey.refresh_from_db()
+    return survey
+
+
+def _schema_queries(ctx) -> list[str]:
+    return [
+        q["sql"]
+        for q in ctx.captured_queries
+        if any(table in q["sql"] for table in SCHEMA_TABLES)
+    ]
+
+
+@pytest.mark.django_db
+class TestRuntimeSchema:
+    def test_compiled_schema_contents(self, survey):
+        schema = get_runtime_schema(survey)
+
+        assert [q.text for q in schema.questions] == ["Name?", "Colours?"]
+        assert [q.idx for q in schema.questions] == [1, 2]
+        assert schema.questions[0].group_start and not schema.questions[0].group_end
+        assert schema.questions[1].group_end
+        assert schema.questions[0].group.name == "About you"
+        assert len(schema.conditions) == 1
+        assert schema.conditions[0].action == "show"
+
+    def test_take_page_runs_no_schema_queries_when_warm(self, client, survey):
+        url = reverse("surveys:take", kwargs={"slug": survey.slug})
+        client.get(url)  # warm the cache
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(url)
+
+        assert response.status_code == 200
+        assert "Colours?" in response.content.decode()
+        assert _schema_queries(ctx) == []
+
+    def test_submission_runs_no_schema_queries_when_warm(self, client, survey):
+        url = reverse("surveys:take", kwargs={"slug": survey.slug})
+        client.get(url)
+        q1, q2 = survey.questions.all()
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.post(
+                url, {f"q_{q1.id}": "Ada", f"q_{q2.id}": ["red", "blue"]}
+            )
+
+        assert response.status_code == 302
+        assert _schema_queries(ctx) == []
+        answers = SurveyResponse.objects.get(survey=survey).answers
+        assert answers == {str(q1.id): "Ada", str(q2.id): ["red", "blue"]}
+
+    def test_question_edit_invalidates_schema(self, survey):
+        get_runtime_schema(survey)
+        question = survey.questions.get(text="Name?")
+        question.text = "Full name?"
+        question.save()
+
+        survey.refresh_from_db()
+        assert get_runtime_schema(survey).questions[0].text == "Full name?"
+
+    def test_group_changes_invalidate_schema(self, survey, owner):
+        revision = survey.schema_revision
+        group = survey.question_groups.get()
+        group.name = "Renamed"
+        group.save()
+        survey.refresh_from_db()
+        assert survey.schema_revision > revision
+
+        revision = survey.schema_revision
+        survey.question_groups.add(QuestionGroup.objects.create(name="X", owner=owner))
+        survey.refresh_from_db()
+        assert survey.schema_revision > revision
+
+    def test_builder_reorder_invalidates_schema(self, client, owner, survey):
+        get_runtime_schema(survey)
+        q1, q2 = survey.questions.all()
+
+        client.force_login(owner)
+        client.post(
+            reverse("surveys:builder_questions_reorder", kwargs={"slug": survey.slug}),
+            {"order": f"{q2.id},{q1.id}"},
+        )
+
+        survey.refresh_from_db()
+        assert [q.text for q in get_runtime_schema(survey).questions] == [
+            "Colours?",
+            "Name?",
+        ]
+
+    def test_saving_stale_survey_keeps_revision(self, survey):
+        revision = survey.schema_revision
+        stale = Survey.objects.get(pk=survey.pk)
+        survey.questions.first().save()  # bumps the revision
+
+        stale.name = "Renamed"
+        stale.save()
+
+        survey.refresh_from_db()
+        assert survey.name == "Renamed"
+        assert survey.schema_revision == stale.schema_revision
+        assert survey.schema_revision > revision
+
+    def test_saving_deferred_survey(self, survey):
+        survey.questions.first().save()
+        revision = Survey.objects.get(pk=survey.pk).schema_revision
+
+        deferred = Survey.objects.only("id", "name").get(pk=survey.pk)
+        deferred.name = "Renamed"
+        deferred.save()
+
+        survey.refresh_from_db()
+        assert survey.name == "Renamed"
+        assert survey.schema_revision == revision
+
+    def test_saving_survey_without_row_inserts(self, survey):
+        pk = survey.pk
+        Survey.objects.filter(pk=pk).delete()
+
+        survey.save()
+
+        assert Survey.objects.filter(pk=pk).exists()
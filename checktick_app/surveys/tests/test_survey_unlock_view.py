@@ -375,3 +375,51 @@ class TestSurveyUnlockView:
         # Try to get KEK for different survey - should fail
         kek = get_survey_key_from_session(request, other_survey.slug)
         assert kek is None
+
+    def test_option4_kek_cached_for_unlock_window(
+        self, client_logged_in, dual_encrypted_survey, monkeypatch
+    ):
+        """Repeat requests reuse the cached KEK instead of re-running scrypt."""
+        from django.test import RequestFactory
+
+        from checktick_app.surveys import views as survey_views
+        from checktick_app.surveys.key_cache import survey_key_cache
+
+        client_logged_in.post(
+            reverse("surveys:unlock", args=[dual_encrypted_survey.slug]),
+            {"unlock_method": "password", "password": "TestPassword123"},
+        )
+
+        calls = []
+        original = Survey.unlock_with_password
+
+        def counting_unlock(self, password):
+            calls.append(password)
+            return original(self, password)
+
+        monkeypatch.setattr(Survey, "unlock_with_password", counting_unlock)
+
+        request = RequestFactory().get("/")
+        request.session = client_logged_in.session
+
+        kek1 = survey_views.get_survey_key_from_session(
+            request, dual_encrypted_survey.slug
+        )
+        kek2 = survey_views.get_survey_key_from_session(
+            request, dual_encrypted_survey.slug
+        )
+
+        assert kek1 == kek2 == b"0" * 32
+        assert len(calls) == 1
+
+        # Logging out drops the cached KEK for the session
+        session_key = request.session.session_key
+        client_logged_in.logout()
+        assert (
+            survey_key_cache.get(
+                session_key,
+                dual_encrypted_survey.slug,
+                request.session["unlock_verified_at"],
+            )
+            is None
+        )
@@ -0,0 +1,219 @@
+"""
+Tests for bulk access token minting and the streamed token export.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import itertools
+import json
+import math
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+import pytest
+from rest_framework.test import APIClient
+
+from checktick_app.surveys.models import Survey, SurveyAccessToken, SurveyDailyStats
+
+TEST_PASSWORD = "x"
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(username="owner", password=TEST_PASSWORD)
+
+
+@pytest.fixture
+def survey(user):
+    return Survey.objects.create(
+        owner=user, name="Tokens", slug="tokens", visibility=Survey.Visibility.TOKEN
+    )
+
+
+def _token_inserts(ctx) -> int:
+    return sum(
+        1
+        for q in ctx.captured_queries
+        if q["sql"].startswith('INSERT INTO "surveys_surveyaccesstoken"')
+    )
+
+
+@pytest.mark.django_db
+class TestMintBatches:
+    def test_inserts_in_batches(self, survey, user):
+        with CaptureQueriesContext(connection) as ctx:
+            tokens = SurveyAccessToken.bulk_mint(
+                survey, user, itertools.repeat("batch", 2500)
+            )
+
+        assert len(tokens) == 2500
+        assert all(t.pk for t in tokens)
+        # One multi-row INSERT per batch of 1000, or as many as the backend
+        # needs for its bound-parameter limit (SQLite)
+        fields = [
+            f for f in SurveyAccessToken._meta.concrete_fields if not f.primary_key
+        ]
+        rows_per_insert = connection.ops.bulk_batch_size(fields, tokens[:1000])
+        assert _token_inserts(ctx) == 2 * math.ceil(1000 / rows_per_insert) + math.ceil(
+            500 / rows_per_insert
+        )
+        assert SurveyAccessToken.objects.filter(
+            survey=survey, note="batch"
+        ).count() == (2500)
+
+    def test_collision_regenerates_batch(self, survey, user):
+        SurveyAccessToken.objects.create(survey=survey, token="dup", created_by=user)
+        generated = iter(["dup", "fresh-1", "fresh-2", "fresh-3"])
+
+        with mock.patch(
+            "checktick_app.surveys.models.secrets.token_urlsafe",
+            side_effect=lambda n: next(generated),
+        ):
+            tokens = SurveyAccessToken.bulk_mint(survey, user, ["a", "b"])
+
+        assert sorted(t.token for t in tokens) == ["fresh-2", "fresh-3"]
+        assert SurveyAccessToken.objects.count() == 3
+
+    def test_persistent_collision_raises_and_rolls_back(self, survey, user):
+        SurveyAccessToken.objects.create(survey=survey, token="dup", created_by=user)
+
+        with mock.patch(
+            "checktick_app.surveys.models.secrets.token_urlsafe", return_value="dup"
+        ):
+            with pytest.raises(IntegrityError):
+                SurveyAccessToken.bulk_mint(survey, user, ["a"])
+
+        assert SurveyAccessToken.objects.count() == 1
+
+    def test_invite_tokens_are_counted(self, survey, user):
+        tokens = SurveyAccessToken.bulk_mint(
+            survey,
+            user,
+            ["Invited: a@example.com", "Uninvited guest", "x"],
+            invite_emails=["a@example.com", "b@example.com"],
+        )
+
+        # Recipients come from invite_emails, never from the notes
+        assert [t.invite_email for t in tokens] == [
+            "a@example.com",
+            "b@example.com",
+            "",
+        ]
+
+        assert SurveyDailyStats.totals(survey)["invites_sent"] == 2
+
+
+@pytest.mark.django_db
+class TestTokenViews:
+    def test_generate_above_old_cap(self, client, survey, user):
+        client.force_login(user)
+
+        response = client.post(
+            reverse("surveys:tokens", kwargs={"slug": survey.slug}),
+            {"count": "1500", "note": "wave 1"},
+        )
+
+        assert response.status_code == 302
+        assert survey.access_tokens.filter(note="wave 1").count() == 1500
+
+    def test_generate_is_capped(self, client, survey, user):
+        client.force_login(user)
+
+        with mock.patch.object(SurveyAccessToken, "MAX_BULK", 10):
+            client.post(
+                reverse("surveys:tokens", kwargs={"slug": survey.slug}),
+                {"count": "50"},
+            )
+
+        assert survey.access_tokens.count() == 10
+
+    def test_csv_export_streams_all_tokens(self, client, survey, user):
+        SurveyAccessToken.bulk_mint(survey, user, itertools.repeat("n", 2100))
+        client.force_login(user)
+
+        response = client.get(
+            reverse("surveys:tokens_export_csv", kwargs={"slug": survey.slug})
+        )
+
+        assert response.streaming
+        rows = list(
+            csv.reader(io.StringIO(b"".join(response.streaming_content).decode()))
+        )
+        assert rows[0] == [
+            "token",
+            "created_at",
+            "expires_at",
+            "used_at",
+            "used_by",
+            "note",
+        ]
+        assert len(rows) == 2101
+        assert {row[0] for row in rows[1:]} == set(
+            survey.access_tokens.values_list("token", flat=True)
+        )
+
+
+@pytest.mark.django_db
+class TestTokenApi:
+    def test_api_generate_and_export(self, survey, user):
+        client = APIClient()
+        client.force_authenticate(user)
+
+        response = client.post(
+            f"/api/surveys/{survey.id}/tokens/", {"count": 1200}, format="json"
+        )
+        assert response.status_code == 200
+        assert response.data["created"] == 1200
+
+        export = client.get(f"/api/surveys/{survey.id}/tokens/export/")
+        assert export.status_code == 200
+        items = json.loads(b"".join(export.streaming_content))["items"]
+        assert len(items) == 1200
+        assert set(items[0]) == {
+            "token",
+            "created_at",
+            "expires_at",
+            "used_at",
+            "used_by",
+            "note",
+        }
+
+    def test_large_mint_points_to_export(self, survey, user):
+        client = APIClient()
+        client.force_authenticate(user)
+
+        with mock.patch("checktick_app.api.views.TOKENS_RESPONSE_MAX_ITEMS", 5):
+            small = client.post(
+                f"/api/surveys/{survey.id}/tokens/", {"count": 5}, format="json"
+            )
+            large = client.post(
+                f"/api/surveys/{survey.id}/tokens/", {"count": 6}, format="json"
+            )
+
+        assert len(small.data["items"]) == 5
+        assert large.status_code == 200
+        assert large.data["created"] == 6
+        assert large.data["items"] == []
+        assert large.data["export"].endswith(f"/api/surveys/{survey.id}/tokens/export/")
+        assert survey.access_tokens.count() == 11
+
+    def test_export_requires_edit_permission(self, survey, user):
+        from checktick_app.surveys.models import SurveyMembership
+
+        viewer = User.objects.create_user(username="viewer", password="x")
+        SurveyMembership.objects.create(
+            survey=survey, user=viewer, role=SurveyMembership.Role.VIEWER
+        )
+        client = APIClient()
+        client.force_authenticate(viewer)
+
+        assert (
+            client.get(f"/api/surveys/{survey.id}/metrics/responses/").status_code
+            == 200
+        )
+        assert client.get(f"/api/surveys/{survey.id}/tokens/export/").status_code == 403
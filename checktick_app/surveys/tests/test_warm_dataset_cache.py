@@ -0,0 +1,151 @@
+"""
+Tests for the warm_dataset_cache management command.
+"""
+
+from io import StringIO
+import json
+import threading
+from unittest.mock import MagicMock, patch
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+import pytest
+import requests
+
+from checktick_app.surveys.external_datasets import (
+    AVAILABLE_DATASETS,
+    CACHE_KEY,
+    store_dataset,
+)
+
+SESSION_GET = "checktick_app.surveys.external_datasets.requests.Session.get"
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(settings, tmp_path):
+    settings.EXTERNAL_DATASET_SNAPSHOT_DIR = str(tmp_path)
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def _upstream(url, **kwargs):
+    """A valid response for whichever dataset endpoint is requested."""
+    response = MagicMock()
+    response.status_code = 200
+    response.json.return_value = [
+        {
+            "name": "SOMEWHERE",
+            "ods_code": "RAA",
+            "gss_code": "E09000001",
+            "region_code": "Y56",
+            "pz_code": "PZ001",
+        }
+    ]
+    return response
+
+
+def _warm(*args):
+    out = StringIO()
+    call_command("warm_dataset_cache", *args, stdout=out)
+    return out.getvalue()
+
+
+def test_warms_all_datasets_in_parallel(tmp_path):
+    threads = set()
+    # The first three fetches only return once all three are in flight
+    in_flight = threading.Barrier(3, timeout=5)
+    calls = iter(range(len(AVAILABLE_DATASETS)))
+    calls_lock = threading.Lock()
+
+    def upstream(url, **kwargs):
+        threads.add(threading.current_thread().name)
+        with calls_lock:
+            call = next(calls)
+        if call < 3:
+            in_flight.wait()
+        return _upstream(url, **kwargs)
+
+    with patch(SESSION_GET, side_effect=upstream) as mock_get:
+        output = _warm("--workers", "3")
+
+    assert mock_get.call_count == len(AVAILABLE_DATASETS)
+    assert len(threads) == 3
+    assert all(name.startswith("dataset-warm") for name in threads)
+    for key in AVAILABLE_DATASETS:
+        assert cache.get(CACHE_KEY.format(dataset_key=key))["options"]
+        assert json.loads((tmp_path / f"{key}.json").read_text())["options"]
+        assert f"✓ {key}: 1 options" in output
+    assert f"Warmed {len(AVAILABLE_DATASETS)} dataset(s)" in output
+
+
+def test_named_datasets_only():
+    with patch(SESSION_GET, side_effect=_upstream) as mock_get:
+        output = _warm("nhs_trusts")
+
+    assert mock_get.call_count == 1
+    assert "nhs_trusts" in output
+    assert cache.get(CACHE_KEY.format(dataset_key="welsh_lhbs")) is None
+
+
+def test_stale_only_skips_fresh_datasets():
+    store_dataset("nhs_trusts", ["CACHED (RAA)"])
+
+    with patch(SESSION_GET, side_effect=_upstream) as mock_get:
+        output = _warm("nhs_trusts", "welsh_lhbs", "--stale-only")
+
+    assert mock_get.call_count == 1
+    assert "nhs_trusts: fresh, skipped" in output
+    assert cache.get(CACHE_KEY.format(dataset_key="nhs_trusts"))["options"] == [
+        "CACHED (RAA)"
+    ]
+
+
+def test_stale_only_uses_snapshot_age_when_cache_is_empty():
+    # As in a separate process with a local-memory cache: only the snapshot
+    # written by an earlier run is visible
+    with patch(SESSION_GET, side_effect=_upstream):
+        _warm("nhs_trusts")
+    cache.clear()
+
+    with patch(SESSION_GET, side_effect=_upstream) as mock_get:
+        output = _warm("nhs_trusts", "--stale-only")
+
+    assert mock_get.call_count == 0
+    assert "nhs_trusts: fresh, skipped" in output
+
+
+def test_failure_keeps_previous_copy_and_reports_error():
+    store_dataset("nhs_trusts", ["CACHED (RAA)"])
+
+    def upstream(url, **kwargs):
+        if "trusts" in url:
+            raise requests.ConnectionError("down")
+        return _upstream(url, **kwargs)
+
+    with patch(SESSION_GET, side_effect=upstream):
+        with pytest.raises(CommandError, match="1 of 2 dataset"):
+            _warm("nhs_trusts", "welsh_lhbs")
+
+    assert cache.get(CACHE_KEY.format(dataset_key="nhs_trusts"))["options"] == [
+        "CACHED (RAA)"
+    ]
+    assert cache.get(CACHE_KEY.format(dataset_key="welsh_lhbs")) is not None
+
+
+def test_invalid_response_is_not_cached():
+    response = MagicMock()
+    response.status_code = 200
+    response.json.return_value = {"unexpected": "shape"}
+
+    with patch(SESSION_GET, return_value=response):
+        with pytest.raises(CommandError):
+            _warm("nhs_trusts")
+
+    assert cache.get(CACHE_KEY.format(dataset_key="nhs_trusts")) is None
+
+
+def test_unknown_dataset_key():
+    with pytest.raises(CommandError, match="Unknown dataset"):
+        _warm("not_a_dataset")
@@ -54,6 +54,11 @@ urlpatterns = [
         views.survey_publish_settings,
         name="publish_settings",
     ),
+    path(
+        "<slug:slug>/publish/invites/progress/",
+        views.survey_invite_progress,
+        name="invite_progress",
+    ),
     path(
         "<slug:slug>/dashboard/publish",
         views.survey_publish_update,
@@ -239,6 +244,11 @@ urlpatterns = [
         gov_views.survey_export_download,
         name="survey_export_download",
     ),
+    path(
+        "<slug:slug>/export/<uuid:export_id>/status/",
+        gov_views.survey_export_status,
+        name="survey_export_status",
+    ),
     path(
         "<slug:slug>/export/<uuid:export_id>/download/<str:token>/",
         gov_views.survey_export_file,
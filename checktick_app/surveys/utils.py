@@ -1,12 +1,17 @@
 from __future__ import annotations
 
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 import json
+import multiprocessing
 import os
 import secrets
-from typing import Tuple
+from typing import Iterable, Iterator, Tuple
 
+from cryptography.exceptions import InvalidTag
 from cryptography.hazmat.primitives import hashes, hmac
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
 
@@ -292,6 +297,18 @@ def encrypt_sensitive(passphrase_key: bytes, data: dict) -> bytes:
 
 
 def decrypt_sensitive(passphrase_key: bytes, blob: bytes) -> dict:
+    # Convert memoryview to bytes (PostgreSQL BinaryField returns memoryview)
+    if isinstance(blob, memoryview):
+        blob = bytes(blob)
+
+    if blob.startswith(RECORD_BLOB_MAGIC):
+        try:
+            return _decrypt_record(passphrase_key, blob)
+        except (InvalidTag, ValueError):
+            # A legacy blob whose random salt happens to start with the
+            # magic prefix - fall through to the scrypt format.
+            pass
+
     salt, nonce, ct = blob[:16], blob[16:28], blob[28:]
     kdf = Scrypt(salt=salt, length=32, n=2**14, r=8, p=1)
     key = kdf.derive(passphrase_key)
@@ -300,6 +317,153 @@ def decrypt_sensitive(passphrase_key: bytes, blob: bytes) -> dict:
     return json.loads(pt.decode("utf-8"))
 
 
+# Versioned per-record format for data sealed with an unwrapped survey KEK.
+# The KEK is already 32 bytes of key material, so each record gets a fresh
+# subkey via HKDF instead of another memory-hard scrypt run.
+# Layout: magic (4) | salt (16) | nonce (12) | ciphertext
+RECORD_BLOB_MAGIC = b"CTR\x01"
+RECORD_HKDF_INFO = b"checktick:survey-record:v1"
+
+
+def _derive_record_key(survey_key: bytes, salt: bytes) -> bytes:
+    if len(survey_key) != 32:
+        raise ValueError("Survey key must be 32 bytes")
+    hkdf = HKDF(algorithm=hashes.SHA256(), length=32, salt=salt, info=RECORD_HKDF_INFO)
+    return hkdf.derive(survey_key)
+
+
+def encrypt_sensitive_record(survey_key: bytes, data: dict) -> bytes:
+    """
+    Encrypt a single record (e.g. response demographics) with a survey KEK.
+
+    Args:
+        survey_key: The unwrapped 32-byte survey encryption key (KEK)
+        data: JSON-serialisable dict to encrypt
+
+    Returns:
+        Binary blob containing: magic (4) | salt (16) | nonce (12) | ciphertext
+
+    Unlike encrypt_sensitive this does not run scrypt; the per-record subkey
+    is derived with HKDF-SHA256, so sealing takes microseconds. Blobs are
+    read back with decrypt_sensitive, which also accepts the legacy format.
+
+    Raises:
+        ValueError: If survey_key is not 32 bytes
+    """
+    salt = os.urandom(16)
+    key = _derive_record_key(survey_key, salt)
+    aesgcm = AESGCM(key)
+    nonce = os.urandom(12)
+    plaintext = json.dumps(data).encode("utf-8")
+    # Bind the header into the tag so the version cannot be swapped
+    ct = aesgcm.encrypt(nonce, plaintext, RECORD_BLOB_MAGIC)
+    return RECORD_BLOB_MAGIC + salt + nonce + ct
+
+
+def _decrypt_record(survey_key: bytes, blob: bytes) -> dict:
+    offset = len(RECORD_BLOB_MAGIC)
+    salt = blob[offset : offset + 16]
+    nonce = blob[offset + 16 : offset + 28]
+    ct = blob[offset + 28 :]
+    key = _derive_record_key(survey_key, salt)
+    aesgcm = AESGCM(key)
+    pt = aesgcm.decrypt(nonce, ct, RECORD_BLOB_MAGIC)
+    return json.loads(pt.decode("utf-8"))
+
+
+def _decrypt_sensitive_or_none(passphrase_key: bytes, blob: bytes) -> dict | None:
+    try:
+        return decrypt_sensitive(passphrase_key, blob)
+    except Exception:
+        return None
+
+
+def _default_decrypt_workers() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # pragma: no cover - non-Linux
+        return os.cpu_count() or 1
+
+
+def decrypt_sensitive_batch(
+    passphrase_key: bytes,
+    blobs: Iterable[bytes | None],
+    max_workers: int | None = 1,
+    window: int = 512,
+) -> Iterator[dict | None]:
+    """
+    Decrypt a stream of blobs, yielding results in input order.
+
+    Args:
+        passphrase_key: Survey key passed to decrypt_sensitive for every blob
+        blobs: Iterable of encrypted blobs (None/empty entries yield {})
+        max_workers: Process pool size (None: available cores); 0 or 1
+                     (the default) decrypts inline. Only pass a pool size
+                     from background workers, never from a web request
+        window: Number of blobs read ahead and decrypted per round
+
+    Yields:
+        Decrypted dict per blob, or None if a blob fails to decrypt
+
+    Legacy scrypt blobs are CPU-bound, so they are fanned out to a process
+    pool. Blobs in the per-record HKDF format are cheap and decrypted inline.
+    Only one window is held in memory at a time, so results stream. The pool
+    uses the "spawn" start method so workers never inherit the parent's
+    database connections, and is only started if a legacy blob is seen.
+    """
+    if isinstance(passphrase_key, memoryview):
+        passphrase_key = bytes(passphrase_key)
+    if max_workers is None:
+        max_workers = _default_decrypt_workers()
+
+    executor: ProcessPoolExecutor | None = None
+    iterator = iter(blobs)
+    try:
+        while True:
+            chunk = [
+                bytes(b) if isinstance(b, memoryview) else b
+                for b in islice(iterator, window)
+            ]
+            if not chunk:
+                return
+
+            results: list[dict | None] = [None] * len(chunk)
+            legacy: list[int] = []
+            for i, blob in enumerate(chunk):
+                if not blob:
+                    results[i] = {}
+                elif blob.startswith(RECORD_BLOB_MAGIC) or max_workers <= 1:
+                    results[i] = _decrypt_sensitive_or_none(passphrase_key, blob)
+                else:
+                    legacy.append(i)
+
+            if legacy:
+                if executor is None and len(legacy) > 1:
+                    executor = ProcessPoolExecutor(
+                        max_workers=max_workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+                if executor is None:
+                    results[legacy[0]] = _decrypt_sensitive_or_none(
+                        passphrase_key, chunk[legacy[0]]
+                    )
+                else:
+                    chunksize = max(1, len(legacy) // (max_workers * 4))
+                    decrypted = executor.map(
+                        _decrypt_sensitive_or_none,
+                        [passphrase_key] * len(legacy),
+                        [chunk[i] for i in legacy],
+                        chunksize=chunksize,
+                    )
+                    for i, value in zip(legacy, decrypted):
+                        results[i] = value
+
+            yield from results
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+
 def make_key_hash(key: bytes) -> tuple[bytes, bytes]:
     salt = os.urandom(16)
     kdf = PBKDF2HMAC(
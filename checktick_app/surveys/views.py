@@ -3,10 +3,12 @@ from __future__ import annotations
 from copy import deepcopy
 import csv
 import io
+import itertools
 import json
 import logging
 import secrets
 from typing import Any, Iterable, Union
+import uuid
 
 from django import forms
 from django.conf import settings
@@ -43,6 +45,7 @@ from .models import (
     QuestionGroup,
     Survey,
     SurveyAccessToken,
+    SurveyDailyStats,
     SurveyMembership,
     SurveyQuestion,
     SurveyQuestionCondition,
@@ -53,14 +56,18 @@ from .permissions import (
     can_export_survey_data,
     can_manage_org_users,
     can_manage_survey_users,
-    can_view_survey,
     require_can_edit,
     require_can_view,
+    visible_surveys,
 )
+from .runtime_schema import bump_schema_revision, get_runtime_schema
 from .utils import verify_key
 
 logger = logging.getLogger(__name__)
 
+# Surveys shown per page of the survey list
+SURVEY_LIST_PAGE_SIZE = 50
+
 # Demographics field definitions: key -> display label
 DEMOGRAPHIC_FIELD_DEFS: dict[str, str] = {
     "first_name": "First name",
@@ -440,21 +447,27 @@ def _verify_captcha(request: HttpRequest) -> bool:
 
 @login_required
 def survey_list(request: HttpRequest) -> HttpResponse:
-    # Creators/Viewers: only see surveys they created (owner)
-    # Admins: see all surveys in their organization
-    user = request.user
-    surveys = Survey.objects.none()
-    if user.is_authenticated:
-        owned = Survey.objects.filter(owner=user)
-        org_ids = user.org_memberships.values_list("organization_id", flat=True)  # type: ignore[attr-defined]
-        if org_ids:
-            org_surveys = Survey.objects.filter(organization_id__in=list(org_ids))
-            # keep only those the user can view (admins of those orgs)
-            org_surveys = [s for s in org_surveys if can_view_survey(user, s)]
-            surveys = owned | Survey.objects.filter(id__in=[s.id for s in org_surveys])  # type: ignore[attr-defined]
-        else:
-            surveys = owned
-    return render(request, "surveys/list.html", {"surveys": surveys})
+    # Everything the user can view: surveys they own or are a member of, and
+    # all surveys in organizations they own or administer. Newest first,
+    # keyset-paginated on id (?before=<id of the last survey shown>).
+    surveys = visible_surveys(request.user).order_by("-id")
+    before = request.GET.get("before", "")
+    if before.isdigit():
+        surveys = surveys.filter(id__lt=int(before))
+    page = list(surveys[: SURVEY_LIST_PAGE_SIZE + 1])
+    next_before = None
+    if len(page) > SURVEY_LIST_PAGE_SIZE:
+        page = page[:SURVEY_LIST_PAGE_SIZE]
+        next_before = page[-1].id
+    return render(
+        request,
+        "surveys/list.html",
+        {
+            "surveys": page,
+            "next_before": next_before,
+            "is_first_page": not before.isdigit(),
+        },
+    )
 
 
 class SurveyCreateForm(forms.ModelForm):
@@ -787,7 +800,9 @@ def survey_detail(request: HttpRequest, slug: str) -> HttpResponse:
         if demo:
             survey_key = get_survey_key_from_session(request, slug)
             if survey_key:
-                resp.store_demographics(survey_key, demo)
+                resp.store_demographics(
+                    survey_key, demo, is_kek=survey_key_is_kek(request)
+                )
         try:
             resp.save()
         except Exception:
@@ -1599,16 +1614,14 @@ def _serialize_question_for_builder(
 def survey_dashboard(request: HttpRequest, slug: str) -> HttpResponse:
     survey = get_object_or_404(Survey, slug=slug)
     require_can_view(request.user, survey)
-    total = survey.responses.count()
-    # Simple analytics
+    # Simple analytics, read from the daily rollup (SurveyDailyStats)
     now = timezone.now()
     start_today = now.replace(hour=0, minute=0, second=0, microsecond=0)
-    last7 = now - timezone.timedelta(days=7)
-    today_count = survey.responses.filter(submitted_at__gte=start_today).count()
-    last7_count = survey.responses.filter(submitted_at__gte=last7).count()
+    stats = SurveyDailyStats.totals(survey, today=start_today.date())
+    total = stats["total"]
+    today_count = stats["today"]
+    last7_count = stats["last7"]
     # Sparkline data: last 14 full days (oldest -> newest)
-    from collections import OrderedDict
-
     spark_points = ""
     spark_labels = []
     invites_points = ""
@@ -1631,32 +1644,30 @@ def survey_dashboard(request: HttpRequest, slug: str) -> HttpResponse:
         if start_date == start_today:
             start_date = start_today - timezone.timedelta(days=1)
 
-        day_counts = OrderedDict()
-        current_day = start_date
         # Always include at least up to and including today
         end_day = start_today + timezone.timedelta(days=1)
-        # Also build invites-per-day alongside response counts so we can
-        # render both series in the sparkline.
-        invite_day_counts = OrderedDict()
+        # Both series come from the rollup rows in range, so the cost does
+        # not grow with the number of days the survey has been open
+        by_day = {
+            day: (responses, invites_sent)
+            for day, responses, invites_sent in survey.daily_stats.filter(
+                day__gte=start_date.date(), day__lt=end_day.date()
+            ).values_list("day", "responses", "invites_sent")
+        }
+
+        dates = []
+        response_values = []
+        invite_values = []
+        current_day = start_date
         while current_day < end_day:
-            next_day = current_day + timezone.timedelta(days=1)
-            day_counts[current_day.date().isoformat()] = survey.responses.filter(
-                submitted_at__gte=current_day, submitted_at__lt=next_day
-            ).count()
-            invite_day_counts[current_day.date().isoformat()] = (
-                survey.access_tokens.filter(
-                    created_at__gte=current_day,
-                    created_at__lt=next_day,
-                    note__icontains="Invited",
-                ).count()
-            )
-            current_day = next_day
+            day = current_day.date()
+            dates.append(day.isoformat())
+            responses, invites_sent = by_day.get(day, (0, 0))
+            response_values.append(responses)
+            invite_values.append(invites_sent)
+            current_day += timezone.timedelta(days=1)
 
         # Build sparkline polyline points (0..100 width, 0..24 height)
-        response_values = list(day_counts.values())
-        invite_values = list(invite_day_counts.values())
-        dates = list(day_counts.keys())
-
         if response_values or invite_values:  # Create sparkline even if all zeros
             # Use combined max so both series share the same vertical scale
             max_v = max(
@@ -1730,10 +1741,8 @@ def survey_dashboard(request: HttpRequest, slug: str) -> HttpResponse:
         "spark_points": spark_points,
         "spark_labels": spark_labels,
         # Invites stats
-        "invites_sent": survey.access_tokens.filter(note__icontains="Invited").count(),
-        "invites_pending": survey.access_tokens.filter(
-            note__icontains="Invited", response__isnull=True
-        ).count(),
+        "invites_sent": stats["invites_sent"],
+        "invites_pending": max(0, stats["invites_sent"] - stats["invites_used"]),
         "invites_points": invites_points,
         "survey_not_started": survey_not_started,
         "can_manage_users": can_manage_survey_users(request.user, survey),
@@ -1785,17 +1794,13 @@ def survey_invites_pending(request: HttpRequest, slug: str) -> HttpResponse:
     survey = get_object_or_404(Survey, slug=slug)
     require_can_view(request.user, survey)
 
-    tokens = survey.access_tokens.filter(
-        note__icontains="Invited", response__isnull=True
-    ).order_by("-created_at")
+    tokens = (
+        survey.access_tokens.exclude(invite_email="")
+        .filter(response__isnull=True)
+        .order_by("-created_at")
+    )
 
-    invites = []
-    for t in tokens:
-        # Note format used when creating invites: 'Invited: email@domain'
-        email = None
-        if t.note and ":" in t.note:
-            email = t.note.split(":", 1)[1].strip()
-        invites.append({"token": t, "email": email or t.note or ""})
+    invites = [{"token": t, "email": t.invite_email} for t in tokens]
 
     return render(
         request, "surveys/invites_pending.html", {"survey": survey, "invites": invites}
@@ -1815,19 +1820,14 @@ def survey_invite_resend(
     require_can_edit(request.user, survey)
 
     token = get_object_or_404(
-        SurveyAccessToken,
+        SurveyAccessToken.objects.exclude(invite_email=""),
         id=token_id,
         survey=survey,
-        note__icontains="Invited",
         response__isnull=True,
     )
 
-    # Extract email from note (format: "Invited: email@domain.com")
-    email = None
-    if token.note and ":" in token.note:
-        email = token.note.split(":", 1)[1].strip()
-
-    if not email or "@" not in email:
+    email = token.invite_email
+    if "@" not in email:
         messages.error(request, "Cannot resend: invalid email address in token note.")
         return redirect("surveys:invites_pending", slug=slug)
 
@@ -1842,6 +1842,9 @@ def survey_invite_resend(
         token=token.token,
         contact_email=contact_email,
     ):
+        token.invite_resent_at = timezone.now()
+        token.invite_bounced_at = None
+        token.save(update_fields=["invite_resent_at", "invite_bounced_at"])
         messages.success(request, f"Invitation resent to {email}")
     else:
         messages.error(request, f"Failed to resend invitation to {email}")
@@ -2081,62 +2084,13 @@ def survey_publish_settings(request: HttpRequest, slug: str) -> HttpResponse:
 
             survey.save()
 
-            # Process invite emails if provided and visibility is TOKEN
+            # Queue invite emails if provided and visibility is TOKEN
             if invite_emails and visibility == Survey.Visibility.TOKEN:
-                import secrets
-
-                from checktick_app.core.email_utils import send_survey_invite_email
-
-                # Parse email addresses (supports Outlook format and various separators)
-                email_list = _parse_email_addresses(invite_emails)
-
-                # Get contact email (use survey owner's email)
-                contact_email = request.user.email if request.user.email else None
-
-                sent_count = 0
-                failed_emails = []
-
-                for email_address in email_list:
-                    # Validate email format (basic check)
-                    if (
-                        "@" not in email_address
-                        or "." not in email_address.split("@")[1]
-                    ):
-                        failed_emails.append(f"{email_address} (invalid format)")
-                        continue
-
-                    # Create token for this email
-                    token = SurveyAccessToken(
-                        survey=survey,
-                        token=secrets.token_urlsafe(24),
-                        created_by=request.user,
-                        expires_at=end_at if end_at else None,
-                        note=f"Invited: {email_address}",
-                    )
-                    token.save()
-
-                    # Send invitation email
-                    if send_survey_invite_email(
-                        to_email=email_address,
-                        survey=survey,
-                        token=token.token,
-                        contact_email=contact_email,
-                    ):
-                        sent_count += 1
-                    else:
-                        failed_emails.append(email_address)
-
-                # Show summary message
-                if sent_count > 0:
-                    messages.success(
-                        request,
-                        f"Survey published! {sent_count} invitation(s) sent successfully.",
-                    )
-                if failed_emails:
-                    messages.warning(
-                        request,
-                        f"Failed to send invites to: {', '.join(failed_emails)}",
-                    )
+                batch = _queue_survey_invites(
+                    request, survey, invite_emails, end_at, "Survey published!"
+                )
+                if batch:
+                    return _publish_settings_redirect(slug, batch)
             else:
                 messages.success(request, "Survey has been published successfully!")
 
@@ -2162,69 +2116,94 @@ def survey_publish_settings(request: HttpRequest, slug: str) -> HttpResponse:
 
             survey.save()
 
-            # Process invite emails if provided and visibility is TOKEN
+            # Queue invite emails if provided and visibility is TOKEN
             if invite_emails and visibility == Survey.Visibility.TOKEN:
-                import secrets
+                batch = _queue_survey_invites(
+                    request, survey, invite_emails, end_at, "Settings updated!"
+                )
+                if batch:
+                    return _publish_settings_redirect(slug, batch)
+            else:
+                messages.success(request, "Publication settings updated.")
 
-                from checktick_app.core.email_utils import send_survey_invite_email
+            return redirect("surveys:dashboard", slug=slug)
 
-                # Parse email addresses (supports Outlook format and various separators)
-                email_list = _parse_email_addresses(invite_emails)
+    # GET request - show the form (with invite delivery progress, if any)
+    from .services import InviteService
 
-                # Get contact email (use survey owner's email)
-                contact_email = request.user.email if request.user.email else None
+    ctx = {"survey": survey}
+    invite_batch = request.GET.get("invite_batch")
+    try:
+        invite_batch = uuid.UUID(invite_batch) if invite_batch else None
+    except ValueError:
+        invite_batch = None
+    progress = InviteService.delivery_progress(survey, batch=invite_batch)
+    if invite_batch or progress["queued"] or progress["sending"]:
+        ctx["invite_batch"] = invite_batch
+        ctx["invite_progress"] = progress
+    return render(request, "surveys/publish_settings.html", ctx)
+
+
+def _queue_survey_invites(
+    request: HttpRequest, survey: Survey, invite_emails: str, expires_at, prefix: str
+):
+    """Queue invitation emails entered on the publish page.
+
+    Tokens and outbox rows are created here; delivery happens in the
+    process_invite_outbox worker.
+
+    Returns:
+        The batch id if any invitations were queued, else None
+    """
+    from .services import InviteService
 
-                sent_count = 0
-                failed_emails = []
+    batch, queued, invalid = InviteService.queue_invites(
+        survey,
+        _parse_email_addresses(invite_emails),
+        created_by=request.user,
+        expires_at=expires_at,
+        contact_email=request.user.email or None,
+    )
+    if queued:
+        messages.success(
+            request,
+            f"{prefix} {queued} invitation(s) queued for delivery.",
+        )
+    if invalid:
+        messages.warning(
+            request,
+            "Failed to send invites to: "
+            + ", ".join(f"{email} (invalid format)" for email in invalid),
+        )
+    return batch if queued else None
 
-                for email_address in email_list:
-                    # Validate email format (basic check)
-                    if (
-                        "@" not in email_address
-                        or "." not in email_address.split("@")[1]
-                    ):
-                        failed_emails.append(f"{email_address} (invalid format)")
-                        continue
 
-                    # Create token for this email
-                    token = SurveyAccessToken(
-                        survey=survey,
-                        token=secrets.token_urlsafe(24),
-                        created_by=request.user,
-                        expires_at=end_at if end_at else None,
-                        note=f"Invited: {email_address}",
-                    )
-                    token.save()
+def _publish_settings_redirect(slug: str, batch) -> HttpResponse:
+    from django.urls import reverse
 
-                    # Send invitation email
-                    if send_survey_invite_email(
-                        to_email=email_address,
-                        survey=survey,
-                        token=token.token,
-                        contact_email=contact_email,
-                    ):
-                        sent_count += 1
-                    else:
-                        failed_emails.append(email_address)
+    return redirect(
+        f"{reverse('surveys:publish_settings', kwargs={'slug': slug})}"
+        f"?invite_batch={batch}"
+    )
 
-                # Show summary message
-                if sent_count > 0:
-                    messages.success(
-                        request,
-                        f"Settings updated! {sent_count} invitation(s) sent successfully.",
-                    )
-                if failed_emails:
-                    messages.warning(
-                        request,
-                        f"Failed to send invites to: {', '.join(failed_emails)}",
-                    )
-            else:
-                messages.success(request, "Publication settings updated.")
 
-            return redirect("surveys:dashboard", slug=slug)
+@login_required
+def survey_invite_progress(request: HttpRequest, slug: str) -> JsonResponse:
+    """Report invitation delivery progress (polled by the publish page)."""
+    from .services import InviteService
+
+    survey = get_object_or_404(Survey, slug=slug)
+    require_can_edit(request.user, survey)
+
+    batch = request.GET.get("batch")
+    try:
+        batch = uuid.UUID(batch) if batch else None
+    except ValueError:
+        batch = None
 
-    # GET request - show the form
-    return render(request, "surveys/publish_settings.html", {"survey": survey})
+    response = JsonResponse(InviteService.delivery_progress(survey, batch=batch))
+    response["Cache-Control"] = "no-store"
+    return response
 
 
 @login_required
@@ -2835,8 +2814,11 @@ def _handle_participant_submission(
         )
         return redirect("surveys:dashboard", slug=survey.slug)
 
+    # Compiled question/field layout, cached per survey revision
+    schema = get_runtime_schema(survey)
+
     # Disallow collecting patient data on non-authenticated visibilities unless explicitly acknowledged at publish.
-    collects_patient = _survey_collects_patient_data(survey)
+    collects_patient = schema.collects_patient_data
     if (
         collects_patient
         and survey.visibility != Survey.Visibility.AUTHENTICATED
@@ -2854,7 +2836,7 @@ def _handle_participant_submission(
             return redirect(f"/surveys/{survey.slug}/closed/?reason=token_used")
 
         answers = {}
-        for q in survey.questions.all():
+        for q in schema.questions:
             key = f"q_{q.id}"
             value = (
                 request.POST.getlist(key)
@@ -2864,11 +2846,9 @@ def _handle_participant_submission(
             answers[str(q.id)] = value
 
         # Professional details (non-encrypted)
-        _, professional_fields, professional_ods = _get_professional_group_and_fields(
-            survey
-        )
+        professional_ods = schema.professional_ods_map
         professional_payload = {}
-        for field in professional_fields:
+        for field in schema.professional_fields:
             val = request.POST.get(f"prof_{field}")
             if val:
                 professional_payload[field] = val
@@ -2891,9 +2871,8 @@ def _handle_participant_submission(
             access_token=token_obj if token_obj else None,
         )
         # Demographics: only store if authenticated and key in session
-        patient_group, demographics_fields = _get_patient_group_and_fields(survey)
         demo = {}
-        for field in demographics_fields:
+        for field in schema.demographics_fields:
             val = request.POST.get(field)
             if val:
                 demo[field] = val
@@ -2901,7 +2880,9 @@ def _handle_participant_submission(
         if demo:
             survey_key = get_survey_key_from_session(request, survey.slug)
             if survey_key:
-                resp.store_demographics(survey_key, demo)
+                resp.store_demographics(
+                    survey_key, demo, is_kek=survey_key_is_kek(request)
+                )
 
         try:
             resp.save()
@@ -2920,35 +2901,22 @@ def _handle_participant_submission(
         # Redirect to thank-you page
         return redirect("surveys:thank_you", slug=survey.slug)
 
-    # GET: render using existing detail template
-    _prepare_question_rendering(survey)
-    qs = list(survey.questions.select_related("group").all())
-    for i, q in enumerate(qs, start=1):
-        setattr(q, "idx", i)
-        prev_gid = qs[i - 2].group_id if i - 2 >= 0 else None
-        next_gid = qs[i].group_id if i < len(qs) else None
-        curr_gid = q.group_id
-        setattr(q, "group_start", bool(curr_gid and curr_gid != prev_gid))
-        setattr(q, "group_end", bool(curr_gid and curr_gid != next_gid))
-    patient_group, demographics_fields = _get_patient_group_and_fields(survey)
-    prof_group, professional_fields, professional_ods = (
-        _get_professional_group_and_fields(survey)
-    )
-    show_patient_details = patient_group is not None
-    show_professional_details = prof_group is not None
+    # GET: render using existing detail template (questions carry idx and
+    # group_start/group_end, and template options are pre-normalised)
+    demographics_fields = list(schema.demographics_fields)
     ctx = {
         "survey": survey,
-        "questions": qs,
-        "show_patient_details": show_patient_details,
+        "questions": schema.questions,
+        "show_patient_details": schema.has_patient_group,
         "demographics_fields": demographics_fields,
         "demographic_defs": DEMOGRAPHIC_FIELD_DEFS,
         "demographics_fields_with_labels": [
             (k, DEMOGRAPHIC_FIELD_DEFS[k]) for k in demographics_fields
         ],
-        "show_professional_details": show_professional_details,
-        "professional_fields": professional_fields,
+        "show_professional_details": schema.has_professional_group,
+        "professional_fields": list(schema.professional_fields),
         "professional_defs": PROFESSIONAL_FIELD_DEFS,
-        "professional_ods": professional_ods,
+        "professional_ods": schema.professional_ods_map,
         "professional_field_datasets": PROFESSIONAL_FIELD_TO_DATASET,
         "is_preview": False,  # Flag to indicate this is public submission
     }
@@ -3010,18 +2978,14 @@ def survey_tokens(request: HttpRequest, slug: str) -> HttpResponse:
 
         expires_raw = request.POST.get("expires_at")
         expires_at = parse_datetime(expires_raw) if expires_raw else None
-        created = []
-        for _ in range(max(0, min(count, 1000))):
-            t = SurveyAccessToken(
-                survey=survey,
-                token=secrets.token_urlsafe(24),
-                created_by=request.user,
-                expires_at=expires_at,
-                note=note,
-            )
-            t.save()
-            created.append(t)
-        messages.success(request, f"Created {len(created)} tokens.")
+        count = max(0, min(count, SurveyAccessToken.MAX_BULK))
+        created = 0
+        with transaction.atomic():
+            for batch in SurveyAccessToken.mint_batches(
+                survey, request.user, itertools.repeat(note, count), expires_at
+            ):
+                created += len(batch)
+        messages.success(request, f"Created {created} tokens.")
         return redirect("surveys:tokens", slug=slug)
     tokens = survey.access_tokens.order_by("-created_at")[:500]
     return render(request, "surveys/tokens.html", {"survey": survey, "tokens": tokens})
@@ -3031,21 +2995,41 @@ def survey_tokens(request: HttpRequest, slug: str) -> HttpResponse:
 def survey_tokens_export_csv(request: HttpRequest, slug: str) -> HttpResponse:
     survey = get_object_or_404(Survey, slug=slug)
     require_can_edit(request.user, survey)
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(["token", "created_at", "expires_at", "used_at", "used_by", "note"])
-    for t in survey.access_tokens.all():
+
+    def generate():
+        s = io.StringIO()
+        writer = csv.writer(s)
         writer.writerow(
-            [
-                t.token,
-                t.created_at.isoformat(),
-                t.expires_at.isoformat() if t.expires_at else "",
-                t.used_at.isoformat() if t.used_at else "",
-                (t.used_by_id or ""),
-                t.note,
-            ]
+            ["token", "created_at", "expires_at", "used_at", "used_by", "note"]
+        )
+        rows = (
+            survey.access_tokens.order_by("id")
+            .values_list(
+                "token", "created_at", "expires_at", "used_at", "used_by_id", "note"
+            )
+            .iterator(chunk_size=2000)
         )
-    resp = HttpResponse(output.getvalue(), content_type="text/csv")
+        for i, (token, created_at, expires_at, used_at, used_by_id, note) in enumerate(
+            rows, start=1
+        ):
+            writer.writerow(
+                [
+                    token,
+                    created_at.isoformat(),
+                    expires_at.isoformat() if expires_at else "",
+                    used_at.isoformat() if used_at else "",
+                    (used_by_id or ""),
+                    note,
+                ]
+            )
+            # Flush every 1000 rows rather than per row
+            if i % 1000 == 0:
+                yield s.getvalue()
+                s.seek(0)
+                s.truncate(0)
+        yield s.getvalue()
+
+    resp = StreamingHttpResponse(generate(), content_type="text/csv")
     resp["Content-Disposition"] = f"attachment; filename=survey_{survey.id}_tokens.csv"
     return resp
 
@@ -3703,12 +3687,16 @@ def get_survey_key_from_session(request: HttpRequest, survey_slug: str) -> bytes
     This provides forward secrecy - no key material persists in sessions.
     Credentials are encrypted with session-specific key.
     Returns None if session expired (>30 min) or credentials invalid.
+
+    The derived KEK is kept in a short-lived in-process cache (see
+    key_cache.py) for the rest of the unlock window, so repeat requests
+    skip both scrypt derivations.
     """
     import base64
-    from datetime import timedelta
 
     from django.utils import timezone
 
+    from .key_cache import UNLOCK_WINDOW, survey_key_cache
     from .utils import decrypt_sensitive
 
     # Check if unlock is valid
@@ -3725,8 +3713,10 @@ def get_survey_key_from_session(request: HttpRequest, survey_slug: str) -> bytes
     if timezone.is_naive(verified_at):
         verified_at = timezone.make_aware(verified_at)
 
-    if timezone.now() - verified_at > timedelta(minutes=30):
-        # Session expired - clear credentials
+    if timezone.now() - verified_at > UNLOCK_WINDOW:
+        # Session expired - clear credentials and any cached KEK
+        if request.session.session_key:
+            survey_key_cache.discard(request.session.session_key)
         request.session.pop("unlock_credentials", None)
         request.session.pop("unlock_method", None)
         request.session.pop("unlock_verified_at", None)
@@ -3743,6 +3733,10 @@ def get_survey_key_from_session(request: HttpRequest, survey_slug: str) -> bytes
         if not session_key:
             return None
 
+        cached_kek = survey_key_cache.get(session_key, survey_slug, verified_at_str)
+        if cached_kek:
+            return cached_kek
+
         encrypted_creds_b64 = request.session.get("unlock_credentials")
         encrypted_creds = base64.b64decode(encrypted_creds_b64)
         creds = decrypt_sensitive(session_key.encode("utf-8"), encrypted_creds)
@@ -3750,33 +3744,44 @@ def get_survey_key_from_session(request: HttpRequest, survey_slug: str) -> bytes
         # Re-derive KEK based on method
         unlock_method = request.session.get("unlock_method")
         survey = Survey.objects.get(slug=survey_slug)
+        kek = None
 
         if unlock_method == "password":
             password = creds.get("password")
             if password:
-                return survey.unlock_with_password(password)
+                kek = survey.unlock_with_password(password)
         elif unlock_method == "recovery":
             recovery_phrase = creds.get("recovery_phrase")
             if recovery_phrase:
-                return survey.unlock_with_recovery(recovery_phrase)
+                kek = survey.unlock_with_recovery(recovery_phrase)
         elif unlock_method == "oidc":
             oidc_provider = creds.get("oidc_provider")
             oidc_subject = creds.get("oidc_subject")
             if oidc_provider and oidc_subject:
-                return survey.unlock_with_oidc(request.user)
+                kek = survey.unlock_with_oidc(request.user)
         elif unlock_method == "organization_recovery":
             organization_id = creds.get("organization_id")
             if organization_id:
                 org = Organization.objects.get(id=organization_id)
-                return survey.unlock_with_org_key(org)
+                kek = survey.unlock_with_org_key(org)
         elif unlock_method == "legacy":
             legacy_key_b64 = creds.get("legacy_key")
             if legacy_key_b64:
-                return base64.b64decode(legacy_key_b64)
+                kek = base64.b64decode(legacy_key_b64)
 
-        return None
+        if kek:
+            survey_key_cache.set(
+                session_key,
+                survey_slug,
+                verified_at_str,
+                kek,
+                expires_at=verified_at + UNLOCK_WINDOW,
+            )
+        return kek
     except Exception:
         # If anything fails, clear session and return None
+        if request.session.session_key:
+            survey_key_cache.discard(request.session.session_key)
         request.session.pop("unlock_credentials", None)
         request.session.pop("unlock_method", None)
         request.session.pop("unlock_verified_at", None)
@@ -3784,6 +3789,16 @@ def get_survey_key_from_session(request: HttpRequest, survey_slug: str) -> bytes
         return None
 
 
+def survey_key_is_kek(request: HttpRequest) -> bool:
+    """
+    Whether the key from get_survey_key_from_session is an unwrapped KEK.
+
+    Every unlock method except "legacy" yields the survey's random 32-byte
+    KEK; a legacy unlock yields the user-typed key itself.
+    """
+    return request.session.get("unlock_method") not in (None, "legacy")
+
+
 @login_required
 @require_http_methods(["GET", "POST"])
 def survey_unlock(request: HttpRequest, slug: str) -> HttpResponse:
@@ -4163,15 +4178,29 @@ def survey_export_csv(
         import csv
         from io import StringIO
 
-        header = ["id", "submitted_at", "answers"]
+        header = ["id", "submitted_at", "answers", "demographics"]
         s = StringIO()
         writer = csv.writer(s)
         writer.writerow(header)
         yield s.getvalue()
         s.seek(0)
         s.truncate(0)
-        for r in survey.responses.iterator():
-            writer.writerow([r.id, r.submitted_at.isoformat(), json.dumps(r.answers)])
+        rows = SurveyResponse.load_demographics_batch(
+            survey_key, survey.responses.order_by("submitted_at", "id").iterator()
+        )
+        for r, demographics in rows:
+            if demographics is None:
+                demographics_cell = SurveyResponse.DEMOGRAPHICS_UNREADABLE
+            else:
+                demographics_cell = json.dumps(demographics) if demographics else ""
+            writer.writerow(
+                [
+                    r.id,
+                    r.submitted_at.isoformat(),
+                    json.dumps(r.answers),
+                    demographics_cell,
+                ]
+            )
             yield s.getvalue()
             s.seek(0)
             s.truncate(0)
@@ -4982,6 +5011,7 @@ def builder_questions_reorder(request: HttpRequest, slug: str) -> HttpResponse:
     ids = [int(i) for i in order_csv.split(",") if i.isdigit()]
     for idx, qid in enumerate(ids):
         SurveyQuestion.objects.filter(id=qid, survey=survey).update(order=idx)
+    bump_schema_revision(pk=survey.pk)
     questions_qs = survey.questions.select_related("group").all()
     questions = _prepare_question_rendering(survey, questions_qs)
     groups = survey.question_groups.filter(owner=request.user)
@@ -5011,6 +5041,7 @@ def builder_group_questions_reorder(
         SurveyQuestion.objects.filter(id=qid, survey=survey, group=group).update(
             order=idx
         )
+    bump_schema_revision(pk=survey.pk)
     questions_qs = survey.questions.select_related("group").filter(group=group)
     questions = _prepare_question_rendering(survey, questions_qs)
     return render(
@@ -11,15 +11,24 @@ Note: Survey closure and deletion are handled by existing views in views.py
 """
 
 from datetime import timedelta
+import re
 
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
 from django.db import transaction
-from django.http import HttpRequest, HttpResponse
+from django.http import (
+    FileResponse,
+    HttpRequest,
+    HttpResponse,
+    HttpResponseGone,
+    JsonResponse,
+    StreamingHttpResponse,
+)
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
+from django.utils.http import content_disposition_header
 
 from .models import DataCustodian, DataExport, LegalHold, Survey
 from .permissions import (
@@ -36,9 +45,14 @@ from .services import ExportService, RetentionService
 
 
 @login_required
-@transaction.atomic
 def survey_export_create(request: HttpRequest, slug: str) -> HttpResponse:
-    """Create a new data export with secure download link."""
+    """Queue a new data export with secure download link.
+
+    The file itself is generated by the process_export_jobs worker; the
+    download page polls survey_export_status until it is ready. Exports that
+    need the session's unlocked survey key (or a password without a
+    configured SECRET_KEY) are generated in the request instead.
+    """
     survey = get_object_or_404(Survey, slug=slug)
     require_can_export_survey_data(request.user, survey)
 
@@ -68,15 +82,26 @@ def survey_export_create(request: HttpRequest, slug: str) -> HttpResponse:
             )
 
         try:
-            export = ExportService.create_export(survey, request.user, password)
+            from .views import get_survey_key_from_session
+
+            survey_key = get_survey_key_from_session(request, slug)
+            if ExportService.can_queue_export(password, survey_key):
+                export = ExportService.queue_export(survey, request.user, password)
+                message = (
+                    f"Export queued. {export.response_count} responses will be "
+                    "exported."
+                )
+            else:
+                # The unlocked survey key never leaves this process
+                export = ExportService.create_export(
+                    survey, request.user, password, survey_key=survey_key
+                )
+                message = f"Export ready. {export.response_count} responses exported."
 
             # Send email notification to organization administrators
             _send_export_notification(export, request.user, survey)
 
-            messages.success(
-                request,
-                f"Export created successfully. {export.response_count} responses exported.",
-            )
+            messages.success(request, message)
 
             return redirect(
                 "surveys:survey_export_download", slug=slug, export_id=export.id
@@ -107,7 +132,7 @@ def survey_export_download(
 
     require_can_export_survey_data(request.user, survey)
 
-    # Generate download URL
+    # Generate download URL (shown once the worker has built the file)
     download_url = ExportService.get_download_url(export)
 
     context = {
@@ -120,6 +145,35 @@ def survey_export_download(
     return render(request, "surveys/data_governance/export_download.html", context)
 
 
+@login_required
+def survey_export_status(
+    request: HttpRequest, slug: str, export_id: str
+) -> JsonResponse:
+    """Report export job progress (polled by the download page)."""
+    survey = get_object_or_404(Survey, slug=slug)
+    require_can_export_survey_data(request.user, survey)
+
+    export = get_object_or_404(
+        DataExport.objects.only(
+            "id", "survey_id", "status", "rows_done", "response_count", "error"
+        ),
+        id=export_id,
+        survey=survey,
+    )
+
+    response = JsonResponse(
+        {
+            "status": export.status,
+            "rows_done": export.rows_done,
+            "total": export.response_count,
+            "percent": export.progress_percent,
+            "error": export.error if export.status == DataExport.Status.FAILED else "",
+        }
+    )
+    response["Cache-Control"] = "no-store"
+    return response
+
+
 @login_required
 def survey_export_file(
     request: HttpRequest, slug: str, export_id: str, token: str
@@ -133,17 +187,125 @@ def survey_export_file(
         messages.error(request, "Invalid or expired download link.")
         return redirect("surveys:dashboard", slug=slug)
 
-    # TODO: Retrieve CSV from object storage
-    # For now, generate on-the-fly
-    csv_data = ExportService._generate_csv(survey)
+    if not export.is_ready:
+        messages.error(request, "This export is not ready yet.")
+        return redirect(
+            "surveys:survey_export_download", slug=slug, export_id=export.id
+        )
 
-    # Record download
-    ExportService.record_download(export)
+    artifact = ExportService.open_artifact(export)
+    if artifact is None and (export.file_path or export.is_encrypted):
+        # The stored file was purged or lost. Never rebuild it here: that
+        # would serve a password-protected export as plaintext.
+        return HttpResponseGone(
+            "This export file is no longer available. Please create a new export."
+        )
+    if artifact is None:
+        # Unencrypted exports created before artifacts were persisted:
+        # stream on-the-fly
+        from .views import get_survey_key_from_session
 
-    # Return CSV file
-    response = HttpResponse(csv_data, content_type="text/csv")
-    response["Content-Disposition"] = f'attachment; filename="survey_{slug}_export.csv"'
+        csv_stream = ExportService.iter_csv(
+            survey, survey_key=get_survey_key_from_session(request, slug)
+        )
+        ExportService.record_download(export)
+        response = StreamingHttpResponse(csv_stream, content_type="text/csv")
+        response["Content-Disposition"] = (
+            f'attachment; filename="survey_{slug}_export.csv"'
+        )
+        return response
+
+    filename = f"survey_{slug}_export.csv"
+    content_type = "text/csv"
+    if export.is_encrypted:
+        filename += ".enc"
+        content_type = "application/octet-stream"
+
+    response = _ranged_file_response(
+        request, artifact, artifact.size, filename, content_type
+    )
+
+    # Count a download once per full fetch, not per resumed range
+    if response.status_code == 200 or request.headers.get("Range", "").startswith(
+        "bytes=0-"
+    ):
+        ExportService.record_download(export)
+
+    return response
+
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _parse_range(header: str, size: int) -> tuple[int, int] | None | bool:
+    """
+    Parse a single-range "Range: bytes=start-end" header.
+
+    Returns:
+        (start, end) inclusive byte offsets, None if the header should be
+        ignored (absent, malformed or multi-range), or False if the range
+        cannot be satisfied.
+    """
+    match = _RANGE_RE.match(header.strip()) if header else None
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the final N bytes
+        length = int(last)
+        if length == 0:
+            return False
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or end < start:
+        return False
+    return start, min(end, size - 1)
+
+
+def _ranged_file_response(
+    request: HttpRequest, fh, size: int, filename: str, content_type: str
+) -> HttpResponse:
+    """Serve a stored file, honouring a single HTTP Range request."""
+    byte_range = _parse_range(request.headers.get("Range", ""), size)
+
+    if byte_range is False:
+        fh.close()
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+        return response
+
+    if byte_range is None:
+        response = FileResponse(
+            fh, as_attachment=True, filename=filename, content_type=content_type
+        )
+        response["Content-Length"] = str(size)
+    else:
+        start, end = byte_range
+
+        def read_range(block_size: int = FileResponse.block_size):
+            try:
+                fh.seek(start)
+                remaining = end - start + 1
+                while remaining > 0:
+                    data = fh.read(min(block_size, remaining))
+                    if not data:
+                        break
+                    remaining -= len(data)
+                    yield data
+            finally:
+                fh.close()
+
+        response = StreamingHttpResponse(
+            read_range(), status=206, content_type=content_type
+        )
+        response["Content-Disposition"] = content_disposition_header(True, filename)
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        response["Content-Length"] = str(end - start + 1)
 
+    response["Accept-Ranges"] = "bytes"
     return response
 
 
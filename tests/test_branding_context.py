@@ -0,0 +1,83 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+import pytest
+
+from checktick_app.context_processors import branding
+from checktick_app.surveys.models import (
+    Organization,
+    OrganizationMembership,
+    Survey,
+    SurveyMembership,
+)
+
+
+def _context(user):
+    request = RequestFactory().get("/")
+    request.user = user
+    return branding(request)
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(username="brand-user", password="x")
+
+
+@pytest.mark.django_db
+def test_capability_flags_cached_between_renders(user):
+    with CaptureQueriesContext(connection) as first:
+        _context(user)
+    with CaptureQueriesContext(connection) as second:
+        ctx = _context(user)
+
+    assert ctx["can_manage_any_users"] is False
+    # Only the SiteBranding lookup remains; the two membership exists() are cached
+    assert len(first) - len(second) == 2
+    assert not any("membership" in q["sql"].lower() for q in second.captured_queries)
+
+
+@pytest.mark.django_db
+def test_org_admin_membership_invalidates_flags(user):
+    org = Organization.objects.create(name="Org", owner=user)
+    assert _context(user)["can_manage_any_users"] is False
+
+    membership = OrganizationMembership.objects.create(
+        organization=org, user=user, role=OrganizationMembership.Role.ADMIN
+    )
+    assert _context(user)["can_manage_any_users"] is True
+
+    membership.delete()
+    assert _context(user)["can_manage_any_users"] is False
+
+
+@pytest.mark.django_db
+def test_survey_creator_role_change_invalidates_flags(user):
+    survey = Survey.objects.create(owner=user, name="S", slug="brand-s")
+    membership = SurveyMembership.objects.create(
+        survey=survey, user=user, role=SurveyMembership.Role.VIEWER
+    )
+    assert _context(user)["can_manage_any_users"] is False
+
+    membership.role = SurveyMembership.Role.CREATOR
+    membership.save()
+    assert _context(user)["can_manage_any_users"] is True
+
+
+@pytest.mark.django_db
+def test_settings_brand_follows_setting_changes(user):
+    assert _context(user)["brand"]["title"] != "Overridden"
+
+    with override_settings(BRAND_TITLE="Overridden", BRAND_ICON_SIZE=8):
+        brand = _context(user)["brand"]
+        assert brand["title"] == "Overridden"
+        assert brand["icon_size_class"] == "w-8 h-8"
+
+    assert _context(user)["brand"]["title"] != "Overridden"
+
+
+@pytest.mark.django_db
+def test_brand_dict_is_a_copy(user):
+    _context(user)["brand"]["title"] = "Mutated"
+
+    assert _context(user)["brand"]["title"] != "Mutated"